@@ -2,6 +2,8 @@ import dash
 import dash_bootstrap_components as dbc
 
 from components.layout import Layout
+from models import filtering, fourier
+from utils import cache, metrics, transport
 from utils.env import DEBUG
 
 app = dash.Dash(
@@ -12,6 +14,15 @@ app = dash.Dash(
     ],
     meta_tags=[{'name': 'viewport', 'content': 'width=device-width, initial-scale=1'}])
 server = app.server
+caches = {
+    'filter_results': filtering.result_cache,
+    'filter_designs': filtering.design_cache,
+    'fft_frequencies': fourier.freq_cache
+}
+# Before the compression, so that the recorded durations include it
+metrics.register_routes(app, caches)
+transport.register_compression(app)
+cache.register_stats_route(app, caches)
 
 app.layout = Layout(app)
 
@@ -0,0 +1,102 @@
+// Chunked, resumable upload of CSV files for the 'Upload Data' tab.
+// Files are streamed in fixed-size chunks to the upload route of the server, which appends them to a temporary file.
+// Once the whole file is stored, its reference is handed to Dash through the 'upload-file' store.
+// Upload ids are generated by the server; the id of every file being sent is kept for the session to resume it.
+(function () {
+    const CHUNK_SIZE = 2 * 1024 * 1024;
+    const MAX_RETRIES = 5;
+
+    function fileKey(file) {
+        return `upload:${file.size}-${file.lastModified}-${file.name}`;
+    }
+
+    async function start(file) {
+        const id = sessionStorage.getItem(fileKey(file));
+        if (id) {
+            const response = await fetch(`upload/${encodeURIComponent(id)}`);
+            if (response.ok) {
+                return {id, received: (await response.json()).received};
+            }
+        }
+        const created = await request('upload', {method: 'POST'});
+        sessionStorage.setItem(fileKey(file), created.upload_id);
+        return {id: created.upload_id, received: created.received};
+    }
+
+    function setProgress(value, visible) {
+        dash_clientside.set_props('upload-progress', {
+            value: Math.round(value * 100),
+            label: `${Math.round(value * 100)}%`,
+            style: {display: visible ? 'flex' : 'none'}
+        });
+    }
+
+    async function request(url, options) {
+        const response = await fetch(url, options);
+        const body = await response.json();
+        if (!response.ok && response.status !== 409) {
+            throw new Error(body.error || response.statusText);
+        }
+        return body;
+    }
+
+    async function upload(file) {
+        const started = await start(file);
+        const id = started.id;
+        let received = started.received;
+        const url = `upload/${encodeURIComponent(id)}`;
+        let retries = 0;
+
+        setProgress(received / Math.max(file.size, 1), true);
+        while (received < file.size) {
+            try {
+                const chunk = file.slice(received, received + CHUNK_SIZE);
+                received = (await request(`${url}?offset=${received}`, {method: 'PUT', body: chunk})).received;
+                retries = 0;
+            } catch (error) {
+                if (++retries > MAX_RETRIES) {
+                    throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 500 * 2 ** retries));
+                received = (await request(url)).received;
+            }
+            setProgress(received / file.size, true);
+        }
+
+        sessionStorage.removeItem(fileKey(file));
+        setProgress(1, false);
+        dash_clientside.set_props('upload-file', {
+            data: {upload_id: id, filename: file.name, size: file.size}
+        });
+    }
+
+    function handle(files) {
+        if (files && files.length) {
+            upload(files[0]).catch(error => {
+                setProgress(0, false);
+                alert(`Upload failed: ${error.message}`);
+            });
+        }
+    }
+
+    document.addEventListener('click', event => {
+        if (event.target.closest('#upload-area')) {
+            const input = document.createElement('input');
+            input.type = 'file';
+            input.accept = '.csv';
+            input.addEventListener('change', () => handle(input.files));
+            input.click();
+        }
+    });
+    document.addEventListener('dragover', event => {
+        if (event.target.closest('#upload-area')) {
+            event.preventDefault();
+        }
+    });
+    document.addEventListener('drop', event => {
+        if (event.target.closest('#upload-area')) {
+            event.preventDefault();
+            handle(event.dataTransfer.files);
+        }
+    });
+})();
@@ -0,0 +1,46 @@
+"""Throughput of the batch CLI pipeline over a set of generated CSV files, for an increasing number of workers.
+
+Run from the repository root: ``python -m benchmarks.bench_batch [--files 16] [--samples 1e6] [--workers 1 2 4]``
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from models import batch
+from models.batch import BatchSpec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=16)
+    parser.add_argument('--samples', type=float, default=1e6)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        rng = np.random.default_rng(0)
+        n = int(args.samples)
+        x_data = np.arange(n) / 1000.0
+        for index in range(args.files):
+            columns = {'Time (s)': x_data, **{f'ch{channel}': rng.standard_normal(n)
+                                              for channel in range(args.channels)}}
+            pd.DataFrame(columns).to_csv(os.path.join(directory, f'signal_{index}.csv'), index=False)
+        paths = batch.expand([directory])
+        spec = BatchSpec(filter_type='LOWPASS', cutoffs=(50.0,), order=4, output_dir=os.path.join(directory, 'out'))
+
+        print(f'{"workers":>8} {"seconds":>10} {"files/s":>10} {"samples/s":>12}')
+        for workers in sorted(set(args.workers)):
+            started = time.perf_counter()
+            results = batch.run(paths, spec, workers)
+            elapsed = time.perf_counter() - started
+            samples = sum(result.samples * result.channels for result in results)
+            print(f'{workers:>8} {elapsed:>10.2f} {len(results) / elapsed:>10.2f} {samples / elapsed:>12.3g}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Times the spectrum of awkward signal lengths with every FFT backend, transform length and precision.
+
+Run from the repository root: ``python -m benchmarks.bench_fft [--sizes 16777217] [--channels 1]``
+"""
+import argparse
+import itertools
+import timeit
+
+import numpy as np
+
+from models import fourier
+from models.fourier import FftBackend, FftLength, FftPrecision
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=float, default=[2 ** 24 + 1])
+    parser.add_argument('--channels', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"samples":>10} {"backend":>8} {"length":>7} {"precision":>10} {"n":>10} {"time [s]":>9}')
+    for size in args.sizes:
+        samples = np.random.default_rng(0).normal(size=(args.channels, int(size)))
+        for backend, length, precision in itertools.product(FftBackend, FftLength, FftPrecision):
+            elapsed = min(timeit.repeat(lambda: fourier.rfft(samples, length, backend, precision), number=1,
+                                        repeat=args.repeat))
+            n = fourier.transform_length(int(size), length)
+            print(f'{int(size):>10} {backend.name:>8} {length.name:>7} {precision.name:>10} {n:>10} {elapsed:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
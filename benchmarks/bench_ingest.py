@@ -0,0 +1,67 @@
+"""Compares parse time and peak memory of the previous and the current CSV upload ingest path.
+
+Every measurement runs in a fresh process, so the peak resident set size belongs to that single parse.
+Run from the repository root: ``python -m benchmarks.bench_ingest [--rows 1e6] [--extra-columns 4]``
+"""
+import argparse
+import base64
+import io
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from models import ingest
+
+
+def previous_path(upload_contents: str) -> pd.DataFrame:
+    content_type, content_string = upload_contents.split(',')
+    decoded = base64.b64decode(content_string)
+    return pd.read_csv(io.StringIO(decoded.decode('utf-8')))
+
+
+def current_path(upload_contents: str) -> pd.DataFrame:
+    decoded = base64.b64decode(upload_contents[upload_contents.index(',') + 1:])
+    return ingest.read_signal_csv(decoded, usecols=ingest.read_columns(decoded)[:2])
+
+
+def measure(path, upload_contents: str, results: multiprocessing.Queue):
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    path(upload_contents)
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024))
+
+
+def upload_contents(rows: int, extra_columns: int) -> str:
+    generator = np.random.default_rng(0)
+    df = pd.DataFrame({'Time [s]': np.arange(rows) * 1e-3, 'Amplitude': generator.normal(size=rows)})
+    for column in range(extra_columns):
+        df[f'Channel {column}'] = generator.normal(size=rows)
+    df['Comment'] = 'ok'
+    return 'data:text/csv;base64,' + base64.b64encode(df.to_csv(index=False).encode()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=float, default=1e6)
+    parser.add_argument('--extra-columns', type=int, default=4)
+    args = parser.parse_args()
+
+    contents = upload_contents(int(args.rows), args.extra_columns)
+    print(f'{int(args.rows)} rows, {len(contents) / 2 ** 20:.1f} MiB upload payload, engine: {ingest.CSV_ENGINE}')
+    print(f'{"path":>10} {"time [s]":>10} {"peak RSS growth [MiB]":>22}')
+    context = multiprocessing.get_context('fork')
+    for name, path in (('previous', previous_path), ('current', current_path)):
+        results = context.Queue()
+        process = context.Process(target=measure, args=(path, contents, results))
+        process.start()
+        elapsed, peak = results.get()
+        process.join()
+        print(f'{name:>10} {elapsed:>10.3f} {peak:>22.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Compares low-pass filtering at the full sample rate with multirate filtering, and reports the deviation.
+
+Run from the repository root: ``python -m benchmarks.bench_multirate [--sizes 1e6 1e7] [--cutoff 10] [--fs 10000]``.
+The multirate timings include the accuracy check unless ``--no-check`` is given.
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from models import filtering
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6, 1e7])
+    parser.add_argument('--cutoff', type=float, default=10.0)
+    parser.add_argument('--fs', type=float, default=10_000.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-check', dest='check', action='store_false')
+    args = parser.parse_args()
+
+    designs = [('butter', 8, False), ('butter', 8, True), ('fir', 2001, False), ('fir', 20001, False)]
+    print(f'{"samples":>10} {"filter":>16} {"full [s]":>9} {"restored [s]":>13} {"decimated [s]":>14} '
+          f'{"factor":>7} {"deviation":>10}')
+    for size in args.sizes:
+        x_data = np.arange(int(size)) / args.fs
+        samples = np.sin(2 * np.pi * args.cutoff / 3 * x_data) + np.random.default_rng(0).normal(size=int(size))
+        for family, order, zero_phase in designs:
+            key = filtering.design_key(order, [args.cutoff], args.fs, 'LOWPASS', family=family)
+            full = min(timeit.repeat(lambda: filtering.apply(key, samples, zero_phase=zero_phase), number=1,
+                                     repeat=args.repeat))
+            restored = min(timeit.repeat(lambda: filtering.multirate(key, samples, zero_phase=zero_phase,
+                                                                     check=args.check), number=1, repeat=args.repeat))
+            decimated = min(timeit.repeat(lambda: filtering.multirate(key, samples, zero_phase=zero_phase,
+                                                                      restore=False, check=args.check), number=1,
+                                          repeat=args.repeat))
+            result = filtering.multirate(key, samples, zero_phase=zero_phase)
+            name = f'{family} {order}' + (' 0-phase' if zero_phase else '')
+            print(f'{int(size):>10} {name:>16} {full:>9.4f} {restored:>13.4f} {decimated:>14.4f} '
+                  f'{result.factor:>7} {result.error:>10.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Bytes sent per callback with plain JSON transport and with compact transport, before and after compression.
+
+Every mode runs in a fresh process, since the transport is configured when the application is imported.
+Run from the repository root: ``python -m benchmarks.bench_payload [--example combined_sinus_2hz_5hz.csv]``
+"""
+import argparse
+import gzip
+import json
+import os
+import subprocess
+import sys
+
+
+def measure(example: str):
+    from app import app
+    from utils.transport import payload_stats, brotli
+
+    client = app.server.test_client()
+    callbacks = client.get('/_dash-dependencies').json
+
+    def call(output: str, inputs: list, state: list = ()) -> dict:
+        callback = next(callback for callback in callbacks if callback['output'].lstrip('.').startswith(output))
+        outputs = [dict(zip(['id', 'property'], name.split('.')))
+                   for name in callback['output'].strip('.').split('...')]
+        body = dict(output=callback['output'], outputs=outputs if callback['output'].startswith('..') else outputs[0],
+                    inputs=[dict(id=dependency['id'], property=dependency['property'], value=value)
+                            for dependency, value in zip(callback['inputs'], inputs)],
+                    state=[dict(id=dependency['id'], property=dependency['property'], value=value)
+                           for dependency, value in zip(callback['state'], state)],
+                    changedPropIds=[f'{callback["inputs"][0]["id"]}.{callback["inputs"][0]["property"]}'])
+        response = client.post('/_dash-update-component', json=body, headers={'Accept-Encoding': 'gzip, br'})
+        content = response.get_data()
+        if response.headers.get('Content-Encoding') == 'gzip':
+            content = gzip.decompress(content)
+        elif response.headers.get('Content-Encoding') == 'br':
+            content = brotli.decompress(content)
+        return json.loads(content)['response']
+
+    data = call('raw-signal-data', [None, example], ['example-tab'])['raw-signal-data']['data']
+    payload_stats.clear()
+    call('raw-signal-graph.figure...', [data, 'FFT', 1024, 50])
+    design = ['BUTTER', 101, 'AUTO', [], 'FULL']
+    base = call('filtered-signal-graph.figure...', [1],
+                [data, 'LOWPASS', 3, None, 4, None, None, *design])['filtered-signal-base']['data']
+    call('filtered-signal-graph.figure...', [2], [data, 'LOWPASS', 4, None, 4, base, None, *design])
+    call('raw-signal-graph.figure@', [{'xaxis.range[0]': 1.0, 'xaxis.range[1]': 5.0}], [data])
+
+    for callback, sizes in payload_stats.snapshot().items():
+        print(f'{callback.strip("."):<60.60} {sizes["calls"]:>5} {sizes["raw_bytes"]:>10} {sizes["sent_bytes"]:>10}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--example', default='combined_sinus_2hz_5hz.csv')
+    parser.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.example)
+        return
+
+    for compact in ('false', 'true'):
+        print(f'COMPACT_TRANSPORT={compact}')
+        print(f'{"callback":<60} {"calls":>5} {"raw [B]":>10} {"sent [B]":>10}')
+        environment = dict(os.environ, COMPACT_TRANSPORT=compact, BACKGROUND_CALLBACKS='false')
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_payload', '--example', args.example, '--measure'],
+                       env=environment, check=True)
+
+
+if __name__ == '__main__':
+    main()
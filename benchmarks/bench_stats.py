@@ -0,0 +1,42 @@
+"""Compares SignalData.calculate_stats before and after the single-pass statistics engine.
+
+Run from the repository root: ``python -m benchmarks.bench_stats [--sizes 1e6 1e7 1e8]``
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from models.stats import calculate_stats
+
+
+def baseline_stats(samples: np.array) -> dict[str, float]:
+    signal_array = np.array(samples)
+    return {
+        'Mean': np.mean(signal_array),
+        'Median': np.median(signal_array),
+        'Std Dev': np.std(signal_array),
+        'Min': np.min(signal_array),
+        'Max': np.max(signal_array),
+        'Range': np.max(signal_array) - np.min(signal_array),
+        'RMS': np.sqrt(np.mean(np.square(signal_array))),
+        'Peak to Peak': np.max(signal_array) - np.min(signal_array)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e6, 1e7])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"samples":>12} {"baseline [s]":>14} {"single-pass [s]":>16} {"speedup":>8}')
+    for size in args.sizes:
+        samples = np.random.default_rng(0).normal(size=int(size))
+        baseline = min(timeit.repeat(lambda: baseline_stats(samples), number=1, repeat=args.repeat))
+        single_pass = min(timeit.repeat(lambda: calculate_stats(samples), number=1, repeat=args.repeat))
+        print(f'{int(size):>12} {baseline:>14.4f} {single_pass:>16.4f} {baseline / single_pass:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
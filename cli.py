@@ -0,0 +1,81 @@
+"""Filters sets of CSV files without the web interface and writes the filtered channels, statistics and spectra.
+
+Run from the repository root, for example:
+``python cli.py data/*.csv --filter-type LOWPASS --cutoff 10 --order 4 --output out [--format parquet] [--workers 8]``
+"""
+import argparse
+import os
+import sys
+import time
+
+from models import batch
+from models.batch import BatchSpec, OutputFormat
+from models.filtering import FilterFamily
+from models.spectrum import SpectralMode
+
+FILTER_TYPES = ['LOWPASS', 'HIGHPASS', 'BANDPASS', 'BANDSTOP']
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help='CSV files, directories or glob patterns')
+    parser.add_argument('--filter-type', choices=FILTER_TYPES, default='LOWPASS', type=str.upper)
+    parser.add_argument('--cutoff', nargs='+', type=float, required=True,
+                        help='cutoff frequency in Hz, the lower and upper one for band filters')
+    parser.add_argument('--order', type=int, default=4, help='filter order, the number of taps of FIR filters')
+    parser.add_argument('--design', choices=[family.name for family in FilterFamily], default=FilterFamily.BUTTER.name,
+                        type=str.upper)
+    parser.add_argument('--zero-phase', action='store_true', help='filter forward and backward')
+    parser.add_argument('--output', required=True, help='directory the results are written to')
+    parser.add_argument('--format', choices=[output_format.name.lower() for output_format in OutputFormat],
+                        default=OutputFormat.NPZ.name.lower())
+    parser.add_argument('--spectrum', choices=[SpectralMode.FFT.name, SpectralMode.WELCH.name],
+                        default=SpectralMode.WELCH.name, type=str.upper)
+    parser.add_argument('--nperseg', type=int, default=1024, help='segment length of Welch spectra')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processes the files run on')
+    args = parser.parse_args(argv)
+
+    if args.filter_type in ['BANDPASS', 'BANDSTOP'] and len(args.cutoff) != 2:
+        parser.error(f'{args.filter_type} takes a lower and an upper cutoff frequency')
+    if args.filter_type in ['LOWPASS', 'HIGHPASS'] and len(args.cutoff) != 1:
+        parser.error(f'{args.filter_type} takes a single cutoff frequency')
+    if args.format == OutputFormat.PARQUET.name.lower() and batch.pyarrow is None:
+        parser.error('parquet output requires pyarrow, install it or write npz files')
+    return args
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    paths = batch.expand(args.inputs)
+    if not paths:
+        print('No CSV files found', file=sys.stderr)
+        return 1
+
+    spec = BatchSpec(filter_type=args.filter_type, cutoffs=tuple(args.cutoff), order=args.order,
+                     output_dir=args.output, output_format=OutputFormat[args.format.upper()],
+                     spectral_mode=SpectralMode[args.spectrum], nperseg=args.nperseg, family=args.design,
+                     zero_phase=args.zero_phase)
+    started = time.perf_counter()
+    try:
+        results = batch.run(paths, spec, args.workers)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        if result.error:
+            print(f'FAILED {result.path}: {result.error}', file=sys.stderr)
+        else:
+            print(f'{result.path} -> {result.output} ({result.channels} x {result.samples} samples, '
+                  f'{result.seconds:.2f} s)')
+
+    processed = [result for result in results if not result.error]
+    samples = sum(result.samples * result.channels for result in processed)
+    print(f'{len(processed)}/{len(results)} files, {samples} samples in {elapsed:.2f} s with {args.workers} workers: '
+          f'{len(processed) / elapsed:.2f} files/s, {samples / elapsed:.3g} samples/s')
+    return 0 if len(processed) == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,18 @@
-import base64
-import io
 import os
+import uuid
 from typing import Any
 
 import dash_bootstrap_components as dbc
-import pandas as pd
-from dash import dcc, html, Output, Input, Dash, State
+from dash import dcc, html, Output, Input, Dash, State, ctx
+from flask import request, jsonify
 from pandas import DataFrame
 
-from components.dropdown import Dropdown
+from components.dropdown import Dropdown, Option
+from models import ingest
+from models.store import signal_store
+from models.stream import stream_registry, StreamSource
+from models.upload import upload_store
+from utils.metrics import metrics
 from utils.string import empty
 from utils.style import display_none, display_block, color
 
@@ -23,14 +27,16 @@ class FileSelector(dbc.Tab):
                 html.Div(
                     children=[
                         html.P('Upload a CSV file containing signal data:', className='mt-3'),
-                        dcc.Upload(
-                            id='upload-data',
-                            children=html.Div([
+                        # Files are sent in chunks by assets/upload.js, see DataSource.register_routes
+                        html.Div(
+                            id='upload-area',
+                            children=[
                                 'Drag and Drop or ',
                                 html.A('Select a CSV File')
-                            ]),
-                            className='upload-area',
-                            multiple=False),
+                            ],
+                            className='upload-area'),
+                        dbc.Progress(id='upload-progress', value=0, className='mt-2', style=display_none()),
+                        dcc.Store(id='upload-file')
                     ]),
             ])
 
@@ -50,11 +56,50 @@ class ExampleSelector(dbc.Tab):
             ])
 
 
+class StreamSelector(dbc.Tab):
+
+    def __init__(self, tab_id: str):
+        super().__init__(
+            label='Live Stream',
+            tab_id=tab_id,
+            children=[
+                html.Div(
+                    children=[
+                        html.P('Monitor lines of comma separated values as they are recorded:', className='mt-3'),
+                        dbc.Row(
+                            children=[
+                                dbc.Col(
+                                    Dropdown(
+                                        dropdown_id='stream-source',
+                                        options=[Option(source.value, source.name) for source in StreamSource],
+                                        value=StreamSource.UDP.name),
+                                    width=12, md=3),
+                                dbc.Col(
+                                    dcc.Input(
+                                        id='stream-address',
+                                        type='text',
+                                        placeholder='127.0.0.1:9999 or path of a CSV file',
+                                        className='form-control'),
+                                    width=12, md=5),
+                                dbc.Col(
+                                    children=[
+                                        dbc.Button('Connect', id='stream-connect', color='primary'),
+                                        dbc.Button('Disconnect', id='stream-disconnect', color='secondary',
+                                                   className='ms-2')
+                                    ],
+                                    width=12, md=4)
+                            ]),
+                        html.Div(id='stream-status', className='mt-2')
+                    ]),
+            ])
+
+
 class DataSource(dbc.Card):
 
     def __init__(self):
         self.__upload_tab = 'upload-tab'
         self.__example_tab = 'example-tab'
+        self.__stream_tab = 'stream-tab'
         self.__active_tab = self.__upload_tab
         super().__init__(
             children=[
@@ -62,13 +107,31 @@ class DataSource(dbc.Card):
                 dbc.CardBody(
                     children=[
                         dbc.Tabs(
-                            children=[FileSelector(self.__upload_tab), ExampleSelector(self.__example_tab)],
+                            children=[FileSelector(self.__upload_tab), ExampleSelector(self.__example_tab),
+                                      StreamSelector(self.__stream_tab)],
                             id='data-source-tabs',
                             active_tab=self.__active_tab),
                         html.Div(id='upload-output', className='mt-3')
                     ])
             ], className='app-card mb-4')
 
+    def register_routes(self, app: Dash) -> 'DataSource':
+        prefix = app.config.routes_pathname_prefix
+
+        @app.server.route(f'{prefix}upload', methods=['POST'])
+        def upload_create():
+            return jsonify(upload_id=upload_store.create(), received=0)
+
+        @app.server.route(f'{prefix}upload/<upload_id>', methods=['GET'])
+        def upload_status(upload_id):
+            return self.__upload_status(upload_id)
+
+        @app.server.route(f'{prefix}upload/<upload_id>', methods=['PUT'])
+        def upload_chunk(upload_id):
+            return self.__upload_chunk(upload_id)
+
+        return self
+
     def register_callbacks(self, app: Dash) -> 'DataSource':
 
         @app.callback(
@@ -83,12 +146,25 @@ class DataSource(dbc.Card):
              Output('upload-output', 'children'),
              Output('raw-signal-plot', 'style'),
              Output('signal-filtering', 'style')],
-            [Input('upload-data', 'contents'),
+            [Input('upload-file', 'data'),
              Input('example-dropdown', 'value')],
-            [State('upload-data', 'filename'),
-             State('data-source-tabs', 'active_tab')])
-        def process_data(upload_contents, example_filename, upload_filename, active_tab):
-            return self.__process_data(upload_contents, example_filename, upload_filename, active_tab)
+            State('data-source-tabs', 'active_tab'))
+        def process_data(upload_file, example_filename, active_tab):
+            return self.__process_data(upload_file, example_filename, active_tab)
+
+        @app.callback(
+            [Output('stream-data', 'data'),
+             Output('stream-status', 'children'),
+             Output('stream-plot', 'style'),
+             Output('stream-interval', 'disabled')],
+            [Input('stream-connect', 'n_clicks'),
+             Input('stream-disconnect', 'n_clicks')],
+            [State('stream-source', 'value'),
+             State('stream-address', 'value'),
+             State('stream-data', 'data')],
+            prevent_initial_call=True)
+        def connect_stream(connect_clicks, disconnect_clicks, source, address, data):
+            return self.__connect_stream(ctx.triggered_id, source, address, data)
 
         return self
 
@@ -101,31 +177,70 @@ class DataSource(dbc.Card):
             return []
         return [{'label': file, 'value': file} for file in os.listdir(examples) if file.endswith('.csv')]
 
-    def __process_data(self, upload_contents, example_filename, upload_filename, active_tab):
+    @staticmethod
+    def __connect_stream(triggered_id, source, address, data):
+        try:
+            if triggered_id == 'stream-disconnect':
+                return {}, html.P('Disconnected'), display_none(), True
+            if not source or not address:
+                raise ValueError('Select a source and enter its address')
+            subscriber = uuid.uuid4().hex
+            stream = stream_registry.open(StreamSource[source], address.strip(), subscriber)
+            return {'stream_id': stream.stream_id, 'subscriber': subscriber}, html.P(
+                f'Receiving from {stream.source.value.lower()} {stream.address}'), display_block(), False
+        except Exception as e:
+            return {}, html.P(f'An error occurred: {str(e)}', style=color('red')), display_none(), True
+        finally:
+            # Released after the new subscription is taken, so that reconnecting to the same stream keeps it running
+            if data:
+                stream_registry.close(data['stream_id'], data['subscriber'])
+
+    @staticmethod
+    def __upload_status(upload_id):
+        try:
+            if not upload_store.exists(upload_id):
+                return jsonify(error=f'Unknown or expired upload: {upload_id}'), 404
+            return jsonify(received=upload_store.received(upload_id))
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+
+    @staticmethod
+    def __upload_chunk(upload_id):
+        try:
+            upload_store.path(upload_id)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+
+        try:
+            offset = int(request.args.get('offset', 0))
+            return jsonify(received=upload_store.write(upload_id, offset, request.stream))
+        except ValueError as e:
+            return jsonify(error=str(e), received=upload_store.received(upload_id)), 409
+
+    def __process_data(self, upload_file, example_filename, active_tab):
         try:
-            if active_tab == self.__upload_tab and upload_contents:
-                df, filename = self.__load_data_from_file(upload_contents, upload_filename)
+            if active_tab == self.__upload_tab and upload_file:
+                source, filename, source_key = self.__load_data_from_file(upload_file)
 
             elif active_tab == self.__example_tab and example_filename:
-                df, filename = self.__load_data_from_example(example_filename)
+                source, filename, source_key = self.__load_data_from_example(example_filename)
             else:
                 return {}, empty(), display_none(), display_none()
 
-            if len(df.columns) >= 2:
-                data = self.__extract_data(df, filename)
-
+            data = signal_store.lookup(source_key, filename) or self.__parse_data(source, filename, source_key)
+            if data:
                 return data, html.Div(
                     children=[
                         html.P(f'File {filename} loaded successfully!'),
-                        html.P(f'Data shape: {df.shape[0]} rows, {df.shape[1]} columns'),
-                        html.P(f'Columns: {", ".join(df.columns)}')
+                        html.P(f'Data shape: {data["shape"][0]} rows, {data["shape"][1]} columns'),
+                        html.P(f'Columns: {", ".join(data["columns"])}')
                     ]), display_block(), display_block()
             else:
                 return {}, html.Div(
                     children=[
                         html.P('The CSV file must have at least two columns:'),
                         html.P('1. X-axis data (e.g., time)'),
-                        html.P('2. Signal data')
+                        html.P('2. Signal data, every further numeric column is another channel')
                     ],
                     style=color('red')), display_none(), display_none()
 
@@ -136,26 +251,44 @@ class DataSource(dbc.Card):
                 ],
                 style=color('red')), display_none(), display_none()
 
+    @metrics.span('csv_parse')
+    def __parse_data(self, source: str, filename: str, source_key: str) -> dict[str, Any]:
+        columns = ingest.read_columns(source)
+        if len(columns) < 2:
+            return {}
+
+        signal_columns = ingest.numeric_columns(source)
+        if columns[0] not in signal_columns:
+            raise ValueError(f'The x-axis column {columns[0]} must hold numbers')
+        if len(signal_columns) < 2:
+            return {}
+
+        data = self.__extract_data(ingest.read_signal_csv(source, usecols=signal_columns), filename, columns)
+        signal_store.alias(source_key, data)
+        return data
+
     @staticmethod
-    def __extract_data(df: DataFrame, filename: str) -> dict[str, Any]:
-        return {
-            'filename': filename,
-            'x_data': df.iloc[:, 0],
-            'y_data': df.iloc[:, 1],
-            'x_label': df.columns[0],
-            'y_label': df.columns[1],
-            'shape': (df.shape[0], df.shape[1]),
-            'columns': df.columns
-        }
+    def __extract_data(df: DataFrame, filename: str, columns: list[str]) -> dict[str, Any]:
+        channel_labels = df.columns[1:].tolist()
+        return signal_store.put(
+            filename=filename,
+            x_data=df.iloc[:, 0].to_numpy(),
+            y_data=df.iloc[:, 1:].to_numpy().T,
+            x_label=df.columns[0],
+            y_label=channel_labels[0] if len(channel_labels) == 1 else 'Signal',
+            shape=(df.shape[0], len(columns)),
+            columns=columns,
+            channel_labels=channel_labels)
 
     @staticmethod
-    def __load_data_from_file(upload_contents, upload_filename) -> tuple[DataFrame, str]:
-        content_type, content_string = upload_contents.split(',')
-        decoded = base64.b64decode(content_string)
-        return pd.read_csv(io.StringIO(decoded.decode('utf-8'))), upload_filename
+    def __load_data_from_file(upload_file: dict[str, Any]) -> tuple[str, str, str]:
+        path = upload_store.path(upload_file['upload_id'])
+        if upload_store.received(upload_file['upload_id']) != upload_file['size']:
+            raise FileNotFoundError(f'Upload of {upload_file["filename"]} is incomplete or has expired')
+        return path, upload_file['filename'], ingest.content_key(path)
 
     @staticmethod
-    def __load_data_from_example(example_filename) -> tuple[DataFrame, str]:
+    def __load_data_from_example(example_filename) -> tuple[str, str, str]:
         examples = os.path.join(os.getcwd(), 'assets/examples')
         file_path = os.path.join(examples, example_filename)
-        return pd.read_csv(file_path), example_filename
+        return file_path, example_filename, ingest.file_key(file_path)
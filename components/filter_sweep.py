@@ -0,0 +1,194 @@
+import dash_bootstrap_components as dbc
+import numpy as np
+from dash import dcc, html, Dash, Output, Input, State
+from dash.exceptions import PreventUpdate
+
+from components.dropdown import Dropdown
+from models import sweep
+from models.filtering import FilterFamily, FilterRate
+from models.figure import SignalFigure
+from models.sweep import SweepResult
+from utils import background, figure, string, style
+from utils.metrics import metrics
+
+# Statistics compared across the settings of a sweep, of the first channel
+SWEEP_STATS = ['RMS', 'Std Dev', 'Peak to Peak']
+MAX_SETTINGS = 64
+# Highest order of the filter-order dropdown, which a chosen setting is applied through
+MAX_ORDER = 20
+
+
+class FilterSweep(html.Div):
+    """Applies a grid of cutoff frequencies and filter orders at once and compares the results.
+
+    Choosing a setting of the sweep applies it as the current filter, which filters the signal again: the sweep keeps
+    the statistics and spectra of its settings only.
+    """
+
+    def __init__(self):
+        super().__init__(
+            id='filter-sweep',
+            children=[
+                html.Hr(),
+                dbc.Row(
+                    children=[
+                        dbc.Col(
+                            children=[
+                                html.Label('Sweep Cutoff Frequencies (Hz):'),
+                                dcc.Input(
+                                    id='sweep-cutoffs',
+                                    type='text',
+                                    placeholder='e.g. 1, 2, 5',
+                                    className='form-control')
+                            ],
+                            width=12, md=4),
+                        dbc.Col(
+                            children=[
+                                html.Label('Sweep Filter Orders:'),
+                                dcc.Input(
+                                    id='sweep-orders',
+                                    type='text',
+                                    placeholder='e.g. 2, 4, 8',
+                                    className='form-control')
+                            ],
+                            width=12, md=4),
+                        dbc.Col(
+                            children=[
+                                html.Label('Apply Setting:'),
+                                Dropdown(dropdown_id='sweep-setting', options=[])
+                            ],
+                            width=12, md=4)
+                    ],
+                    className='mb-3'),
+                dbc.Button(
+                    'Run Sweep',
+                    id='run-sweep',
+                    color='primary',
+                    className='apply-button mb-3'),
+                dbc.Progress(
+                    id='sweep-progress',
+                    value=0,
+                    style=style.display_none(),
+                    className='mb-3'),
+                html.Div(
+                    id='sweep-results-container',
+                    style=style.display_none(),
+                    children=[
+                        dcc.Graph(
+                            id='sweep-graph',
+                            figure={},
+                            className='graph-container'),
+                        html.Div(id='sweep-results', className='stats-table')
+                    ]),
+                html.Hr()
+            ])
+
+    def register_callbacks(self, app: Dash) -> 'FilterSweep':
+        @background.callback(
+            app,
+            [Output('sweep-graph', 'figure'),
+             Output('sweep-results', 'children'),
+             Output('sweep-results-container', 'style'),
+             Output('sweep-setting', 'options'),
+             Output('sweep-setting', 'value')],
+            [Input('run-sweep', 'n_clicks')],
+            [State('raw-signal-data', 'data'),
+             State('filter-type', 'value'),
+             State('cutoff-freq-range', 'value'),
+             State('sweep-cutoffs', 'value'),
+             State('sweep-orders', 'value')],
+            progress=[Output('sweep-progress', 'value'),
+                      Output('sweep-progress', 'label')],
+            running=[(Output('run-sweep', 'disabled'), True, False),
+                     (Output('sweep-progress', 'style'), style.display_block(), style.display_none())])
+        def run_sweep(set_progress, n_clicks, data, filter_type, cutoff_freq_range, cutoffs, orders):
+            return self.__run_sweep(set_progress, n_clicks, data, filter_type, cutoff_freq_range, cutoffs, orders)
+
+        @app.callback(
+            [Output('cutoff-freq', 'value'),
+             Output('filter-order', 'value'),
+             Output('filter-design', 'value'),
+             Output('filter-zero-phase', 'value'),
+             Output('filter-rate', 'value'),
+             Output('apply-filter', 'n_clicks')],
+            [Input('sweep-setting', 'value')],
+            [State('apply-filter', 'n_clicks')],
+            prevent_initial_call=True)
+        def apply_setting(setting, n_clicks):
+            return self.__apply_setting(setting, n_clicks)
+
+        return self
+
+    def __run_sweep(self, set_progress, n_clicks, data, filter_type, cutoff_freq_range, cutoffs, orders):
+        if not n_clicks or not data:
+            raise PreventUpdate
+
+        try:
+            cutoffs = self.parse_values(cutoffs, float)
+            orders = self.parse_values(orders, int, MAX_ORDER)
+            if len(cutoffs) * len(orders) > MAX_SETTINGS:
+                raise ValueError(f'A sweep is limited to {MAX_SETTINGS} settings')
+
+            # Band filters sweep the lower cutoff with the upper one fixed
+            band = filter_type not in ['LOWPASS', 'HIGHPASS']
+            cutoff_grid = [[cutoff, cutoff_freq_range] if band else [cutoff] for cutoff in cutoffs]
+
+            set_progress((20, f'Filtering {len(cutoff_grid) * len(orders)} settings'))
+            results = sweep.sweep(data, filter_type, cutoff_grid, orders)
+
+            set_progress((90, 'Spectra'))
+            options = [{'label': self.__label(result), 'value': f'{result.cutoffs[0]}|{result.order}'}
+                       for result in results]
+            return (self.__set_up_figure(results).figure, self.__create_results_table(results),
+                    style.display_block(), options, None)
+
+        except Exception as e:
+            error_fig = figure.empty(f'Error running sweep: {str(e)}')
+            return error_fig, html.P(f'Error: {str(e)}', style=style.color('red')), style.display_block(), [], None
+
+    @staticmethod
+    def __apply_setting(setting, n_clicks):
+        if not setting:
+            raise PreventUpdate
+        cutoff, order = setting.split('|')
+        # The sweep runs causal Butterworth filters at the full rate, so the setting is applied as one
+        return float(cutoff), int(order), FilterFamily.BUTTER.name, [], FilterRate.FULL.name, (n_clicks or 0) + 1
+
+    @staticmethod
+    def parse_values(text: str, value_type: type, maximum: float = None) -> list:
+        """Distinct positive values of a comma separated list, up to ``maximum`` if given, in the order given."""
+        values = [value_type(value) for value in (text or string.empty()).replace(';', ',').split(',')
+                  if value.strip()]
+        if not values or any(value <= 0 for value in values):
+            raise ValueError('Enter a comma separated list of positive values')
+        if maximum is not None and any(value > maximum for value in values):
+            raise ValueError(f'Enter values of at most {maximum:g}')
+        return list(dict.fromkeys(values))
+
+    @staticmethod
+    def __label(result: SweepResult) -> str:
+        return f'{" - ".join(f"{cutoff:g}" for cutoff in result.cutoffs)} Hz, order {result.order}'
+
+    @metrics.span('figure')
+    def __set_up_figure(self, results: list[SweepResult]) -> SignalFigure:
+        fig = SignalFigure(rows=1, cols=1, subplot_titles=['Power Spectral Density per Setting'])
+        for index, result in enumerate(results):
+            fig.add_trace(result.freq, np.atleast_2d(result.psd)[0], figure.channel_color(index), row=1, col=1,
+                          show_legend=True, name=self.__label(result))
+        fig.update_x_axis('Frequency (Hz)', row=1, col=1)
+        fig.update_y_axis('PSD', title_standoff=5, row=1, col=1, log=True)
+        return fig
+
+    def __create_results_table(self, results: list[SweepResult]) -> html.Table:
+        return html.Table(
+            children=[
+                html.Thead(html.Tr([html.Th('Setting')] + [html.Th(name) for name in SWEEP_STATS])),
+                html.Tbody(
+                    children=[
+                        html.Tr(
+                            children=[html.Td(self.__label(result))] + [
+                                html.Td(f'{np.atleast_1d(result.stats[name])[0]:.4g}') for name in SWEEP_STATS
+                            ])
+                        for result in results
+                    ])
+            ], className='table table-sm table-striped')
@@ -7,8 +7,9 @@ class Footer(html.Footer):
         super().__init__(
             children=[
                 html.P(
-                    'Note: The CSV file should have columns for time/x-axis and signal values. \
-                    The application will use the first column as x-axis data and the second column as signal data.',
+                    'Note: The CSV file should have columns for time/x-axis and signal values. '
+                    'The application will use the first column as x-axis data and every further numeric column as a '
+                    'signal channel.',
                     className='text-muted')
             ],
             className='app-footer')
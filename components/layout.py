@@ -5,6 +5,7 @@ from components.datasource import DataSource
 from components.footer import Footer
 from components.signal_filtering import SignalFiltering
 from components.signal_plot import SignalPlot
+from components.stream_plot import StreamPlot
 
 
 class Layout(dbc.Container):
@@ -15,14 +16,16 @@ class Layout(dbc.Container):
                 html.Div(
                     children=[
                         html.Hr(),
-                        DataSource().register_callbacks(app),
+                        DataSource().register_routes(app).register_callbacks(app),
                         html.Div(
                             children=[
-                                SignalPlot(plot_id='raw-signal').register_callbacks(app),
-                                SignalFiltering().register_callbacks(app)
+                                SignalPlot(plot_id='raw-signal', spectral_controls=True).register_callbacks(app),
+                                SignalFiltering().register_callbacks(app),
+                                StreamPlot().register_callbacks(app)
                             ]),
                         Footer()],
                     className='dash-container'),
 
-                dcc.Store(id='raw-signal-data')],
+                dcc.Store(id='raw-signal-data'),
+                dcc.Store(id='stream-data')],
             fluid=True)
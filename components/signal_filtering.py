@@ -1,16 +1,29 @@
+import time
 from enum import Enum
+from typing import Any, NamedTuple
 
 import dash_bootstrap_components as dbc
 import numpy as np
-from dash import dcc, html, Dash, Output, Input, State
-from scipy import signal
+from dash import dcc, html, Dash, Output, Input, State, Patch
 
 from components.dropdown import Dropdown, Option
+from components.filter_sweep import FilterSweep, MAX_ORDER
 from components.signal_plot import SignalPlot
 from components.signal_stats import SignalStats
+from models import compute, filtering
 from models.data import LoadedSignalData, FilteredSignalData
 from models.figure import SignalFigure
-from utils import figure, string, style
+from models.filtering import FilterFamily, FilterMethod, FilterRate
+from models.store import signal_store
+from utils import background, figure, string, style, transport
+from utils.metrics import metrics
+from utils.decimation import Decimation, decimate
+from utils.env import MAX_POINTS_PER_TRACE, DECIMATION
+
+
+# Trace uids of the filtered channels, by which their data is replaced when only the filter changes
+FILTERED_SIGNAL_UID = 'filtered-signal-{}'
+FILTERED_SPECTRUM_UID = 'filtered-spectrum-{}'
 
 
 class FilterType(Enum):
@@ -20,9 +33,24 @@ class FilterType(Enum):
     BANDSTOP = 'Band stop'
 
 
+class FilterResult(NamedTuple):
+    """What applying a filter to a signal computed, kept in ``filtering.result_cache``."""
+    data: dict[str, Any]
+    signal: FilteredSignalData
+    stats: dict[str, float | np.ndarray]
+    # Method the filter ran with and its runtime, None if the output was loaded from the store
+    method: FilterMethod | None = None
+    seconds: float = 0.0
+    # Decimation factor of multirate filtering and the relative deviation from the full-rate output
+    factor: int = 1
+    error: float = 0.0
+    figure: dict[str, Any] | None = None
+
+
 class SignalFiltering(dbc.Card):
 
     def __init__(self):
+        self.__sweep = FilterSweep()
         super().__init__(
             id='signal-filtering',
             style=style.display_none(),
@@ -77,11 +105,80 @@ class SignalFiltering(dbc.Card):
                                 # Filter order
                                 dbc.Col(
                                     children=[
-                                        html.Label('Filter Order:'),
+                                        html.Div(
+                                            id='filter-order-container',
+                                            children=[
+                                                html.Label('Filter Order:'),
+                                                Dropdown(
+                                                    dropdown_id='filter-order',
+                                                    options=[Option(i, i) for i in range(0, MAX_ORDER + 1)],
+                                                    value=4)
+                                            ])
+                                    ],
+                                    width=12, md=3)
+                            ],
+                            className='mb-3'),
+                        dbc.Row(
+                            children=[
+                                dbc.Col(
+                                    children=[
+                                        html.Label('Filter Design:'),
                                         Dropdown(
-                                            dropdown_id='filter-order',
-                                            options=[Option(i, i) for i in range(0, 21)],
-                                            value=4)
+                                            dropdown_id='filter-design',
+                                            options=[Option(family.value, family.name) for family in
+                                                     list(FilterFamily)],
+                                            value=FilterFamily.BUTTER.name)
+                                    ],
+                                    width=12, md=3),
+                                dbc.Col(
+                                    children=[
+                                        html.Div(
+                                            id='filter-taps-container',
+                                            style=style.display_none(),
+                                            children=[
+                                                html.Label('Number of Taps:'),
+                                                dcc.Input(
+                                                    id='filter-taps',
+                                                    type='number',
+                                                    min=3,
+                                                    step=2,
+                                                    value=101,
+                                                    className='form-control')
+                                            ])
+                                    ],
+                                    width=12, md=3),
+                                dbc.Col(
+                                    children=[
+                                        html.Div(
+                                            id='filter-method-container',
+                                            style=style.display_none(),
+                                            children=[
+                                                html.Label('Convolution:'),
+                                                Dropdown(
+                                                    dropdown_id='filter-method',
+                                                    options=[Option(method.value, method.name) for method in
+                                                             list(FilterMethod) if method != FilterMethod.SOS],
+                                                    value=FilterMethod.AUTO.name)
+                                            ])
+                                    ],
+                                    width=12, md=3),
+                                dbc.Col(
+                                    children=[
+                                        html.Label('Sample Rate:'),
+                                        Dropdown(
+                                            dropdown_id='filter-rate',
+                                            options=[Option(rate.value, rate.name) for rate in list(FilterRate)],
+                                            value=FilterRate.FULL.name)
+                                    ],
+                                    width=12, md=3),
+                                dbc.Col(
+                                    children=[
+                                        html.Label('Phase:'),
+                                        dcc.Checklist(
+                                            id='filter-zero-phase',
+                                            options=[{'label': ' Zero phase (forward-backward)',
+                                                      'value': 'zero-phase'}],
+                                            value=[])
                                     ],
                                     width=12, md=3)
                             ],
@@ -92,8 +189,25 @@ class SignalFiltering(dbc.Card):
                             id='apply-filter',
                             color='primary',
                             className='apply-button mb-3'),
+                        dbc.Button(
+                            'Cancel',
+                            id='cancel-filter',
+                            color='secondary',
+                            style=style.display_none(),
+                            className='apply-button mb-3 ms-2'),
+                        dbc.Progress(
+                            id='filter-progress',
+                            value=0,
+                            style=style.display_none(),
+                            className='mb-3'),
+                        # Method the filter was applied with and its runtime
+                        html.Div(id='filter-info', className='mb-3'),
 
-                        SignalPlot(plot_id='filtered-signal')
+                        self.__sweep,
+                        SignalPlot(plot_id='filtered-signal'),
+                        dcc.Store(id='filtered-signal-data'),
+                        # Handle of the signal whose raw traces the filtered graph holds and its trace indices by uid
+                        dcc.Store(id='filtered-signal-base')
                     ])
             ],
             className='app-card')
@@ -112,18 +226,56 @@ class SignalFiltering(dbc.Card):
             return self.__toggle_cutoff_range_input(filter_type)
 
         @app.callback(
+            [Output('filter-order-container', 'style'),
+             Output('filter-taps-container', 'style'),
+             Output('filter-method-container', 'style')],
+            [Input('filter-design', 'value')])
+        def toggle_design_inputs(filter_design):
+            return self.__toggle_design_inputs(filter_design)
+
+        @background.callback(
+            app,
             [Output('filtered-signal-graph', 'figure'),
              Output('filtered-signal-stats', 'children'),
-             Output('filtered-signal-plot', 'style')],
+             Output('filtered-signal-plot', 'style'),
+             Output('filtered-signal-data', 'data'),
+             Output('filtered-signal-base', 'data'),
+             Output('filter-info', 'children')],
             [Input('apply-filter', 'n_clicks')],
             [State('raw-signal-data', 'data'),
              State('filter-type', 'value'),
              State('cutoff-freq', 'value'),
              State('cutoff-freq-range', 'value'),
-             State('filter-order', 'value')])
-        def apply_filter(n_clicks, data, filter_type, cutoff_freq, cutoff_freq_range, filter_order):
-            return self.__apply_filter(n_clicks, data, filter_type, cutoff_freq, cutoff_freq_range, filter_order)
+             State('filter-order', 'value'),
+             State('filtered-signal-base', 'data'),
+             State('filtered-signal-graph', 'relayoutData'),
+             State('filter-design', 'value'),
+             State('filter-taps', 'value'),
+             State('filter-method', 'value'),
+             State('filter-zero-phase', 'value'),
+             State('filter-rate', 'value')],
+            progress=[Output('filter-progress', 'value'),
+                      Output('filter-progress', 'label')],
+            cancel=[Input('cancel-filter', 'n_clicks')],
+            running=[(Output('apply-filter', 'disabled'), True, False),
+                     (Output('cancel-filter', 'style'), style.display_inline_block(), style.display_none()),
+                     (Output('filter-progress', 'style'), style.display_block(), style.display_none())])
+        def apply_filter(set_progress, n_clicks, data, filter_type, cutoff_freq, cutoff_freq_range, filter_order,
+                         base, relayout_data, filter_design, filter_taps, filter_method, zero_phase, filter_rate):
+            return self.__apply_filter(set_progress, n_clicks, data, filter_type, cutoff_freq, cutoff_freq_range,
+                                       filter_order, base, relayout_data, filter_design, filter_taps, filter_method,
+                                       zero_phase, filter_rate)
+
+        @app.callback(
+            Output('filtered-signal-graph', 'figure', allow_duplicate=True),
+            Input('filtered-signal-graph', 'relayoutData'),
+            [State('raw-signal-data', 'data'),
+             State('filtered-signal-data', 'data')],
+            prevent_initial_call=True)
+        def zoom_graph(relayout_data, data, filtered_data):
+            return SignalPlot.create_zoom_patch(relayout_data, [data, filtered_data])
 
+        self.__sweep.register_callbacks(app)
         return self
 
     @staticmethod
@@ -150,44 +302,133 @@ class SignalFiltering(dbc.Card):
         else:
             return style.display_none()
 
-    def __apply_filter(self, n_clicks, data, filter_type, cutoff_freq, cutoff_freq_range, filter_order):
+    @staticmethod
+    def __toggle_design_inputs(filter_design):
+        if filter_design == FilterFamily.FIR.name:
+            return style.display_none(), style.display_block(), style.display_block()
+        return style.display_block(), style.display_none(), style.display_none()
+
+    def __apply_filter(self, set_progress, n_clicks, data, filter_type, cutoff_freq, cutoff_freq_range, filter_order,
+                       base=None, relayout_data=None, filter_design=None, filter_taps=None, filter_method=None,
+                       zero_phase=None, filter_rate=None):
         if not n_clicks or not data:
-            return figure.empty('No data loaded yet!'), string.empty(), style.display_none()
+            return figure.empty('No data loaded yet!'), string.empty(), style.display_none(), {}, None, string.empty()
 
         try:
-            loaded_signal_data = LoadedSignalData(**data)
+            set_progress((10, 'Loading'))
+            loaded_signal_data = signal_store.load(data)
+            family = FilterFamily[filter_design or FilterFamily.BUTTER.name]
+            order = filter_taps if family == FilterFamily.FIR else filter_order
+            key = self.__design_key(cutoff_freq, cutoff_freq_range, order, filter_type, family, loaded_signal_data)
+            zero_phase = bool(zero_phase)
+            rate = FilterRate[filter_rate or FilterRate.FULL.name]
+            cache_key = (data['handle'], key, zero_phase, rate)
+            result = filtering.result_cache.get(cache_key)
+            cached = result is not None
+            if result is None:
+                method = FilterMethod[filter_method or FilterMethod.AUTO.name]
+                result = self.__filter(set_progress, loaded_signal_data, key, method, zero_phase, rate, filter_type,
+                                       cutoff_freq, cutoff_freq_range, order)
 
-            filtered_signal = self.__filter(cutoff_freq, cutoff_freq_range, filter_order, filter_type,
-                                            loaded_signal_data)
-            filtered_signal_data = FilteredSignalData(x_data=loaded_signal_data.x_data, y_data=filtered_signal,
-                                                      x_label=loaded_signal_data.x_label,
-                                                      y_label=loaded_signal_data.y_label, filter_type=filter_type,
-                                                      cutoff_freq=cutoff_freq,
-                                                      cutoff_freq_range=cutoff_freq_range, filter_order=filter_order)
-            filtered_stats_component = SignalStats.create_stats_component(filtered_signal_data.calculate_stats())
+            set_progress((85, 'Spectra'))
+            fig = None
+            if base and base['handle'] == data['handle']:
+                # The graph already holds the layout and raw traces of this signal, only the filtered ones change
+                fig = self.create_filtered_patch(result.data, result.signal, base['traces'], relayout_data)
+            changed = not cached
+            if fig is None:
+                if result.figure is None:
+                    result = result._replace(figure=self.__set_up_figure(loaded_signal_data,
+                                                                         result.signal).figure.to_dict())
+                    changed = True
+                fig = result.figure
+                base = {'handle': data['handle'], 'traces': figure.trace_indices(fig)}
+            # Cached once the figure is drawn, so that the size of the entry includes the spectrum it computed
+            if changed:
+                filtering.result_cache.put(cache_key, result)
 
-            fig = self.__set_up_figure(loaded_signal_data, filtered_signal_data)
-
-            return fig.figure, filtered_stats_component, style.display_block()
+            filtered_stats_component = SignalStats.create_stats_component(result.stats, result.signal.channel_labels)
+            return (fig, filtered_stats_component, style.display_block(), result.data, base,
+                    self.__create_filter_info(result, zero_phase, cached))
 
         except Exception as e:
             error_fig = figure.empty(f'Error applying filter: {str(e)}')
-            return error_fig, html.P(f'Error: {str(e)}', style=style.color('red')), style.display_block()
+            return (error_fig, html.P(f'Error: {str(e)}', style=style.color('red')), style.display_block(), {}, None,
+                    string.empty())
+
+    @staticmethod
+    def __create_filter_info(result: FilterResult, zero_phase: bool, cached: bool) -> html.Small:
+        phase = 'zero phase' if zero_phase else 'causal'
+        if result.method is None:
+            info = f'Filter output ({phase}) loaded from the signal store'
+        else:
+            info = f'Filtered by {result.method.value} ({phase}) in {result.seconds * 1000:.1f} ms'
+            if result.factor > 1:
+                info += (f' at 1/{result.factor} of the sample rate, deviating by {result.error:.2%} RMS from the '
+                         f'full-rate output')
+        return html.Small(info + (', served from the result cache' if cached else ''), className='text-muted')
+
+    @staticmethod
+    def create_filtered_patch(filtered_data: dict, filtered_signal_data: FilteredSignalData, indices: dict[str, int],
+                              relayout_data: dict = None) -> Patch | None:
+        """Replaces the data of the filtered traces, at the index ``indices`` holds for their uid.
+
+        The uids are those ``__set_up_figure`` gives the traces; None if any of them is missing. The time domain traces
+        cover the x-range of the last zoom of the time axis, or all data if the last relayout event did not change it.
+        """
+        channels = len(filtered_signal_data.channel_labels)
+        uids = [(FILTERED_SIGNAL_UID.format(channel), FILTERED_SPECTRUM_UID.format(channel))
+                for channel in range(channels)]
+        if any(uid not in indices for pair in uids for uid in pair):
+            return None
+
+        x_range = figure.x_range(relayout_data) or (None, None)
+        x_data, y_data = signal_store.load_pyramid(filtered_data).query(*x_range, max_points=MAX_POINTS_PER_TRACE)
+        spectral_result = filtered_signal_data.spectral_analyze_result
+        magnitudes = np.atleast_2d(spectral_result.fft_magnitude)
+
+        patch = Patch()
+        x_array = transport.typed_array(transport.compact_axis(x_data))
+        for (signal_uid, spectrum_uid), samples, magnitude in zip(uids, np.atleast_2d(y_data), magnitudes):
+            patch['data'][indices[signal_uid]]['x'] = x_array
+            patch['data'][indices[signal_uid]]['y'] = transport.typed_array(transport.compact(samples))
+            freq, magnitude = decimate(spectral_result.fft_freq, magnitude, MAX_POINTS_PER_TRACE,
+                                       Decimation[DECIMATION])
+            patch['data'][indices[spectrum_uid]]['x'] = transport.typed_array(transport.compact_axis(freq))
+            patch['data'][indices[spectrum_uid]]['y'] = transport.typed_array(transport.compact(magnitude))
+        return patch
 
     @staticmethod
+    @metrics.span('figure')
     def __set_up_figure(loaded_signal_data: LoadedSignalData, filtered_signal_data: FilteredSignalData):
         fig = SignalFigure(rows=2, cols=1, subplot_titles=['Time Domain Comparison', 'Frequency Domain Comparison'])
 
-        fig.add_trace(x_data=loaded_signal_data.x_data, y_data=loaded_signal_data.y_data, color='blue', row=1, col=1,
-                      show_legend=True, name='Raw Signal')
-        fig.add_trace(x_data=loaded_signal_data.x_data, y_data=filtered_signal_data.y_data, color='green', row=1, col=1,
-                      show_legend=True, name='Filtered Signal')
-        fig.add_trace(x_data=loaded_signal_data.spectral_analyze_result.fft_freq,
-                      y_data=loaded_signal_data.spectral_analyze_result.fft_magnitude, color='blue', row=2, col=1,
-                      show_legend=True, name='Raw Spectrum')
-        fig.add_trace(x_data=filtered_signal_data.spectral_analyze_result.fft_freq,
-                      y_data=filtered_signal_data.spectral_analyze_result.fft_magnitude, color='green', row=2, col=1,
-                      show_legend=True, name='Filtered Spectrum')
+        labels = loaded_signal_data.channel_labels
+        single = len(labels) == 1
+        raw_magnitudes = np.atleast_2d(loaded_signal_data.spectral_analyze_result.fft_magnitude)
+        filtered_magnitudes = np.atleast_2d(filtered_signal_data.spectral_analyze_result.fft_magnitude)
+
+        # Time domain traces come first, raw channels before filtered ones, as SignalPlot.create_zoom_patch expects
+        for channel, label in enumerate(labels):
+            fig.add_trace(x_data=loaded_signal_data.x_data, y_data=loaded_signal_data.channels[channel],
+                          color='blue' if single else figure.channel_color(channel), row=1, col=1, show_legend=True,
+                          name='Raw Signal' if single else f'Raw {label}', opacity=None if single else 0.4)
+        for channel, label in enumerate(labels):
+            fig.add_trace(x_data=filtered_signal_data.x_data, y_data=filtered_signal_data.channels[channel],
+                          color='green' if single else figure.channel_color(channel), row=1, col=1, show_legend=True,
+                          name='Filtered Signal' if single else f'Filtered {label}',
+                          uid=FILTERED_SIGNAL_UID.format(channel))
+        for channel, label in enumerate(labels):
+            fig.add_trace(x_data=loaded_signal_data.spectral_analyze_result.fft_freq, y_data=raw_magnitudes[channel],
+                          color='blue' if single else figure.channel_color(channel), row=2, col=1,
+                          show_legend=single, name='Raw Spectrum' if single else f'Raw {label}',
+                          opacity=None if single else 0.4)
+        for channel, label in enumerate(labels):
+            fig.add_trace(x_data=filtered_signal_data.spectral_analyze_result.fft_freq,
+                          y_data=filtered_magnitudes[channel],
+                          color='green' if single else figure.channel_color(channel), row=2, col=1,
+                          show_legend=single, name='Filtered Spectrum' if single else f'Filtered {label}',
+                          uid=FILTERED_SPECTRUM_UID.format(channel))
 
         fig.update_x_axis(title=loaded_signal_data.x_label, row=1, col=1)
         fig.update_x_axis(title='Frequency (Hz)', row=2, col=1)
@@ -197,17 +438,57 @@ class SignalFiltering(dbc.Card):
         return fig
 
     @staticmethod
-    def __filter(cutoff_freq, cutoff_freq_range, filter_order, filter_type, loaded_signal_data):
-        if len(loaded_signal_data.x_data) > 1:
-            fs = 1.0 / np.mean(np.diff(loaded_signal_data.x_data)).astype(float)
+    def __design_key(cutoff_freq, cutoff_freq_range, filter_order, filter_type, family, loaded_signal_data):
+        fs = filtering.sample_rate(loaded_signal_data.x_data)
+        if filter_type in [FilterType.LOWPASS.name, FilterType.HIGHPASS.name]:
+            cutoffs = [cutoff_freq]
         else:
-            fs = 1.0
+            cutoffs = [cutoff_freq, cutoff_freq_range]
+        return filtering.design_key(filter_order, cutoffs, fs, btype=filter_type, family=family.name)
 
-        nyquist = 0.5 * fs
-        if filter_type in [FilterType.LOWPASS.name, FilterType.HIGHPASS.name]:
-            wn = cutoff_freq / nyquist
+    @staticmethod
+    def __filter(set_progress, loaded_signal_data, key, method, zero_phase, rate, filter_type, cutoff_freq,
+                 cutoff_freq_range, filter_order) -> FilterResult:
+        """Filters the signal, or loads its output from the store if the filter was applied before."""
+        set_progress((20, 'Filtering'))
+        result_key = filtering.result_key(loaded_signal_data.key, key, zero_phase, rate)
+        filtered_data = signal_store.lookup(result_key, loaded_signal_data.filename)
+        seconds, factor, error = 0.0, 1, 0.0
+        x_data = loaded_signal_data.x_data
+        if filtered_data is not None:
+            stored_signal_data = signal_store.load(filtered_data)
+            x_data, filtered_signal = stored_signal_data.x_data, stored_signal_data.y_data
+            method = None
         else:
-            wn = sorted([cutoff_freq / nyquist, cutoff_freq_range / nyquist])
+            started = time.perf_counter()
+            with metrics.span('filter'):
+                if rate == FilterRate.FULL:
+                    filtered_signal, method = compute.executor.run(filtering.apply, key, loaded_signal_data.y_data,
+                                                                   method, zero_phase)
+                else:
+                    filtered_signal, method, factor, error = compute.executor.run(
+                        filtering.multirate, key, loaded_signal_data.y_data, method, zero_phase,
+                        rate == FilterRate.RESTORED)
+                    if rate == FilterRate.DECIMATED:
+                        x_data = x_data[::factor]
+            seconds = time.perf_counter() - started
+
+        filtered_signal_data = FilteredSignalData(x_data=x_data, y_data=filtered_signal,
+                                                  x_label=loaded_signal_data.x_label,
+                                                  y_label=loaded_signal_data.y_label, filter_type=filter_type,
+                                                  cutoff_freq=cutoff_freq, cutoff_freq_range=cutoff_freq_range,
+                                                  filter_order=filter_order,
+                                                  channel_labels=loaded_signal_data.channel_labels)
+        set_progress((50, 'Statistics'))
+        stats = filtered_signal_data.calculate_stats()
 
-        sos = signal.butter(filter_order, wn, btype=filter_type, output='sos')
-        return signal.sosfilt(sos, loaded_signal_data.y_data)
+        if filtered_data is None:
+            set_progress((70, 'Storing'))
+            filtered_data = signal_store.put(filename=loaded_signal_data.filename, x_data=filtered_signal_data.x_data,
+                                             y_data=filtered_signal_data.y_data, x_label=filtered_signal_data.x_label,
+                                             y_label=filtered_signal_data.y_label,
+                                             shape=(len(x_data),) + tuple(loaded_signal_data.shape[1:]),
+                                             columns=loaded_signal_data.columns,
+                                             channel_labels=filtered_signal_data.channel_labels)
+            signal_store.alias(result_key, filtered_data)
+        return FilterResult(filtered_data, filtered_signal_data, stats, method, seconds, factor, error)
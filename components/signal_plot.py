@@ -1,25 +1,33 @@
+from typing import Any
+
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Dash, Output, Input
+import numpy as np
+from dash import dcc, html, Dash, Output, Input, State, Patch
+from dash.exceptions import PreventUpdate
 
+from components.dropdown import Dropdown, Option
 from components.signal_stats import SignalStats
-from models.data import LoadedSignalData
 from models.figure import SignalFigure
-from utils import figure
-from utils.style import display_none
+from models.spectrum import SpectralMode
+from models.store import signal_store
+from utils import background, figure, style, transport
+from utils.env import MAX_POINTS_PER_TRACE
+from utils.metrics import metrics
 
 
 class SignalPlot(dbc.Card):
 
-    def __init__(self, plot_id: str):
+    def __init__(self, plot_id: str, spectral_controls: bool = False):
         plot_name = plot_id.replace('-', ' ').title()
         self.__stats = SignalStats(stats_id=f'{plot_id}-stats')
+        controls = [self.__spectral_controls(plot_id), self.__progress(plot_id)] if spectral_controls else []
         super().__init__(
             id=f'{plot_id}-plot',
-            style=display_none(),
+            style=style.display_none(),
             children=[
                 dbc.CardHeader(f'{plot_name}'),
                 dbc.CardBody(
-                    children=[
+                    children=controls + [
                         dcc.Loading(
                             id=f'{plot_id}-loading-graph',
                             type='circle',
@@ -36,37 +44,151 @@ class SignalPlot(dbc.Card):
             className='app-card mb-4')
 
     def register_callbacks(self, app: Dash) -> 'SignalPlot':
-        @app.callback(
+        @background.callback(
+            app,
             [Output('raw-signal-graph', 'figure'),
              Output('raw-signal-stats', 'children')],
-            Input('raw-signal-data', 'data'))
-        def update_graph(data):
-            return self.__update_graph(data)
+            [Input('raw-signal-data', 'data'),
+             Input('raw-signal-spectral-mode', 'value'),
+             Input('raw-signal-nperseg', 'value'),
+             Input('raw-signal-overlap', 'value')],
+            progress=[Output('raw-signal-progress', 'value'),
+                      Output('raw-signal-progress', 'label')],
+            running=[(Output('raw-signal-progress', 'style'), style.display_block(), style.display_none())])
+        def update_graph(set_progress, data, spectral_mode, nperseg, overlap):
+            return self.__update_graph(set_progress, data, spectral_mode, nperseg, overlap)
+
+        @app.callback(
+            Output('raw-signal-graph', 'figure', allow_duplicate=True),
+            Input('raw-signal-graph', 'relayoutData'),
+            State('raw-signal-data', 'data'),
+            prevent_initial_call=True)
+        def zoom_graph(relayout_data, data):
+            return self.create_zoom_patch(relayout_data, [data])
 
         return self
 
-    def __update_graph(self, data: dict[str, list[float]]):
+    @staticmethod
+    def create_zoom_patch(relayout_data: dict, signals: list[dict[str, Any]]) -> Patch:
+        """Re-renders the time domain traces at screen resolution for the visible x-range.
+
+        ``signals`` holds the signal store data the leading traces of the figure were drawn from, in trace order, with
+        one trace per channel.
+        """
+        visible_range = figure.x_range(relayout_data)
+        if visible_range is None or not all(signals):
+            raise PreventUpdate
+
+        patch = Patch()
+        index = 0
+        for data in signals:
+            x_data, y_data = signal_store.load_pyramid(data).query(*visible_range, max_points=MAX_POINTS_PER_TRACE)
+            x_array = transport.typed_array(transport.compact_axis(x_data))
+            for channel in np.atleast_2d(y_data):
+                patch['data'][index]['x'] = x_array
+                patch['data'][index]['y'] = transport.typed_array(transport.compact(channel))
+                index += 1
+        return patch
+
+    def __update_graph(self, set_progress, data: dict[str, Any], spectral_mode: str = SpectralMode.FFT.name,
+                       nperseg: int = 1024, overlap: float = 50):
         if not data:
             return figure.empty('No data uploaded'), None
 
-        signal_data = LoadedSignalData(**data)
-        stats_component = self.__stats.create_stats_component(signal_data.calculate_stats())
+        set_progress((10, 'Loading'))
+        signal_data = signal_store.load(data)
+        set_progress((30, 'Statistics'))
+        stats_component = self.__stats.create_stats_component(signal_data.calculate_stats(),
+                                                              signal_data.channel_labels)
 
-        fig = self.__set_up_figure(signal_data)
+        set_progress((60, 'Spectrum'))
+        mode = SpectralMode[spectral_mode] if spectral_mode else SpectralMode.FFT
+        spectral_result = signal_data.spectral_analyze(mode, int(nperseg or 1024), float(overlap or 0) / 100)
+        set_progress((90, 'Plotting'))
+        fig = self.__set_up_figure(signal_data, spectral_result)
 
         return fig.figure, stats_component
 
     @staticmethod
-    def __set_up_figure(signal_data) -> SignalFigure:
-        fig = SignalFigure(rows=2, cols=1, subplot_titles=['Time Domain', 'Frequency Domain'])
+    @metrics.span('figure')
+    def __set_up_figure(signal_data, spectral_result) -> SignalFigure:
+        fig = SignalFigure(rows=2, cols=1,
+                           subplot_titles=['Time Domain', f'Frequency Domain ({spectral_result.mode.value})'])
+
+        labels = signal_data.channel_labels
+        single = len(labels) == 1
+        for channel, label in enumerate(labels):
+            fig.add_trace(x_data=signal_data.x_data, y_data=signal_data.channels[channel],
+                          color='blue' if single else figure.channel_color(channel), row=1, col=1,
+                          show_legend=not single, name=label)
 
-        fig.add_trace(x_data=signal_data.x_data, y_data=signal_data.y_data, color='blue', row=1, col=1)
-        fig.add_trace(x_data=signal_data.spectral_analyze_result.fft_freq,
-                      y_data=signal_data.spectral_analyze_result.fft_magnitude, color='green', row=2, col=1)
+        if spectral_result.mode == SpectralMode.SPECTROGRAM:
+            # A heatmap per channel would hide the others, so only the first channel is shown
+            density = spectral_result.fft_magnitude
+            density = density.reshape((-1,) + density.shape[-2:])[0]
+            fig.add_heatmap(x_data=spectral_result.times, y_data=spectral_result.fft_freq,
+                            z_data=10 * np.log10(density + np.finfo(float).tiny), row=2, col=1,
+                            name=f'{labels[0]} (dB)')
+            fig.update_x_axis(title=signal_data.x_label, row=2, col=1)
+            fig.update_y_axis(title='Frequency (Hz)', title_standoff=25, row=2, col=1)
+        else:
+            magnitudes = np.atleast_2d(spectral_result.fft_magnitude)
+            for channel, label in enumerate(labels):
+                fig.add_trace(x_data=spectral_result.fft_freq, y_data=magnitudes[channel],
+                              color='green' if single else figure.channel_color(channel), row=2, col=1, name=label)
+            fig.update_x_axis(title='Frequency (Hz)', row=2, col=1)
+            if spectral_result.mode == SpectralMode.WELCH:
+                fig.update_y_axis(title='PSD', title_standoff=25, row=2, col=1, log=True)
+            else:
+                fig.update_y_axis(title='Magnitude', title_standoff=25, row=2, col=1)
 
         fig.update_x_axis(title=signal_data.x_label, row=1, col=1)
-        fig.update_x_axis(title='Frequency (Hz)', row=2, col=1)
         fig.update_y_axis(title=signal_data.y_label, title_standoff=25, row=1, col=1)
-        fig.update_y_axis(title='Magnitude', title_standoff=25, row=2, col=1)
 
         return fig
+
+    @staticmethod
+    def __progress(plot_id: str) -> dbc.Progress:
+        return dbc.Progress(id=f'{plot_id}-progress', value=0, style=style.display_none(), className='mb-3')
+
+    @staticmethod
+    def __spectral_controls(plot_id: str) -> dbc.Row:
+        return dbc.Row(
+            children=[
+                dbc.Col(
+                    children=[
+                        html.Label('Spectrum:'),
+                        Dropdown(
+                            dropdown_id=f'{plot_id}-spectral-mode',
+                            options=[Option(mode.value, mode.name) for mode in list(SpectralMode)],
+                            value=SpectralMode.FFT.name)
+                    ],
+                    width=12, md=4),
+                dbc.Col(
+                    children=[
+                        html.Label('Segment Length (samples):'),
+                        dcc.Input(
+                            id=f'{plot_id}-nperseg',
+                            type='number',
+                            min=16,
+                            step=1,
+                            value=1024,
+                            debounce=True,
+                            className='form-control')
+                    ],
+                    width=12, md=4),
+                dbc.Col(
+                    children=[
+                        html.Label('Segment Overlap (%):'),
+                        dcc.Input(
+                            id=f'{plot_id}-overlap',
+                            type='number',
+                            min=0,
+                            max=95,
+                            value=50,
+                            debounce=True,
+                            className='form-control')
+                    ],
+                    width=12, md=4)
+            ],
+            className='mb-3')
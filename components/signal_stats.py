@@ -1,3 +1,4 @@
+import numpy as np
 from dash import html
 
 
@@ -7,22 +8,26 @@ class SignalStats(html.Div):
         super().__init__(id=stats_id, className='stats-table')
 
     @staticmethod
-    def create_stats_component(stats: dict[str, float]):
+    def create_stats_component(stats: dict[str, float | np.ndarray], channel_labels: list[str] = None):
         if not stats:
             return html.P('No data available')
 
+        # Multichannel statistics hold one value per channel and get one column per channel
+        multichannel = np.ndim(next(iter(stats.values()))) > 0
+        header = [html.Thead(html.Tr([html.Th('')] + [html.Th(label) for label in channel_labels]))] \
+            if multichannel and channel_labels else []
+
         return html.Div(
             children=[
                 html.Table(
-                    children=[
+                    children=header + [
                         html.Tbody(
                             children=[
                                 html.Tr(
-                                    children=[
-                                        html.Td(name),
-                                        html.Td(f'{value:.4g}')
+                                    children=[html.Td(name)] + [
+                                        html.Td(f'{value:.4g}') for value in np.atleast_1d(values)
                                     ])
-                                for name, value in stats.items()
+                                for name, values in stats.items()
                             ])
                     ], className='table table-sm table-striped')
             ])
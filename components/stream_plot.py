@@ -0,0 +1,119 @@
+import dash_bootstrap_components as dbc
+import numpy as np
+from dash import dcc, html, Dash, Output, Input, State, no_update
+from dash.exceptions import PreventUpdate
+
+from components.signal_stats import SignalStats
+from models.figure import SignalFigure
+from models.stream import stream_registry, SignalStream
+from utils import figure, style, transport
+from utils.env import MAX_POINTS_PER_TRACE, STREAM_CAPACITY, STREAM_INTERVAL
+from utils.metrics import metrics
+
+
+class StreamPlot(dbc.Card):
+    """Live plot of a stream, extended with the samples received since the last refresh instead of redrawn.
+
+    The time traces hold the min-max envelope of the ring buffer: every ``bucket`` samples become two points, so the
+    plotted window matches the buffer at the point budget of a trace. The spectrum traces are replaced on every refresh
+    by extending them with as many points as they hold.
+    """
+
+    def __init__(self):
+        self.__stats = SignalStats(stats_id='stream-stats')
+        super().__init__(
+            id='stream-plot',
+            style=style.display_none(),
+            children=[
+                dbc.CardHeader('Live Stream'),
+                dbc.CardBody(
+                    children=[
+                        dcc.Graph(
+                            id='stream-graph',
+                            figure={},
+                            className='graph-container'),
+                        self.__stats,
+                        dcc.Interval(id='stream-interval', interval=STREAM_INTERVAL, disabled=True),
+                        # Stream id and position the graph holds the samples of
+                        dcc.Store(id='stream-position')
+                    ])
+            ],
+            className='app-card mb-4')
+
+    def register_callbacks(self, app: Dash) -> 'StreamPlot':
+        @app.callback(
+            [Output('stream-graph', 'figure'),
+             Output('stream-graph', 'extendData'),
+             Output('stream-stats', 'children'),
+             Output('stream-position', 'data')],
+            [Input('stream-interval', 'n_intervals')],
+            [State('stream-data', 'data'),
+             State('stream-position', 'data')],
+            prevent_initial_call=True)
+        def refresh(n_intervals, data, position):
+            return self.__refresh(data, position)
+
+        return self
+
+    @staticmethod
+    def bucket_size(capacity: int = STREAM_CAPACITY, max_points: int = MAX_POINTS_PER_TRACE) -> int:
+        """Samples per pair of envelope points, such that the full ring buffer fits the point budget of a trace."""
+        return max(-(-2 * capacity // max_points), 1)
+
+    def __refresh(self, data, position):
+        stream = stream_registry.get(data['stream_id']) if data else None
+        if stream is None:
+            raise PreventUpdate
+        if stream.error:
+            return no_update, no_update, html.P(f'Error: {stream.error}', style=style.color('red')), position
+
+        bucket = self.bucket_size()
+        if not position or position['stream_id'] != stream.stream_id:
+            if stream.total < 2:
+                raise PreventUpdate
+            end, x_data, y_data = stream.envelope(0, bucket)
+            fig = self.__set_up_figure(stream, x_data, y_data).figure
+            return fig, no_update, self.__create_stats(stream), {'stream_id': stream.stream_id, 'position': end}
+
+        end, x_data, y_data = stream.envelope(position['position'], bucket)
+        if end == position['position']:
+            raise PreventUpdate
+        return (no_update, self.__create_extension(stream, x_data, y_data, bucket), self.__create_stats(stream),
+                {'stream_id': stream.stream_id, 'position': end})
+
+    @staticmethod
+    def __create_extension(stream: SignalStream, x_data: np.array, y_data: np.array, bucket: int) -> tuple:
+        channels = len(y_data)
+        trace_points = 2 * -(-STREAM_CAPACITY // bucket) if bucket > 1 else STREAM_CAPACITY
+        freq, magnitude = stream.spectrum()
+        x_resolution = stream.sample_spacing * transport.X_TOLERANCE
+        freq_list = transport.rounded_list(freq, (freq[1] - freq[0]) * transport.X_TOLERANCE)
+        extension = {
+            'x': [transport.rounded_list(row, x_resolution) for row in x_data] + [freq_list] * channels,
+            'y': [transport.rounded_list(row) for row in y_data] + [transport.rounded_list(row) for row in magnitude]
+        }
+        return extension, list(range(2 * channels)), [trace_points] * channels + [len(freq)] * channels
+
+    @staticmethod
+    def __create_stats(stream: SignalStream):
+        return SignalStats.create_stats_component(stream.stats(), stream.channel_labels)
+
+    @staticmethod
+    @metrics.span('figure')
+    def __set_up_figure(stream: SignalStream, x_data: np.array, y_data: np.array) -> SignalFigure:
+        # The envelope is already within the point budget, decimating it again would break the joins of extensions.
+        # Extensions are appended to the arrays of the traces, so these must not be narrowed to float32.
+        fig = SignalFigure(rows=2, cols=1, subplot_titles=['Live Signal', 'Live Spectrum'], max_points=np.inf,
+                           compact=False)
+        labels = stream.channel_labels
+        for channel, label in enumerate(labels):
+            fig.add_trace(x_data[channel], y_data[channel], figure.channel_color(channel), row=1, col=1,
+                          show_legend=True, name=label)
+        freq, magnitude = stream.spectrum()
+        for channel, label in enumerate(labels):
+            fig.add_trace(freq, magnitude[channel], figure.channel_color(channel), row=2, col=1, name=label)
+        fig.update_x_axis(stream.columns[0], row=1, col=1)
+        fig.update_y_axis('Amplitude', title_standoff=5, row=1, col=1)
+        fig.update_x_axis('Frequency (Hz)', row=2, col=1)
+        fig.update_y_axis('Magnitude', title_standoff=5, row=2, col=1)
+        return fig
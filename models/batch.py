@@ -0,0 +1,167 @@
+import glob
+import os
+import time
+from enum import Enum
+from typing import NamedTuple
+
+import numpy as np
+
+from models import compute, filtering, ingest
+from models.data import FilteredSignalData, LoadedSignalData
+from models.spectrum import SpectralMode
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class OutputFormat(Enum):
+    NPZ = '.npz'
+    PARQUET = '.parquet'
+
+
+class BatchSpec(NamedTuple):
+    """Filter applied to every file of a batch, and what is written for it."""
+    filter_type: str
+    cutoffs: tuple[float, ...]
+    order: int
+    output_dir: str
+    output_format: OutputFormat = OutputFormat.NPZ
+    spectral_mode: SpectralMode = SpectralMode.WELCH
+    nperseg: int = 1024
+    family: str = 'butter'
+    zero_phase: bool = False
+
+
+class BatchResult(NamedTuple):
+    path: str
+    output: str | None
+    samples: int
+    channels: int
+    seconds: float
+    error: str | None = None
+
+
+def expand(inputs: list[str]) -> list[str]:
+    """CSV files named by ``inputs``: files, directories searched recursively, or glob patterns, in a stable order."""
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            paths += glob.glob(os.path.join(entry, '**', '*.csv'), recursive=True)
+        elif os.path.isfile(entry):
+            paths.append(entry)
+        else:
+            paths += glob.glob(entry, recursive=True)
+    return sorted(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+
+def output_stems(paths: list[str], output_dir: str) -> list[str]:
+    """Output paths without extension of the files ``paths``, laid out in ``output_dir`` as below their common
+    directory, so that files of the same name in different directories are kept apart.
+    """
+    paths = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else ''
+    stems = [os.path.join(output_dir, os.path.splitext(os.path.relpath(path, root))[0]) for path in paths]
+    collisions = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if collisions:
+        raise ValueError(f'Several input files would be written to {", ".join(collisions)}')
+    return stems
+
+
+def run(paths: list[str], spec: BatchSpec, workers: int) -> list[BatchResult]:
+    """Processes every file on a pool of ``workers`` processes, in the calling process for a single worker.
+
+    Every worker reads, filters and writes its files itself, so only the paths and the small results travel between
+    the processes.
+    """
+    if spec.output_format == OutputFormat.PARQUET and pyarrow is None:
+        raise ImportError('Writing parquet files requires pyarrow')
+    stems = output_stems(paths, spec.output_dir)
+    for directory in {os.path.dirname(stem) for stem in stems} | {spec.output_dir}:
+        os.makedirs(directory, exist_ok=True)
+    executor = compute.ComputeExecutor(workers if workers > 1 else 0)
+    try:
+        return executor.map(process, list(zip(paths, stems, [spec] * len(paths))))
+    finally:
+        executor.shutdown()
+
+
+def process(task: tuple[str, str, BatchSpec]) -> BatchResult:
+    path, stem, spec = task
+    started = time.perf_counter()
+    try:
+        loaded_signal_data = load(path)
+        fs = filtering.sample_rate(loaded_signal_data.x_data)
+        key = filtering.design_key(spec.order, list(spec.cutoffs), fs, btype=spec.filter_type, family=spec.family)
+        filtered, _ = filtering.apply(key, loaded_signal_data.y_data, zero_phase=spec.zero_phase)
+        filtered_signal_data = FilteredSignalData(x_data=loaded_signal_data.x_data, y_data=filtered,
+                                                  x_label=loaded_signal_data.x_label,
+                                                  y_label=loaded_signal_data.y_label, filter_type=spec.filter_type,
+                                                  cutoff_freq=spec.cutoffs[0], cutoff_freq_range=spec.cutoffs[-1],
+                                                  filter_order=spec.order,
+                                                  channel_labels=loaded_signal_data.channel_labels)
+        output = write(stem, loaded_signal_data, filtered_signal_data, spec)
+        channels = filtered_signal_data.channels
+        return BatchResult(path, output, channels.shape[1], channels.shape[0], time.perf_counter() - started)
+    except Exception as e:
+        return BatchResult(path, None, 0, 0, time.perf_counter() - started, str(e))
+
+
+def load(path: str) -> LoadedSignalData:
+    """Signal of a CSV file laid out as for an upload: the x-axis first and one numeric column per channel."""
+    columns = ingest.read_columns(path)
+    signal_columns = ingest.numeric_columns(path)
+    if len(signal_columns) < 2 or columns[0] not in signal_columns:
+        raise ValueError('The file must have a numeric x-axis column and at least one numeric signal column')
+    df = ingest.read_signal_csv(path, usecols=signal_columns)
+    channel_labels = df.columns[1:].tolist()
+    return LoadedSignalData(x_data=df.iloc[:, 0].to_numpy(), y_data=df.iloc[:, 1:].to_numpy().T,
+                            x_label=df.columns[0], y_label=channel_labels[0] if len(channel_labels) == 1 else 'Signal',
+                            filename=os.path.basename(path), shape=(df.shape[0], len(columns)), columns=columns,
+                            channel_labels=channel_labels)
+
+
+def write(stem: str, loaded_signal_data: LoadedSignalData, filtered_signal_data: FilteredSignalData,
+          spec: BatchSpec) -> str:
+    """Writes the filtered channels, the statistics of the raw and filtered signals, and the filtered spectrum.
+
+    A ``stem.npz`` archive holds them all; parquet output is a table of the filtered channels next to ``.stats`` and
+    ``.spectrum`` tables, one column per channel.
+    """
+    labels = [str(label) for label in filtered_signal_data.channel_labels]
+    channels = filtered_signal_data.channels
+    spectral_result = filtered_signal_data.spectral_analyze(spec.spectral_mode, spec.nperseg)
+    magnitudes = np.atleast_2d(spectral_result.fft_magnitude)
+    raw_stats = loaded_signal_data.calculate_stats()
+    filtered_stats = filtered_signal_data.calculate_stats()
+    stat_names = list(filtered_stats)
+
+    if spec.output_format == OutputFormat.NPZ:
+        output = f'{stem}.npz'
+        np.savez(output, x=np.asarray(filtered_signal_data.x_data), filtered=channels, channel_labels=labels,
+                 freq=spectral_result.fft_freq, magnitude=magnitudes, stat_names=stat_names,
+                 raw_stats=_stats_table(raw_stats, stat_names), filtered_stats=_stats_table(filtered_stats, stat_names))
+        return output
+
+    output = f'{stem}.parquet'
+    _write_parquet(output, {str(filtered_signal_data.x_label): np.asarray(filtered_signal_data.x_data),
+                            **dict(zip(labels, channels))})
+    raw_table, filtered_table = _stats_table(raw_stats, stat_names), _stats_table(filtered_stats, stat_names)
+    _write_parquet(f'{stem}.stats.parquet', {
+        'statistic': np.array(stat_names),
+        **{f'{label} raw': raw_table[:, channel] for channel, label in enumerate(labels)},
+        **{f'{label} filtered': filtered_table[:, channel] for channel, label in enumerate(labels)}})
+    _write_parquet(f'{stem}.spectrum.parquet',
+                   {'frequency': spectral_result.fft_freq, **dict(zip(labels, magnitudes))})
+    return output
+
+
+def _stats_table(stats: dict[str, float | np.ndarray], names: list[str]) -> np.array:
+    # One row per statistic and one column per channel
+    return np.array([np.atleast_1d(stats[name]) for name in names], dtype=np.float64)
+
+
+def _write_parquet(path: str, columns: dict[str, np.array]):
+    pyarrow.parquet.write_table(pyarrow.table(columns), path)
@@ -0,0 +1,194 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, Executor, Future
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable, NamedTuple
+
+import numpy as np
+
+from utils.env import COMPUTE_WORKERS
+
+# Smaller arrays are cheaper to pickle than to place in a shared memory block
+SHARE_MIN_BYTES = 1 << 16
+
+
+class SharedArray(NamedTuple):
+    """Describes an array placed in a shared memory block, which is what travels to and from the pool."""
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+class ComputeExecutor:
+    """Runs CPU-bound functions in a persistent pool of worker processes.
+
+    Array arguments and results are exchanged through shared memory blocks rather than pickled through the pool's
+    pipes, so the web worker only copies them once. The pool is started on first use and kept for the lifetime of the
+    process; a process forked from its owner starts a pool of its own, which is why ``COMPUTE_WORKERS`` is refused
+    together with background callbacks. With no workers configured, and inside the pool's own processes, functions
+    run inline, exactly as if called directly.
+    """
+
+    def __init__(self, workers: int):
+        self.__workers = workers
+        self.__pool = None
+        self.__pool_pid = None
+        self.__lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    def run(self, function: Callable, *args, **kwargs) -> Any:
+        if self.__workers <= 0 or _in_pool:
+            return function(*args, **kwargs)
+        return self.__gather(self.__submit(function, args, kwargs))
+
+    def map(self, function: Callable, items: Iterable) -> list[Any]:
+        """Applies ``function`` to every item, spreading the calls over the pool."""
+        if self.__workers <= 0 or _in_pool:
+            return [function(item) for item in items]
+        submitted, results = [], []
+        try:
+            for item in items:
+                submitted.append(self.__submit(function, (item,), {}))
+            for future, _ in submitted:
+                results.append(_receive(future.result()))
+            return results
+        finally:
+            # Once a job failed, the results of those after it are freed unread, and every job's arguments in any case
+            for future, _ in submitted[len(results):]:
+                _discard(future)
+            for _, blocks in submitted:
+                _release(blocks)
+
+    def shutdown(self):
+        with self.__lock:
+            if self.__pool is not None and self.__pool_pid == os.getpid():
+                self.__pool.shutdown()
+            self.__pool = None
+
+    def __submit(self, function: Callable, args: tuple, kwargs: dict) -> tuple:
+        blocks = []
+        shared_args = tuple(_share(arg, blocks) for arg in args)
+        shared_kwargs = {name: _share(value, blocks) for name, value in kwargs.items()}
+        try:
+            return self.__executor().submit(_call, function, shared_args, shared_kwargs), blocks
+        except BaseException:
+            _release(blocks)
+            raise
+
+    @staticmethod
+    def __gather(job: tuple) -> Any:
+        future, blocks = job
+        try:
+            return _receive(future.result())
+        finally:
+            _release(blocks)
+
+    def __executor(self) -> Executor:
+        with self.__lock:
+            if self.__pool is None or self.__pool_pid != os.getpid():
+                context = multiprocessing.get_context('forkserver' if os.name == 'posix' else 'spawn')
+                self.__pool = ProcessPoolExecutor(max_workers=self.__workers, mp_context=context,
+                                                  initializer=_enter_pool)
+                self.__pool_pid = os.getpid()
+            return self.__pool
+
+
+# Set in the pool's processes, so that work submitted from within the pool runs inline instead of nesting pools
+_in_pool = False
+
+
+def _enter_pool():
+    global _in_pool
+    _in_pool = True
+
+
+def _share(value: Any, blocks: list[SharedMemory]) -> Any:
+    if not isinstance(value, np.ndarray) or value.nbytes < SHARE_MIN_BYTES or value.dtype.hasobject:
+        return value
+    block = SharedMemory(create=True, size=value.nbytes)
+    blocks.append(block)
+    np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+    return SharedArray(block.name, value.shape, value.dtype.str)
+
+
+def _receive(value: Any) -> Any:
+    """Copies arrays the pool returned in shared memory blocks into the caller's memory and frees the blocks."""
+    if isinstance(value, SharedArray):
+        block = SharedMemory(name=value.name)
+        try:
+            view = np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)
+            array = view.copy()
+            del view
+        finally:
+            block.close()
+            block.unlink()
+        return array
+    if isinstance(value, tuple):
+        return _rebuild(value, [_receive(item) for item in value])
+    return value
+
+
+def _discard(future: Future):
+    """Cancels a job, or frees the shared memory blocks of its result if it already runs."""
+    if future.cancel():
+        return
+    try:
+        _receive(future.result())
+    except Exception:
+        pass
+
+
+def _release(blocks: list[SharedMemory]):
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _call(function: Callable, args: tuple, kwargs: dict) -> Any:
+    """Runs in a pool process: maps the shared arguments, calls ``function`` and shares the array results."""
+    attached = []
+
+    def resolve(value: Any) -> Any:
+        if isinstance(value, SharedArray):
+            block = SharedMemory(name=value.name)
+            attached.append(block)
+            return np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)
+        return value
+
+    args = tuple(resolve(arg) for arg in args)
+    kwargs = {name: resolve(value) for name, value in kwargs.items()}
+    result = function(*args, **kwargs)
+    del args, kwargs
+    try:
+        return _export(result)
+    finally:
+        del result
+        for block in attached:
+            try:
+                block.close()
+            except BufferError:
+                # The function kept a view of its input; the mapping goes away with the view
+                pass
+
+
+def _export(value: Any) -> Any:
+    if isinstance(value, np.ndarray) and value.nbytes >= SHARE_MIN_BYTES and not value.dtype.hasobject:
+        block = SharedMemory(create=True, size=value.nbytes)
+        np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+        block.close()
+        return SharedArray(block.name, value.shape, value.dtype.str)
+    if isinstance(value, tuple):
+        return _rebuild(value, [_export(item) for item in value])
+    return value
+
+
+def _rebuild(value: tuple, items: list) -> tuple:
+    # Named tuples keep their type on the way through the pool
+    return type(value)(*items) if hasattr(value, '_fields') else tuple(items)
+
+
+executor = ComputeExecutor(COMPUTE_WORKERS)
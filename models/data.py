@@ -1,12 +1,33 @@
 import numpy as np
 
+from models import compute, fourier, spectrum, stats
+from models.spectrum import SpectralMode
+from utils import axis
+from utils.axis import UniformAxis
+from utils.cache import LruCache
+from utils.env import SPECTRUM_CACHE_SIZE, SIGNAL_PRECISION
+from utils.metrics import metrics
+
+SAMPLE_TYPES = {'DOUBLE': np.float64, 'SINGLE': np.float32}
+
 
 class SpectralAnalyzeResult:
+    """Spectrum of a signal.
+
+    For ``SpectralMode.FFT`` the magnitude is that of the complex ``fft_result``. Welch results hold the power spectral
+    density instead and no complex result; spectrograms additionally hold the segment ``times`` and a magnitude shaped
+    (..., frequencies, times).
+    """
+
+    __slots__ = ('__fft_result', '__fft_freq', '__fft_magnitude', '__mode', '__times')
 
-    def __init__(self, fft_result: np.array, fft_freq: np.array, fft_magnitude: np.array):
+    def __init__(self, fft_result: np.array, fft_freq: np.array, fft_magnitude: np.array,
+                 mode: SpectralMode = SpectralMode.FFT, times: np.array = None):
         self.__fft_result = fft_result
         self.__fft_freq = fft_freq
         self.__fft_magnitude = fft_magnitude
+        self.__mode = mode
+        self.__times = times
 
     @property
     def fft_result(self) -> np.array:
@@ -20,15 +41,41 @@ class SpectralAnalyzeResult:
     def fft_magnitude(self) -> np.array:
         return self.__fft_magnitude
 
+    @property
+    def mode(self) -> SpectralMode:
+        return self.__mode
+
+    @property
+    def times(self) -> np.array:
+        return self.__times
+
 
 class SignalData:
+    """Samples of one or more channels over a shared x-axis.
 
-    def __init__(self, x_data: np.array, y_data: np.array, x_label: np.array, y_label: np.array):
-        self.__x_data = x_data
-        self.__y_data = y_data
+    ``y_data`` is either a single channel of samples or a 2-D (channels x samples) array; every computation runs along
+    the last axis, so all channels are processed in one vectorized call.
+
+    Samples are converted once, on construction, into contiguous read-only buffers of the ``SIGNAL_PRECISION`` type;
+    buffers that already are, such as memory-mapped arrays of the signal store, are kept without a copy. An evenly
+    spaced x-axis is kept as a :class:`UniformAxis`, and signals derived from another one share its x-axis.
+    """
+
+    __slots__ = ('__x_data', '__y_data', '__x_label', '__y_label', '__key', '__channel_labels',
+                 '__spectral_analyze_result')
+
+    # Spectra of signals with a content key, shared by every instance created for the same signal
+    __spectral_cache = LruCache(max_entries=SPECTRUM_CACHE_SIZE)
+
+    def __init__(self, x_data: np.array, y_data: np.array, x_label: np.array, y_label: np.array, key: str = None,
+                 channel_labels: list[str] = None):
+        self.__x_data = _axis(x_data)
+        self.__y_data = _buffer(y_data, SAMPLE_TYPES[SIGNAL_PRECISION])
         self.__x_label = x_label
         self.__y_label = y_label
-        self.__spectral_analyze_result = self.__spectral_analyze()
+        self.__key = key
+        self.__channel_labels = channel_labels
+        self.__spectral_analyze_result = None
 
     @property
     def x_data(self) -> np.array:
@@ -46,35 +93,79 @@ class SignalData:
     def y_label(self) -> np.array:
         return self.__y_label
 
+    @property
+    def sample_spacing(self) -> float:
+        return axis.spacing(self.__x_data)
+
+    @property
+    def key(self) -> str:
+        return self.__key
+
+    @property
+    def channels(self) -> np.array:
+        """Samples as a 2-D (channels x samples) view, also for single channel signals."""
+        return np.atleast_2d(self.__y_data)
+
+    @property
+    def channel_labels(self) -> list[str]:
+        if self.__channel_labels is not None:
+            return self.__channel_labels
+        if np.ndim(self.__y_data) == 1:
+            return [self.__y_label]
+        return [f'{self.__y_label} {channel + 1}' for channel in range(len(self.__y_data))]
+
     @property
     def spectral_analyze_result(self) -> SpectralAnalyzeResult:
+        if self.__spectral_analyze_result is None:
+            if self.__key is None:
+                self.__spectral_analyze_result = self.__spectral_analyze()
+            else:
+                self.__spectral_analyze_result = self.__spectral_cache.get_or_compute(self.__key,
+                                                                                      self.__spectral_analyze)
         return self.__spectral_analyze_result
 
-    def calculate_stats(self) -> dict[str, float]:
-        signal_array = np.array(self.__y_data)
-        return {
-            'Mean': np.mean(signal_array),
-            'Median': np.median(signal_array),
-            'Std Dev': np.std(signal_array),
-            'Min': np.min(signal_array),
-            'Max': np.max(signal_array),
-            'Range': np.max(signal_array) - np.min(signal_array),
-            'RMS': np.sqrt(np.mean(np.square(signal_array))),
-            'Peak to Peak': np.max(signal_array) - np.min(signal_array)
-        }
-
+    def spectral_analyze(self, mode: SpectralMode, nperseg: int = 1024, overlap: float = 0.5) -> SpectralAnalyzeResult:
+        """Spectrum computed with the given engine; Welch and spectrogram results are bounded by ``nperseg``."""
+        if mode == SpectralMode.FFT:
+            return self.spectral_analyze_result
+
+        @metrics.span('spectrum')
+        def analyze() -> SpectralAnalyzeResult:
+            fs = 1.0 / self.sample_spacing
+            if mode == SpectralMode.WELCH:
+                freq, density = compute.executor.run(spectrum.welch, self.__y_data, fs, nperseg, overlap)
+                return SpectralAnalyzeResult(None, freq, density, mode)
+            freq, times, density = compute.executor.run(spectrum.spectrogram, self.__y_data, fs, nperseg, overlap)
+            return SpectralAnalyzeResult(None, freq, density, mode, times + self.__x_data[0])
+
+        if self.__key is None:
+            return analyze()
+        return self.__spectral_cache.get_or_compute((self.__key, mode, nperseg, overlap), analyze)
+
+    def calculate_stats(self) -> dict[str, float | np.ndarray]:
+        """Statistics of the signal, as arrays with one value per channel for multichannel signals."""
+        if np.ndim(self.__y_data) == 1:
+            return compute.executor.run(stats.calculate_stats, self.__y_data)
+
+        channel_stats = compute.executor.map(stats.calculate_stats, self.__y_data)
+        return {name: np.array([values[name] for values in channel_stats]) for name in channel_stats[0]}
+
+    @metrics.span('fft')
     def __spectral_analyze(self) -> SpectralAnalyzeResult:
-        fft_result = np.fft.rfft(self.__y_data)
-        fft_freq = np.fft.rfftfreq(len(self.__y_data), d=np.mean(np.diff(self.__x_data)))
+        fft_result = compute.executor.run(fourier.rfft, self.__y_data)
+        fft_freq = fourier.rfftfreq(fourier.transform_length(np.shape(self.__y_data)[-1]), d=self.sample_spacing)
         fft_magnitude = np.abs(fft_result)
         return SpectralAnalyzeResult(fft_result, fft_freq, fft_magnitude)
 
 
 class LoadedSignalData(SignalData):
 
+    __slots__ = ('__filename', '__shape', '__columns')
+
     def __init__(self, x_data: np.array, y_data: np.array, x_label: np.array, y_label: np.array, filename: str,
-                 shape: np.array, columns: np.array):
-        super().__init__(x_data=x_data, y_data=y_data, x_label=x_label, y_label=y_label)
+                 shape: np.array, columns: np.array, handle: str = None, channel_labels: list[str] = None):
+        super().__init__(x_data=x_data, y_data=y_data, x_label=x_label, y_label=y_label, key=handle,
+                         channel_labels=channel_labels)
         self.__filename = filename
         self.__shape = shape
         self.__columns = columns
@@ -94,9 +185,12 @@ class LoadedSignalData(SignalData):
 
 class FilteredSignalData(SignalData):
 
+    __slots__ = ('__filter_type', '__cutoff_freq', '__cutoff_freq_range', '__filter_order')
+
     def __init__(self, x_data: np.array, y_data: np.array, x_label: np.array, y_label: np.array, filter_type: str,
-                 cutoff_freq: float, cutoff_freq_range: float, filter_order: int):
-        super().__init__(x_data=x_data, y_data=y_data, x_label=x_label, y_label=y_label)
+                 cutoff_freq: float, cutoff_freq_range: float, filter_order: int, channel_labels: list[str] = None):
+        super().__init__(x_data=x_data, y_data=y_data, x_label=x_label, y_label=y_label,
+                         channel_labels=channel_labels)
         self.__filter_type = filter_type
         self.__cutoff_freq = cutoff_freq
         self.__cutoff_freq_range = cutoff_freq_range
@@ -117,3 +211,26 @@ class FilteredSignalData(SignalData):
     @property
     def filter_order(self):
         return self.__filter_order
+
+
+def _axis(values: np.array) -> np.ndarray | UniformAxis:
+    if isinstance(values, UniformAxis) or _is_buffer(values, np.float64):
+        return values
+    return axis.uniform(values) or _buffer(values, np.float64)
+
+
+def _buffer(values: np.array, dtype: type) -> np.ndarray:
+    """Contiguous read-only array of ``dtype``, copying ``values`` only if their type or layout differs."""
+    if _is_buffer(values, dtype):
+        return values
+    array = np.ascontiguousarray(values, dtype=dtype)
+    if array.flags.writeable:
+        array = array.view()
+        array.flags.writeable = False
+    return array
+
+
+def _is_buffer(values: np.array, dtype: type) -> bool:
+    # Read-only arrays have been converted already, or are memory-mapped signals from the store
+    return (isinstance(values, np.ndarray) and values.dtype == dtype and values.flags.c_contiguous
+            and not values.flags.writeable)
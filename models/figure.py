@@ -2,10 +2,18 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from utils import transport
+from utils.decimation import Decimation, decimate
+from utils.env import MAX_POINTS_PER_TRACE, DECIMATION
+
 
 class SignalFigure:
 
-    def __init__(self, rows: int, cols: int, subplot_titles: list[str]):
+    def __init__(self, rows: int, cols: int, subplot_titles: list[str], max_points: int = MAX_POINTS_PER_TRACE,
+                 decimation: Decimation = Decimation[DECIMATION], compact: bool = True):
+        self.__max_points = max_points
+        self.__decimation = decimation
+        self.__compact = compact
         self.__fig = make_subplots(
             rows=rows,
             cols=cols,
@@ -15,17 +23,31 @@ class SignalFigure:
         self.__update_layout()
 
     def add_trace(self, x_data: np.array, y_data: np.array, color: str, row: int, col: int, show_legend: bool = False,
-                  name: str = None):
+                  name: str = None, opacity: float = None, uid: str = None):
+        x_data, y_data = decimate(x_data, y_data, self.__max_points, self.__decimation)
+        if self.__compact:
+            x_data, y_data = transport.compact_axis(x_data), transport.compact(y_data)
+        self.__fig.add_trace(
+            go.Scatter(x=x_data, y=y_data, mode='lines', line=dict(color=color), showlegend=show_legend, name=name,
+                       opacity=opacity, uid=uid),
+            row=row,
+            col=col)
+
+    def add_heatmap(self, x_data: np.array, y_data: np.array, z_data: np.array, row: int, col: int,
+                    name: str = None):
         self.__fig.add_trace(
-            go.Scatter(x=x_data, y=y_data, mode='lines', line=dict(color=color), showlegend=show_legend, name=name),
+            go.Heatmap(x=transport.compact_axis(x_data), y=transport.compact_axis(y_data), z=transport.compact(z_data),
+                       colorscale='Viridis', name=name,
+                       colorbar=dict(title=dict(text='dB'), len=0.35, y=0.2)),
             row=row,
             col=col)
 
     def update_x_axis(self, title: str, row: int, col: int):
         self.__fig.update_xaxes(title_text=title, row=row, col=col)
 
-    def update_y_axis(self, title: str, title_standoff: int, row: int, col: int):
-        self.__fig.update_yaxes(title_text=title, title_standoff=title_standoff, row=row, col=col)
+    def update_y_axis(self, title: str, title_standoff: int, row: int, col: int, log: bool = False):
+        self.__fig.update_yaxes(title_text=title, title_standoff=title_standoff, type='log' if log else None, row=row,
+                                col=col)
 
     @property
     def figure(self) -> go.Figure:
@@ -0,0 +1,284 @@
+import hashlib
+from enum import Enum
+from typing import NamedTuple, Iterator
+
+import numpy as np
+import scipy.fft
+from scipy import signal
+
+from utils import axis
+from utils import cache
+from utils.cache import LruCache, SharedCache
+from utils.env import (BACKGROUND_CALLBACKS, FILTER_DESIGN_CACHE_SIZE, FILTER_BLOCK_SIZE, FILTER_RESULT_CACHE_BYTES,
+                       FILTER_RESULT_CACHE_DIR)
+
+# Normalized frequencies are rounded, so that sample rates estimated from slightly different x-axes share a design
+WN_DIGITS = 12
+
+
+# Relative cost of a multiply-add of direct convolution and of a sample of an FFT, per log2 of the transform length,
+# measured with scipy's lfilter and pocketfft
+DIRECT_COST = 0.3
+FFT_COST = 3.0
+# Overlap-add blocks are a few times longer than the filter, so that most of every transform is new samples
+OVERLAP_ADD_BLOCK = 4
+MIN_BLOCK = 64
+# Multirate filtering decimates until the band edge is this fraction of the decimated Nyquist frequency. Lower
+# fractions keep the frequency warping of IIR designs, and with it the deviation from the full-rate filter, small.
+MULTIRATE_BAND_EDGE = 0.05
+RESAMPLING_ATTENUATION = 80
+# Fewest samples left after decimation
+MULTIRATE_MIN_SAMPLES = 1024
+# Samples the accuracy is measured on, and periods of the lowest band edge the full-rate filter settles in, up to
+# at most as many samples as guard on either side. The guard grows as the band edge narrows, and uncapped the check
+# would filter as much of the signal at the full rate as multirate filtering saves.
+MULTIRATE_CHECK = 1 << 14
+MULTIRATE_SETTLE_PERIODS = 20
+MULTIRATE_MAX_GUARD = 4 * MULTIRATE_CHECK
+
+
+class FilterFamily(Enum):
+    BUTTER = 'Butterworth IIR'
+    FIR = 'Windowed FIR'
+
+
+class FilterMethod(Enum):
+    AUTO = 'Automatic'
+    DIRECT = 'Direct convolution'
+    FFT = 'FFT convolution'
+    OVERLAP_ADD = 'Overlap-add convolution'
+    SOS = 'Second-order sections'
+
+
+class FilterRate(Enum):
+    FULL = 'Full rate'
+    RESTORED = 'Multirate, original rate restored'
+    DECIMATED = 'Multirate, decimated output'
+
+
+class MultirateResult(NamedTuple):
+    output: np.array
+    method: 'FilterMethod'
+    # Decimation factor, 1 if the filter ran at the full rate
+    factor: int
+    # RMS deviation from the full-rate output relative to its RMS, measured on a segment in the middle of the signal,
+    # None if not checked
+    error: float | None
+
+
+class FilterDesignKey(NamedTuple):
+    """Identifies a filter design; ``order`` is the number of taps of FIR filters."""
+    family: str
+    order: int
+    wn: tuple[float, ...]
+    btype: str
+
+
+design_cache = LruCache(max_entries=FILTER_DESIGN_CACHE_SIZE)
+# Results of applying a filter to a stored signal, keyed by the signal handle, a hash of its content, and the design
+# key. Background jobs are forked processes, so with background callbacks the results are shared on disk instead.
+result_cache = SharedCache(FILTER_RESULT_CACHE_DIR, FILTER_RESULT_CACHE_BYTES) \
+    if BACKGROUND_CALLBACKS and cache.diskcache is not None else LruCache(max_bytes=FILTER_RESULT_CACHE_BYTES)
+
+
+def sample_rate(x_data: np.array) -> float:
+    if len(x_data) > 1:
+        return 1.0 / axis.spacing(x_data)
+    return 1.0
+
+
+def design_key(order: int, cutoffs: list[float], fs: float, btype: str, family: str = 'butter') -> FilterDesignKey:
+    nyquist = 0.5 * fs
+    wn = tuple(sorted(round(cutoff / nyquist, WN_DIGITS) for cutoff in cutoffs))
+    family = family.lower()
+    # Linear-phase FIR filters passing the Nyquist frequency need an odd number of taps, the others allow one
+    order = int(order) | 1 if family == FilterFamily.FIR.name.lower() else int(order)
+    return FilterDesignKey(family=family, order=order, wn=wn, btype=btype.lower())
+
+
+def result_key(handle: str, key: FilterDesignKey, zero_phase: bool = False, rate: FilterRate = FilterRate.FULL) -> str:
+    """Signal store alias of the output of filter ``key`` applied to the stored signal ``handle``."""
+    identity = (handle, tuple(key)) + (('zero-phase',) if zero_phase else ()) + (
+        (rate.name,) if rate != FilterRate.FULL else ())
+    return f'filtered-{hashlib.blake2b(repr(identity).encode(), digest_size=16).hexdigest()}'
+
+
+def design(key: FilterDesignKey) -> np.array:
+    """Second-order sections, or FIR taps, of the filter described by ``key``, designed once and then cached.
+
+    The returned array is shared by every caller with the same key, so it is read-only.
+    """
+    return design_cache.get_or_compute(key, lambda: _read_only(_design(key)))
+
+
+def _design(key: FilterDesignKey) -> np.array:
+    wn = key.wn[0] if len(key.wn) == 1 else list(key.wn)
+    if key.family == FilterFamily.FIR.name.lower():
+        return signal.firwin(key.order, wn, pass_zero=key.btype)
+    return signal.iirfilter(key.order, wn, btype=key.btype, ftype=key.family, output='sos')
+
+
+def _read_only(coefficients: np.array) -> np.array:
+    coefficients.setflags(write=False)
+    return coefficients
+
+
+def convolution_method(taps: int, n: int) -> FilterMethod:
+    """Cheapest way to convolve ``n`` samples with ``taps`` taps according to an operation count cost model.
+
+    Direct convolution costs a multiply-add per tap and sample. FFT convolution transforms the whole signal padded by
+    the filter, overlap-add transforms blocks a few times the filter length, of which all but the filter length are
+    new samples: both cost about ``L log2 L`` per transform of length ``L``.
+    """
+    direct = DIRECT_COST * n * taps
+    length = scipy.fft.next_fast_len(n + taps - 1, real=True)
+    fft = FFT_COST * length * np.log2(length)
+    block = scipy.fft.next_fast_len(max(OVERLAP_ADD_BLOCK * taps, MIN_BLOCK), real=True)
+    steps = -(-n // (block - taps + 1))
+    overlap_add = FFT_COST * steps * block * np.log2(block)
+    costs = {FilterMethod.DIRECT: direct, FilterMethod.FFT: fft, FilterMethod.OVERLAP_ADD: overlap_add}
+    return min(costs, key=costs.get)
+
+
+def apply(key: FilterDesignKey, samples: np.array, method: FilterMethod = FilterMethod.AUTO,
+          zero_phase: bool = False) -> tuple[np.array, FilterMethod]:
+    """Filters ``samples`` along the last axis with the design ``key`` and returns the output and the method used.
+
+    IIR filters run as second-order sections, forward and backward with ``sosfiltfilt`` for zero phase. FIR filters
+    are convolved with the given method, or with the cheapest by :func:`convolution_method`. Their zero-phase output
+    is that of ``filtfilt``, the signal convolved with the filter and its reverse, centered, with the signal taken as
+    zero beyond its ends.
+    """
+    coefficients = design(key)
+    if key.family != FilterFamily.FIR.name.lower():
+        if zero_phase:
+            return signal.sosfiltfilt(np.array(coefficients), samples, axis=-1), FilterMethod.SOS
+        return sosfilt(coefficients, samples), FilterMethod.SOS
+
+    kernel = np.convolve(coefficients, coefficients[::-1]) if zero_phase else coefficients
+    if method in (FilterMethod.AUTO, FilterMethod.SOS):
+        method = convolution_method(len(kernel), np.shape(samples)[-1])
+    # The zero-phase kernel is symmetric, its output is centered by dropping the delay of half its length
+    return convolve(kernel, samples, method, shift=len(kernel) // 2 if zero_phase else 0), method
+
+
+def convolve(kernel: np.array, samples: np.array, method: FilterMethod, shift: int = 0) -> np.array:
+    """Samples ``shift`` to ``shift + n`` of the full convolution of ``samples`` with ``kernel`` along the last axis."""
+    samples = np.asarray(samples)
+    n = samples.shape[-1]
+    if method == FilterMethod.DIRECT:
+        if shift:
+            samples = np.concatenate([samples, np.zeros(samples.shape[:-1] + (shift,), dtype=samples.dtype)], axis=-1)
+        return signal.lfilter(kernel, [1.0], samples, axis=-1)[..., shift:]
+    kernel = kernel.reshape((1,) * (samples.ndim - 1) + (-1,))
+    full = signal.fftconvolve if method == FilterMethod.FFT else signal.oaconvolve
+    return full(samples, kernel, axes=-1)[..., shift:shift + n]
+
+
+def decimation_factor(key: FilterDesignKey, n: int) -> int:
+    """Factor a signal of ``n`` samples can be decimated by before filter ``key`` without aliasing into its band.
+
+    Only low-pass and band-pass filters drop everything above their upper band edge; the others keep the full rate.
+    """
+    if key.btype not in ('lowpass', 'bandpass'):
+        return 1
+    factor = int(MULTIRATE_BAND_EDGE / max(key.wn))
+    return max(min(factor, n // MULTIRATE_MIN_SAMPLES), 1)
+
+
+def decimated_key(key: FilterDesignKey, factor: int) -> FilterDesignKey:
+    """Design ``key`` at a sample rate ``factor`` times lower, FIR filters keeping their transition width in Hz."""
+    wn = tuple(round(w * factor, WN_DIGITS) for w in key.wn)
+    order = max(key.order // factor, 3) | 1 if key.family == FilterFamily.FIR.name.lower() else key.order
+    return key._replace(order=order, wn=wn)
+
+
+def resampling_taps(factor: int) -> np.array:
+    """Anti-aliasing and anti-imaging filter of a decimation by ``factor``, designed once and then cached.
+
+    Only what would alias into the band kept below ``MULTIRATE_BAND_EDGE`` of the decimated Nyquist frequency has to
+    be rejected, so the transition band reaches past the decimated Nyquist frequency and the filter stays short.
+    """
+    def design_taps():
+        taps, beta = signal.kaiserord(RESAMPLING_ATTENUATION, 2 * (1 - MULTIRATE_BAND_EDGE) / factor)
+        return _read_only(signal.firwin(taps | 1, 1 / factor, window=('kaiser', beta)))
+
+    return design_cache.get_or_compute(('resampling', factor), design_taps)
+
+
+def multirate(key: FilterDesignKey, samples: np.array, method: FilterMethod = FilterMethod.AUTO,
+              zero_phase: bool = False, restore: bool = True, check: bool = True) -> MultirateResult:
+    """Decimates ``samples`` by polyphase resampling, filters them at the lower rate and, if ``restore``, resamples
+    the output back to the original rate.
+
+    The filter runs on ``factor`` times fewer samples and is designed at a normalized cutoff ``factor`` times higher,
+    away from the ill-conditioned region of narrow IIR designs. Without ``restore`` the output holds every
+    ``factor``-th sample.
+
+    With ``check``, the deviation from the full-rate filter is measured on a segment of the signal, which costs a
+    full-rate filter of at most ``MULTIRATE_CHECK + 2 * MULTIRATE_MAX_GUARD`` samples; otherwise the error is None.
+    """
+    samples = np.asarray(samples)
+    n = samples.shape[-1]
+    factor = decimation_factor(key, n)
+    if factor == 1:
+        output, method = apply(key, samples, method, zero_phase)
+        return MultirateResult(output, method, 1, 0.0)
+
+    taps = resampling_taps(factor)
+    decimated = signal.resample_poly(samples, 1, factor, axis=-1, window=taps, padtype='line')
+    filtered, method = apply(decimated_key(key, factor), decimated, method, zero_phase)
+    if restore:
+        output = signal.resample_poly(filtered, factor, 1, axis=-1, window=taps, padtype='line')[..., :n]
+    else:
+        output = filtered
+    error = _multirate_error(key, samples, output, factor, restore, zero_phase) if check else None
+    return MultirateResult(output, method, factor, error)
+
+
+def _multirate_error(key: FilterDesignKey, samples: np.array, output: np.array, factor: int, restore: bool,
+                     zero_phase: bool) -> float:
+    # The full-rate filter is applied to a segment in the middle of the signal only. It starts and ends some periods
+    # of the lowest band edge beyond the compared samples, so that its output has settled to that of the whole signal.
+    # For the narrowest cutoffs the capped guard leaves some of the settling in the measured error, overestimating it.
+    n = samples.shape[-1]
+    guard = min(int(MULTIRATE_SETTLE_PERIODS * 2 / min(key.wn)), MULTIRATE_MAX_GUARD)
+    first = max(n // 2 - MULTIRATE_CHECK // 2, 0)
+    last = min(first + MULTIRATE_CHECK, n)
+    start, stop = max(first - guard, 0), min(last + guard, n)
+    reference, _ = apply(key, samples[..., start:stop], zero_phase=zero_phase)
+
+    if restore:
+        positions = np.arange(first, last)
+        compared = output[..., positions]
+    else:
+        positions = np.arange(-(-first // factor) * factor, last, factor)
+        compared = output[..., positions // factor]
+    reference = reference[..., positions - start]
+    scale = np.sqrt(np.mean(np.square(reference)))
+    return float(np.sqrt(np.mean(np.square(compared - reference))) / scale) if scale else 0.0
+
+
+def sosfilt_blocks(sos: np.array, samples: np.array, block_size: int = FILTER_BLOCK_SIZE) -> Iterator[np.array]:
+    """Filters ``samples`` block by block along the last axis, carrying the filter state between blocks.
+
+    The concatenated blocks are identical to ``signal.sosfilt(sos, samples, axis=-1)``, but the temporaries never
+    exceed one block, so statistics, spectra or exports can consume a long signal with bounded memory. All channels of
+    a 2-D (channels x samples) array are filtered together in every call.
+    """
+    # scipy's compiled sosfilt takes writable sections only, and cached designs are read-only; the copy is tiny
+    sos = np.array(sos)
+    zi = np.zeros((sos.shape[0],) + np.shape(samples)[:-1] + (2,), dtype=np.result_type(sos, samples))
+    for start in range(0, np.shape(samples)[-1], block_size):
+        block, zi = signal.sosfilt(sos, samples[..., start:start + block_size], axis=-1, zi=zi)
+        yield block
+
+
+def sosfilt(sos: np.array, samples: np.array, block_size: int = FILTER_BLOCK_SIZE, out: np.array = None) -> np.array:
+    """Block-wise equivalent of ``signal.sosfilt``, writing into ``out`` (for example a memory-mapped file) if given."""
+    output = np.empty(np.shape(samples), dtype=np.result_type(sos, samples)) if out is None else out
+    start = 0
+    for block in sosfilt_blocks(sos, samples, block_size):
+        output[..., start:start + block.shape[-1]] = block
+        start += block.shape[-1]
+    return output
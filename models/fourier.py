@@ -0,0 +1,68 @@
+from enum import Enum
+
+import numpy as np
+import scipy.fft
+
+from utils.cache import LruCache
+from utils.env import FFT_BACKEND, FFT_WORKERS, FFT_LENGTH, FFT_PRECISION, FFT_FREQ_CACHE_SIZE
+
+
+class FftBackend(Enum):
+    NUMPY = 'numpy'
+    SCIPY = 'scipy'
+
+
+class FftLength(Enum):
+    """Transform length relative to the number of samples.
+
+    Lengths with large prime factors are many times slower than nearby lengths with only small ones. ``PAD`` zero-pads
+    to the next fast length, which keeps every sample and only refines the frequency grid; ``CROP`` drops the trailing
+    samples beyond the previous fast length; ``EXACT`` transforms the samples as they are.
+    """
+    EXACT = 'exact'
+    PAD = 'pad'
+    CROP = 'crop'
+
+
+class FftPrecision(Enum):
+    DOUBLE = np.float64
+    SINGLE = np.float32
+
+
+freq_cache = LruCache(max_entries=FFT_FREQ_CACHE_SIZE)
+
+
+def transform_length(n: int, length: FftLength = FftLength[FFT_LENGTH]) -> int:
+    if length == FftLength.PAD:
+        return scipy.fft.next_fast_len(n, real=True)
+    if length == FftLength.CROP:
+        return scipy.fft.prev_fast_len(n, real=True)
+    return n
+
+
+def rfft(samples: np.array, length: FftLength = FftLength[FFT_LENGTH], backend: FftBackend = FftBackend[FFT_BACKEND],
+         precision: FftPrecision = FftPrecision[FFT_PRECISION], workers: int = FFT_WORKERS) -> np.array:
+    """Real FFT along the last axis with the configured backend, transform length and precision.
+
+    The scipy backend transforms the channels of a multichannel signal on ``workers`` threads (-1 for one per core),
+    and in single precision computes a complex64 result from float32 samples, halving time and memory.
+    """
+    samples = np.asarray(samples, dtype=precision.value)
+    n = transform_length(samples.shape[-1], length)
+    if backend == FftBackend.SCIPY:
+        return scipy.fft.rfft(samples, n=n, axis=-1, workers=workers)
+    return np.fft.rfft(samples, n=n, axis=-1)
+
+
+def rfftfreq(n: int, d: float) -> np.array:
+    """Frequency bins of a real FFT of length ``n``, shared by every spectrum of the same length and spacing.
+
+    The returned array is read-only.
+    """
+    return freq_cache.get_or_compute((n, float(d)), lambda: _rfftfreq(n, d))
+
+
+def _rfftfreq(n: int, d: float) -> np.array:
+    freq = np.fft.rfftfreq(n, d=d)
+    freq.setflags(write=False)
+    return freq
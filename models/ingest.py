@@ -0,0 +1,63 @@
+import hashlib
+import io
+import os
+from typing import IO
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+try:
+    import pyarrow  # noqa: F401 - only probed, pandas drives it
+
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+READ_SIZE = 1 << 20
+# Rows sampled to tell numeric columns from text columns
+SAMPLE_ROWS = 100
+
+
+def content_key(path: str) -> str:
+    """Identifies a file by a hash of its content."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        while chunk := file.read(READ_SIZE):
+            hasher.update(chunk)
+    return f'content-{hasher.hexdigest()}'
+
+
+def file_key(path: str) -> str:
+    """Identifies a file by its location, modification time and size, without reading it."""
+    status = os.stat(path)
+    identity = f'{os.path.abspath(path)}:{status.st_mtime_ns}:{status.st_size}'
+    return f'file-{hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()}'
+
+
+def read_columns(source: bytes | str) -> list[str]:
+    """Column names from the header line, without parsing any data."""
+    with _open(source) as buffer:
+        header = buffer.readline().decode('utf-8-sig').strip()
+    return pd.read_csv(io.StringIO(header), nrows=0).columns.tolist() if header else []
+
+
+def numeric_columns(source: bytes | str) -> list[str]:
+    """Names of the columns holding numbers, judged from the first rows of the file."""
+    with _open(source) as buffer:
+        sample = pd.read_csv(buffer, nrows=SAMPLE_ROWS)
+    return sample.select_dtypes(include='number').columns.tolist()
+
+
+def read_signal_csv(source: bytes | str, usecols: list[str]) -> DataFrame:
+    """Parses only the given columns of a CSV file straight into float64 arrays.
+
+    ``source`` is either the raw file content or a path. The pyarrow engine is used when pyarrow is installed, the
+    default C engine otherwise. Columns are selected by name, the only form both engines accept.
+    """
+    with _open(source) as buffer:
+        return pd.read_csv(buffer, usecols=usecols, dtype=np.float64, engine=CSV_ENGINE)
+
+
+def _open(source: bytes | str) -> IO[bytes]:
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, 'rb')
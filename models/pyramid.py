@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max index over a signal.
+
+    Level ``k`` holds the minimum and maximum of every bucket of ``factor ** k`` consecutive samples. All levels are
+    concatenated into two flat arrays, so they can be stored next to the signal and memory-mapped. A query picks the
+    finest level whose buckets fit into the requested number of points, which makes its cost proportional to the number
+    of returned points rather than to the length of the signal.
+
+    Multichannel signals (channels x samples) get one pyramid per channel, stacked along the first axis.
+    """
+
+    def __init__(self, x_data: np.array, y_data: np.array, mins: np.array, maxs: np.array, factor: int = 8):
+        self.__x_data = x_data
+        self.__y_data = y_data
+        self.__mins = mins
+        self.__maxs = maxs
+        self.__factor = factor
+        self.__offsets = self.__level_offsets(np.shape(y_data)[-1], factor)
+
+    @property
+    def mins(self) -> np.array:
+        return self.__mins
+
+    @property
+    def maxs(self) -> np.array:
+        return self.__maxs
+
+    @property
+    def levels(self) -> int:
+        return len(self.__offsets) - 1
+
+    @staticmethod
+    def build(x_data: np.array, y_data: np.array, factor: int = 8) -> 'MinMaxPyramid':
+        y_array = np.asarray(y_data)
+        empty = np.empty(y_array.shape[:-1] + (0,), dtype=y_array.dtype)
+        mins, maxs = [empty], [empty]
+        level_mins, level_maxs = y_array, y_array
+        for _ in range(len(MinMaxPyramid.__level_offsets(y_array.shape[-1], factor)) - 1):
+            level_mins = MinMaxPyramid.__reduce(level_mins, factor, np.min)
+            level_maxs = MinMaxPyramid.__reduce(level_maxs, factor, np.max)
+            mins.append(level_mins)
+            maxs.append(level_maxs)
+
+        return MinMaxPyramid(x_data, y_array, np.concatenate(mins, axis=-1), np.concatenate(maxs, axis=-1), factor)
+
+    def query(self, x_start: float = None, x_end: float = None, max_points: int = 4000) -> tuple[np.array, np.array]:
+        n = np.shape(self.__y_data)[-1]
+        start = 0 if x_start is None else int(self.__x_data.searchsorted(x_start, side='left'))
+        end = n if x_end is None else int(self.__x_data.searchsorted(x_end, side='right'))
+        # One sample on each side keeps the line running to the edges of the visible range
+        start, end = max(start - 1, 0), min(end + 1, n)
+
+        if end - start <= max_points:
+            return np.asarray(self.__x_data[start:end]), np.asarray(self.__y_data[..., start:end])
+
+        level = 1
+        while level < self.levels and (end - start) / self.__factor ** level > max_points // 2:
+            level += 1
+
+        size = self.__factor ** level
+        first, last = start // size, -(-end // size)
+        level_mins = self.__mins[..., self.__offsets[level - 1] + first:self.__offsets[level - 1] + last]
+        level_maxs = self.__maxs[..., self.__offsets[level - 1] + first:self.__offsets[level - 1] + last]
+
+        bucket_starts = np.arange(first, last) * size
+        bucket_middles = np.minimum(bucket_starts + size // 2, n - 1)
+        x_data = np.column_stack((self.__x_data[bucket_starts], self.__x_data[bucket_middles])).ravel()
+        y_data = np.stack((level_mins, level_maxs), axis=-1).reshape(level_mins.shape[:-1] + (-1,))
+        return x_data, y_data
+
+    @staticmethod
+    def __reduce(values: np.array, factor: int, reduction) -> np.array:
+        full = values.shape[-1] // factor * factor
+        reduced = reduction(values[..., :full].reshape(values.shape[:-1] + (-1, factor)), axis=-1)
+        if full < values.shape[-1]:
+            tail = reduction(values[..., full:], axis=-1, keepdims=True)
+            reduced = np.concatenate((reduced, tail), axis=-1)
+        return reduced
+
+    @staticmethod
+    def __level_offsets(n: int, factor: int) -> list[int]:
+        offsets = [0]
+        size = factor
+        while size < n:
+            offsets.append(offsets[-1] + -(-n // size))
+            size *= factor
+        return offsets
@@ -0,0 +1,71 @@
+from enum import Enum
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+# Upper bound of samples held by the segments transformed at once
+BATCH_SAMPLES = 1 << 20
+
+
+class SpectralMode(Enum):
+    FFT = 'FFT magnitude'
+    WELCH = 'Welch PSD'
+    SPECTROGRAM = 'Spectrogram'
+
+
+def welch(samples: np.array, fs: float, nperseg: int, overlap: float) -> tuple[np.array, np.array]:
+    """Welch power spectral density along the last axis, matching ``signal.welch`` with a Hann window.
+
+    Segments are transformed in batches of at most ``BATCH_SAMPLES`` samples, so memory depends on the segment length,
+    not on the length of the signal, and the result has ``nperseg // 2 + 1`` bins.
+    """
+    nperseg, hop = _segmentation(np.shape(samples)[-1], nperseg, overlap)
+    segments = sliding_window_view(samples, nperseg, axis=-1)[..., ::hop, :]
+    window = signal.get_window('hann', nperseg)
+
+    power = np.zeros(np.shape(samples)[:-1] + (nperseg // 2 + 1,))
+    batch = max(BATCH_SAMPLES // nperseg, 1)
+    for start in range(0, segments.shape[-2], batch):
+        power += np.sum(_periodogram(segments[..., start:start + batch, :], window), axis=-2)
+
+    return np.fft.rfftfreq(nperseg, d=1 / fs), _density(power / segments.shape[-2], window, fs, nperseg)
+
+
+def spectrogram(samples: np.array, fs: float, nperseg: int, overlap: float,
+                max_segments: int = 512) -> tuple[np.array, np.array, np.array]:
+    """Short-time power spectral density along the last axis, shaped (..., frequencies, times).
+
+    At most ``max_segments`` evenly spaced segments are transformed: for long signals the hop between segments grows
+    beyond the requested overlap, which bounds both the cost and the size of the result.
+    """
+    n = np.shape(samples)[-1]
+    nperseg, hop = _segmentation(n, nperseg, overlap)
+    hop = max(hop, -(-(n - nperseg + 1) // max_segments))
+    segments = sliding_window_view(samples, nperseg, axis=-1)[..., ::hop, :]
+    window = signal.get_window('hann', nperseg)
+
+    batch = max(BATCH_SAMPLES // nperseg, 1)
+    power = np.concatenate([
+        _periodogram(segments[..., start:start + batch, :], window) for start in range(0, segments.shape[-2], batch)
+    ], axis=-2)
+    times = (np.arange(segments.shape[-2]) * hop + nperseg / 2) / fs
+    return np.fft.rfftfreq(nperseg, d=1 / fs), times, np.swapaxes(_density(power, window, fs, nperseg), -1, -2)
+
+
+def _segmentation(n: int, nperseg: int, overlap: float) -> tuple[int, int]:
+    nperseg = int(min(max(nperseg, 2), n))
+    noverlap = min(int(nperseg * overlap), nperseg - 1)
+    return nperseg, nperseg - noverlap
+
+
+def _periodogram(segments: np.array, window: np.array) -> np.array:
+    detrended = segments - np.mean(segments, axis=-1, keepdims=True)
+    return np.abs(np.fft.rfft(detrended * window, axis=-1)) ** 2
+
+
+def _density(power: np.array, window: np.array, fs: float, nperseg: int) -> np.array:
+    density = power / (fs * np.sum(window ** 2))
+    # One-sided spectrum: every bin except DC and Nyquist also holds the power of its negative frequency
+    density[..., 1:(nperseg + 1) // 2] *= 2
+    return density
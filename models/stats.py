@@ -0,0 +1,100 @@
+import numpy as np
+
+CHUNK_SIZE = 1 << 15
+
+
+class StatsAccumulator:
+    """Streaming mean, variance, min, max and RMS of a signal.
+
+    Samples are consumed in cache-sized chunks, so every sample is read from memory once and no full-size temporary is
+    allocated. Partial results of separate chunks, blocks or columns are combined with :meth:`merge` using the
+    pairwise update of Chan et al., which keeps the variance numerically stable.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, minimum: float = np.inf,
+                 maximum: float = -np.inf):
+        self.__count = count
+        self.__mean = mean
+        self.__m2 = m2
+        self.__min = minimum
+        self.__max = maximum
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        return self.__mean if self.__count else np.nan
+
+    @property
+    def variance(self) -> float:
+        return self.__m2 / self.__count if self.__count else np.nan
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(self.variance)
+
+    @property
+    def min(self) -> float:
+        return self.__min if self.__count else np.nan
+
+    @property
+    def max(self) -> float:
+        return self.__max if self.__count else np.nan
+
+    @property
+    def rms(self) -> float:
+        return np.sqrt(self.variance + self.mean ** 2)
+
+    def update(self, samples: np.array, chunk_size: int = CHUNK_SIZE) -> 'StatsAccumulator':
+        samples = np.asarray(samples).ravel()
+        for start in range(0, len(samples), chunk_size):
+            chunk = np.asarray(samples[start:start + chunk_size], dtype=np.float64)
+            chunk_mean = chunk.sum() / len(chunk)
+            deviations = chunk - chunk_mean
+            self.__merge(len(chunk), chunk_mean, np.dot(deviations, deviations), chunk.min(), chunk.max())
+        return self
+
+    def merge(self, other: 'StatsAccumulator') -> 'StatsAccumulator':
+        merged = StatsAccumulator(self.__count, self.__mean, self.__m2, self.__min, self.__max)
+        if other.count:
+            merged.__merge(other.count, other.mean, other.variance * other.count, other.min, other.max)
+        return merged
+
+    def result(self, median: float = np.nan) -> dict[str, float]:
+        return {
+            'Mean': self.mean,
+            'Median': median,
+            'Std Dev': self.std,
+            'Min': self.min,
+            'Max': self.max,
+            'Range': self.max - self.min,
+            'RMS': self.rms,
+            'Peak to Peak': self.max - self.min
+        }
+
+    def __merge(self, count: int, mean: float, m2: float, minimum: float, maximum: float):
+        total = self.__count + count
+        delta = mean - self.__mean
+        self.__mean += delta * count / total
+        self.__m2 += m2 + delta ** 2 * self.__count * count / total
+        self.__count = total
+        self.__min = np.minimum(self.__min, minimum)
+        self.__max = np.maximum(self.__max, maximum)
+
+
+def median(samples: np.array) -> float:
+    """Median by selection (introselect, linear on average) instead of a full sort."""
+    samples = np.asarray(samples).ravel()
+    n = len(samples)
+    if n == 0:
+        return np.nan
+    if n % 2:
+        return float(np.partition(samples, n // 2)[n // 2])
+    lower, upper = np.partition(samples, [n // 2 - 1, n // 2])[n // 2 - 1:n // 2 + 1]
+    return (float(lower) + float(upper)) / 2
+
+
+def calculate_stats(samples: np.array) -> dict[str, float]:
+    return StatsAccumulator().update(samples).result(median=median(samples))
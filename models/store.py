@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import numpy as np
+
+from models.data import LoadedSignalData
+from models.pyramid import MinMaxPyramid
+from utils import axis
+from utils.axis import UniformAxis
+from utils.env import SIGNAL_STORE_DIR, SIGNAL_STORE_MAX_BYTES
+
+
+class SignalStore:
+    """Keeps loaded signals on local disk so that only a small handle travels through the browser.
+
+    Every signal is written once as ``.npy`` files into a directory named after its content hash, together with the
+    min/max pyramid used for zooming; an evenly spaced x-axis is only described in the metadata, as (start, step, n).
+    All workers of the server share the same root directory and read the arrays back memory-mapped, so no copy is made
+    on lookup.
+
+    Source files are mapped to the signal parsed from them through aliases, so a known file is never parsed twice. The
+    total size of the store is capped: when it grows beyond ``max_bytes`` the least recently used signals are evicted,
+    except for those pinned by a live process.
+    """
+
+    __X_FILE = 'x.npy'
+    __Y_FILE = 'y.npy'
+    __META_FILE = 'meta.json'
+    __PYRAMID_MIN_FILE = 'pyramid_min.npy'
+    __PYRAMID_MAX_FILE = 'pyramid_max.npy'
+    __ALIASES = '.aliases'
+    __PINS = '.pins'
+
+    def __init__(self, root: str, max_bytes: int = None):
+        self.__root = root
+        self.__max_bytes = max_bytes
+        os.makedirs(os.path.join(self.__root, self.__ALIASES), exist_ok=True)
+        os.makedirs(os.path.join(self.__root, self.__PINS), exist_ok=True)
+
+    @property
+    def root(self) -> str:
+        return self.__root
+
+    def put(self, filename: str, x_data: np.array, y_data: np.array, x_label: str, y_label: str,
+            shape: tuple[int, int], columns: list[str], channel_labels: list[str] = None) -> dict[str, Any]:
+        x_axis = x_data if isinstance(x_data, UniformAxis) else axis.uniform(x_data)
+        x_array = None if x_axis else np.ascontiguousarray(x_data, dtype=np.float64)
+        y_array = np.ascontiguousarray(y_data, dtype=np.float64)
+        meta = {
+            'x_label': str(x_label),
+            'y_label': str(y_label),
+            'shape': [int(size) for size in shape],
+            'columns': [str(column) for column in columns],
+            'channel_labels': None if channel_labels is None else [str(label) for label in channel_labels],
+            'x_axis': x_axis.to_list() if x_axis else None
+        }
+        handle = self.__hash(x_array, y_array, meta)
+
+        if self.contains(handle):
+            self.__touch(handle)
+        else:
+            self.__write(handle, x_axis or x_array, y_array, meta)
+            self.__evict(keep=handle)
+
+        return {'handle': handle, 'filename': filename, **meta}
+
+    def alias(self, source_key: str, data: dict[str, Any]):
+        """Remembers that the source identified by ``source_key`` parses into the stored signal ``data``."""
+        staging = os.path.join(self.__root, self.__ALIASES, f'.{source_key}.{os.getpid()}')
+        with open(staging, 'w') as alias_file:
+            alias_file.write(data['handle'])
+        os.replace(staging, os.path.join(self.__root, self.__ALIASES, source_key))
+
+    def lookup(self, source_key: str, filename: str) -> dict[str, Any] | None:
+        """Store data of the signal previously parsed from the source identified by ``source_key``, if still stored."""
+        try:
+            with open(os.path.join(self.__root, self.__ALIASES, source_key)) as alias_file:
+                handle = alias_file.read()
+            with open(os.path.join(self.__path(handle), self.__META_FILE)) as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+        self.__touch(handle)
+        return {'handle': handle, 'filename': filename, **meta}
+
+    @contextmanager
+    def pin(self, handle: str) -> Iterator[None]:
+        """Keeps the signal ``handle`` from being evicted by any worker or process while the block runs."""
+        # One marker file per pin, named after the pinning process, so that pins of a killed process are ignored
+        path = os.path.join(self.__root, self.__PINS, f'{handle}.{os.getpid()}.{uuid.uuid4().hex}')
+        open(path, 'w').close()
+        try:
+            yield
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def load(self, data: dict[str, Any]) -> LoadedSignalData:
+        return LoadedSignalData(
+            x_data=self.__load_axis(data),
+            y_data=self.__load_array(data, self.__Y_FILE),
+            x_label=data['x_label'],
+            y_label=data['y_label'],
+            filename=data['filename'],
+            shape=tuple(data['shape']),
+            columns=data['columns'],
+            handle=data['handle'],
+            channel_labels=data.get('channel_labels'))
+
+    def load_pyramid(self, data: dict[str, Any]) -> MinMaxPyramid:
+        return MinMaxPyramid(
+            x_data=self.__load_axis(data),
+            y_data=self.__load_array(data, self.__Y_FILE),
+            mins=self.__load_array(data, self.__PYRAMID_MIN_FILE),
+            maxs=self.__load_array(data, self.__PYRAMID_MAX_FILE))
+
+    def contains(self, handle: str) -> bool:
+        return os.path.exists(os.path.join(self.__path(handle), self.__META_FILE))
+
+    def size(self) -> int:
+        return sum(size for _, size in self.__entries())
+
+    def __path(self, handle: str) -> str:
+        return os.path.join(self.__root, handle)
+
+    def __touch(self, handle: str):
+        try:
+            os.utime(os.path.join(self.__path(handle), self.__META_FILE))
+        except OSError:
+            pass
+
+    def __entries(self) -> list[tuple[str, int]]:
+        entries = []
+        for entry in os.scandir(self.__root):
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                entries.append((entry.name, sum(file.stat().st_size for file in os.scandir(entry.path))))
+            except OSError:
+                continue
+        return entries
+
+    def __evict(self, keep: str):
+        if self.__max_bytes is None:
+            return
+
+        entries = self.__entries()
+        total = sum(size for _, size in entries)
+        if total <= self.__max_bytes:
+            return
+
+        def last_used(entry: tuple[str, int]) -> float:
+            try:
+                return os.path.getmtime(os.path.join(self.__path(entry[0]), self.__META_FILE))
+            except OSError:
+                return 0.0
+
+        protected = self.__pinned() | {keep}
+        for handle, size in sorted(entries, key=last_used):
+            if total <= self.__max_bytes:
+                break
+            if handle not in protected:
+                shutil.rmtree(self.__path(handle), ignore_errors=True)
+                total -= size
+
+    def __pinned(self) -> set[str]:
+        pinned = set()
+        for name in os.listdir(os.path.join(self.__root, self.__PINS)):
+            handle, pid, _ = name.split('.')
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                continue
+            except PermissionError:
+                pass
+            pinned.add(handle)
+        return pinned
+
+    def __load_axis(self, data: dict[str, Any]) -> np.array:
+        if data.get('x_axis'):
+            return UniformAxis(*data['x_axis'])
+        return self.__load_array(data, self.__X_FILE)
+
+    def __load_array(self, data: dict[str, Any], name: str) -> np.array:
+        handle = data['handle']
+        if not self.contains(handle):
+            raise LookupError(f'Signal {data.get("filename", handle)} is no longer available, please load it again')
+        self.__touch(handle)
+        return np.load(os.path.join(self.__path(handle), name), mmap_mode='r')
+
+    def __write(self, handle: str, x_array: np.array, y_array: np.array, meta: dict[str, Any]):
+        # Written into a private directory first and renamed, so concurrent workers never see partial files
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.__root)
+        try:
+            if not isinstance(x_array, UniformAxis):
+                np.save(os.path.join(staging, self.__X_FILE), x_array)
+            np.save(os.path.join(staging, self.__Y_FILE), y_array)
+            pyramid = MinMaxPyramid.build(x_array, y_array)
+            np.save(os.path.join(staging, self.__PYRAMID_MIN_FILE), pyramid.mins)
+            np.save(os.path.join(staging, self.__PYRAMID_MAX_FILE), pyramid.maxs)
+            with open(os.path.join(staging, self.__META_FILE), 'w') as meta_file:
+                json.dump(meta, meta_file)
+            os.rename(staging, self.__path(handle))
+        except OSError:
+            if not self.contains(handle):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @staticmethod
+    def __hash(x_array: np.array, y_array: np.array, meta: dict[str, Any]) -> str:
+        hasher = hashlib.blake2b(json.dumps(meta, sort_keys=True).encode(), digest_size=16)
+        # A uniform x-axis is part of the metadata already
+        for array in (y_array,) if x_array is None else (x_array, y_array):
+            hasher.update(str(array.shape).encode())
+            hasher.update(memoryview(array))
+        return hasher.hexdigest()
+
+
+signal_store = SignalStore(SIGNAL_STORE_DIR, SIGNAL_STORE_MAX_BYTES)
@@ -0,0 +1,355 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from enum import Enum
+
+import numpy as np
+
+from models import fourier
+from models.stats import StatsAccumulator
+from utils import axis
+from utils.env import STREAM_CAPACITY, STREAM_WINDOW, STREAM_DIR, STREAM_HOST, STREAM_MAX_OPEN
+
+READ_SIZE = 1 << 16
+POLL_INTERVAL = 0.1
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost')
+
+
+class StreamSource(Enum):
+    UDP = 'UDP socket'
+    FILE = 'Tailed file'
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of the latest samples of a stream, overwriting the oldest ones once full.
+
+    Samples are addressed by their position in the stream, counted from the first sample ever written, so a reader
+    asks for everything after the last position it saw and gets what is still held.
+    """
+
+    def __init__(self, capacity: int, channels: int):
+        self.__x_data = np.zeros(capacity)
+        self.__y_data = np.zeros((channels, capacity))
+        self.__total = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.__x_data)
+
+    @property
+    def channels(self) -> int:
+        return len(self.__y_data)
+
+    @property
+    def total(self) -> int:
+        """Number of samples written since the buffer was created."""
+        return self.__total
+
+    @property
+    def spacing(self) -> float:
+        """Mean spacing of the x values held, from the first and the last since the differences telescope."""
+        n = len(self)
+        if n < 2:
+            return 1.0
+        first = self.__x_data[(self.__total - n) % self.capacity]
+        last = self.__x_data[(self.__total - 1) % self.capacity]
+        return float(last - first) / (n - 1) or 1.0
+
+    def __len__(self) -> int:
+        return min(self.__total, self.capacity)
+
+    def write(self, x_data: np.array, y_data: np.array):
+        """Appends samples, ``y_data`` holding one row per channel."""
+        x_data = np.asarray(x_data, dtype=np.float64).ravel()
+        y_data = np.asarray(y_data, dtype=np.float64).reshape(self.channels, -1)
+        count = len(x_data)
+        # Of a block larger than the buffer only the samples it can hold are copied
+        kept = min(count, self.capacity)
+        x_data, y_data = x_data[count - kept:], y_data[:, count - kept:]
+        start = (self.__total + count - kept) % self.capacity
+        head = min(kept, self.capacity - start)
+        self.__x_data[start:start + head] = x_data[:head]
+        self.__y_data[:, start:start + head] = y_data[:, :head]
+        self.__x_data[:kept - head] = x_data[head:]
+        self.__y_data[:, :kept - head] = y_data[:, head:]
+        self.__total += count
+
+    def since(self, position: int = 0) -> tuple[int, np.array, np.array]:
+        """Samples written after ``position`` that are still held, and the position the first of them has."""
+        first = max(position, self.__total - len(self), 0)
+        indices = np.arange(first, self.__total) % self.capacity
+        return first, self.__x_data[indices], self.__y_data[:, indices]
+
+    def latest(self, count: int) -> tuple[np.array, np.array]:
+        _, x_data, y_data = self.since(self.__total - count)
+        return x_data, y_data
+
+
+class SignalStream:
+    """Live signal received from a source, kept in a ring buffer with running statistics and a sliding spectrum.
+
+    Samples arrive as text lines of comma separated values, the x value first and one value per channel after it,
+    exactly like the rows of an uploaded CSV file. A first line that is not numeric names the columns. The statistics
+    are updated with every block received, so they cover the whole stream at the cost of the new samples only.
+    """
+
+    def __init__(self, source: StreamSource, address: str, capacity: int = STREAM_CAPACITY,
+                 window: int = STREAM_WINDOW):
+        self.__id = uuid.uuid4().hex
+        self.__source = source
+        self.__address = address
+        self.__capacity = capacity
+        self.__window = window
+        self.__buffer = None
+        self.__accumulators = []
+        self.__columns = None
+        self.__remainder = b''
+        self.__spectrum = None
+        self.__error = None
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    @property
+    def stream_id(self) -> str:
+        return self.__id
+
+    @property
+    def source(self) -> StreamSource:
+        return self.__source
+
+    @property
+    def address(self) -> str:
+        return self.__address
+
+    @property
+    def error(self) -> str | None:
+        return self.__error
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def total(self) -> int:
+        with self.__lock:
+            return self.__buffer.total if self.__buffer else 0
+
+    @property
+    def columns(self) -> list[str]:
+        with self.__lock:
+            channels = self.__buffer.channels if self.__buffer else 0
+            return self.__columns or ['x'] + [f'ch{channel}' for channel in range(channels)]
+
+    @property
+    def channel_labels(self) -> list[str]:
+        return self.columns[1:]
+
+    @property
+    def sample_spacing(self) -> float:
+        """Mean spacing of the samples held."""
+        with self.__lock:
+            return self.__buffer.spacing if self.__buffer else 1.0
+
+    def start(self) -> 'SignalStream':
+        receive = self.__receive_udp if self.__source == StreamSource.UDP else self.__tail_file
+        self.__thread = threading.Thread(target=self.__run, args=(receive,), name=f'stream-{self.__id}', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__stopped.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join(timeout=1.0)
+
+    def feed(self, chunk: bytes):
+        """Parses the complete lines of ``chunk``, keeping an incomplete last line for the next one."""
+        lines = (self.__remainder + chunk).split(b'\n')
+        self.__remainder = lines.pop()
+        rows = []
+        for line in lines:
+            values = line.decode('utf-8', errors='replace').strip().split(',')
+            if not values[0]:
+                continue
+            try:
+                rows.append([float(value) for value in values])
+            except ValueError:
+                if self.__columns is None and self.__buffer is None:
+                    self.__columns = [value.strip() for value in values]
+        if rows:
+            self.__append(rows)
+
+    def since(self, position: int) -> tuple[int, np.array, np.array]:
+        with self.__lock:
+            if self.__buffer is None:
+                return position, np.empty(0), np.empty((0, 0))
+            return self.__buffer.since(position)
+
+    def envelope(self, position: int, bucket: int) -> tuple[int, np.array, np.array]:
+        """Minimum and maximum of every complete bucket of ``bucket`` samples written after ``position``.
+
+        Buckets are aligned on stream positions, so the envelopes of consecutive calls join seamlessly: the returned
+        position, the end of the last complete bucket, is where the next call continues. Every channel gets its own
+        x values, in the order of the samples.
+        """
+        first, x_data, y_data = self.since(position)
+        start = -(-first // bucket) * bucket
+        end = max((first + len(x_data)) // bucket * bucket, start)
+        x_data, y_data = x_data[start - first:end - first], y_data[:, start - first:end - first]
+        if bucket == 1:
+            return end, np.broadcast_to(x_data, y_data.shape), y_data
+        channels, n = y_data.shape
+        blocks = y_data.reshape(channels, n // bucket, bucket)
+        indices = np.sort(np.stack([blocks.argmin(axis=2), blocks.argmax(axis=2)], axis=2), axis=2)
+        indices = (indices + (np.arange(n // bucket) * bucket)[:, None]).reshape(channels, -1)
+        return end, x_data[indices], np.take_along_axis(y_data, indices, axis=1)
+
+    def stats(self) -> dict[str, np.ndarray]:
+        with self.__lock:
+            results = [accumulator.result() for accumulator in self.__accumulators]
+        if not results:
+            return {}
+        # The median has no running counterpart and is left out
+        return {name: np.array([result[name] for result in results]) for name in results[0] if name != 'Median'}
+
+    def spectrum(self) -> tuple[np.array, np.array] | None:
+        """Magnitude spectrum of the latest ``window`` samples of every channel, computed once per new block."""
+        with self.__lock:
+            if self.__buffer is None or len(self.__buffer) < 2:
+                return None
+            total = self.__buffer.total
+            if self.__spectrum is not None and self.__spectrum[0] == total:
+                return self.__spectrum[1:]
+            x_data, y_data = self.__buffer.latest(self.__window)
+
+        n = y_data.shape[1]
+        # A Hann window keeps the edges of the window from leaking into the spectrum, the scale restores amplitudes
+        taper = np.hanning(n) if n > 2 else np.ones(n)
+        magnitude = np.abs(fourier.rfft(y_data * taper, fourier.FftLength.EXACT)) * 2 / taper.sum()
+        freq = fourier.rfftfreq(n, d=axis.spacing(x_data) or 1.0)
+        with self.__lock:
+            self.__spectrum = (total, freq, magnitude)
+        return freq, magnitude
+
+    def __append(self, rows: list[list[float]]):
+        width = len(rows[0])
+        block = np.array([row for row in rows if len(row) == width])
+        with self.__lock:
+            if self.__buffer is None:
+                if width < 2:
+                    raise ValueError('Every line must hold an x value and at least one channel')
+                self.__buffer = RingBuffer(self.__capacity, width - 1)
+                self.__accumulators = [StatsAccumulator() for _ in range(width - 1)]
+                if self.__columns is not None and len(self.__columns) != width:
+                    self.__columns = None
+            elif width != self.__buffer.channels + 1:
+                return
+            self.__buffer.write(block[:, 0], block[:, 1:].T)
+            for accumulator, samples in zip(self.__accumulators, block[:, 1:].T):
+                accumulator.update(samples)
+
+    def __run(self, receive):
+        try:
+            receive()
+        except Exception as e:
+            self.__error = str(e)
+
+    def __receive_udp(self):
+        host, _, port = self.__address.rpartition(':')
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+            receiver.bind((host, int(port)))
+            receiver.settimeout(POLL_INTERVAL)
+            while not self.__stopped.is_set():
+                try:
+                    datagram = receiver.recv(READ_SIZE)
+                except socket.timeout:
+                    continue
+                # Every datagram holds whole lines
+                self.feed(datagram if datagram.endswith(b'\n') else datagram + b'\n')
+
+    def __tail_file(self):
+        position = 0
+        while not self.__stopped.is_set():
+            if os.path.exists(self.__address):
+                if os.path.getsize(self.__address) < position:
+                    # The file was truncated or replaced, it is read again from the start
+                    position = 0
+                    self.__remainder = b''
+                with open(self.__address, 'rb') as file:
+                    file.seek(position)
+                    while chunk := file.read(READ_SIZE):
+                        self.feed(chunk)
+                    position = file.tell()
+            time.sleep(POLL_INTERVAL)
+
+
+class StreamRegistry:
+    """Streams open in this process, one per source address, shared by every session watching it.
+
+    Every session connected to a stream holds a subscription, and the stream stops when the last one is released.
+    Files are only tailed below ``directory`` and UDP sockets only bound to the loopback interface or ``host``, since
+    the addresses come from the browser. Streams live in the web worker that opened them: the Live Stream tab needs a
+    single worker.
+    """
+
+    def __init__(self, directory: str = STREAM_DIR, host: str = STREAM_HOST, max_open: int = STREAM_MAX_OPEN):
+        self.__directory = os.path.realpath(directory)
+        self.__hosts = (*LOOPBACK_HOSTS, host)
+        self.__host = host
+        self.__max_open = max_open
+        self.__streams = {}
+        self.__subscribers = {}
+        self.__lock = threading.Lock()
+
+    def open(self, source: StreamSource, address: str, subscriber: str) -> SignalStream:
+        """Subscribes ``subscriber`` to the stream of ``address``, started unless another session receives it."""
+        address = self.__resolve(source, address)
+        with self.__lock:
+            stream = next((stream for stream in self.__streams.values()
+                           if (stream.source, stream.address) == (source, address)), None)
+            if stream is not None and not stream.running:
+                del self.__streams[stream.stream_id]
+                self.__subscribers.pop(stream.stream_id, None)
+                stream = None
+            if stream is None:
+                if len(self.__streams) >= self.__max_open:
+                    raise ValueError(f'At most {self.__max_open} streams can be open at once')
+                stream = SignalStream(source, address).start()
+                self.__streams[stream.stream_id] = stream
+            self.__subscribers.setdefault(stream.stream_id, set()).add(subscriber)
+            return stream
+
+    def get(self, stream_id: str) -> SignalStream | None:
+        with self.__lock:
+            return self.__streams.get(stream_id)
+
+    def close(self, stream_id: str, subscriber: str):
+        """Releases the subscription of ``subscriber``, stopping the stream if it was the last one."""
+        with self.__lock:
+            subscribers = self.__subscribers.get(stream_id, set())
+            subscribers.discard(subscriber)
+            if subscribers:
+                return
+            self.__subscribers.pop(stream_id, None)
+            stream = self.__streams.pop(stream_id, None)
+        if stream is not None:
+            stream.stop()
+
+    def __resolve(self, source: StreamSource, address: str) -> str:
+        if source == StreamSource.FILE:
+            path = os.path.realpath(os.path.join(self.__directory, address))
+            if os.path.commonpath([path, self.__directory]) != self.__directory:
+                raise ValueError(f'Only files in {self.__directory} can be streamed')
+            return path
+
+        host, _, port = address.rpartition(':')
+        if host and host not in self.__hosts:
+            raise ValueError(f'Only {", ".join(dict.fromkeys(self.__hosts))} can be listened on')
+        if not port.isdigit() or not 0 < int(port) < 65536:
+            raise ValueError(f'Invalid port: {port}')
+        return f'{host or self.__host}:{int(port)}'
+
+
+stream_registry = StreamRegistry()
@@ -0,0 +1,56 @@
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from models import compute, filtering, spectrum
+from models.data import FilteredSignalData
+from models.filtering import FilterDesignKey
+from models.store import signal_store
+from utils.metrics import metrics
+
+
+class SweepResult(NamedTuple):
+    key: FilterDesignKey
+    cutoffs: tuple[float, ...]
+    order: int
+    stats: dict[str, float | np.ndarray]
+    freq: np.array
+    psd: np.array
+
+
+def sweep(data: dict[str, Any], btype: str, cutoff_grid: list[list[float]], orders: list[int],
+          nperseg: int = 1024) -> list[SweepResult]:
+    """Applies every combination of cutoffs and filter order to the stored signal ``data``.
+
+    All filters are designed up front and evaluated on the compute pool, one setting per task; every task memory-maps
+    the signal from the store, so nothing but the handle is sent to the pool, and only the statistics and the Welch
+    PSD of every setting come back. Settings are not filtered in one vectorized call: scipy runs one cascade of
+    sections over many signals, not many cascades over one, so without ``COMPUTE_WORKERS`` they run one after another
+    in the web worker. The outputs are dropped once measured, and a chosen setting is filtered again when applied.
+    The signal is pinned in the store while the sweep runs, so that signals stored meanwhile never evict it.
+    """
+    fs = filtering.sample_rate(signal_store.load(data).x_data)
+    settings = [(tuple(cutoffs), int(order)) for cutoffs in cutoff_grid for order in orders]
+    tasks = [(data, filtering.design_key(order, list(cutoffs), fs, btype), cutoffs, order, nperseg)
+             for cutoffs, order in settings]
+    with signal_store.pin(data['handle']), metrics.span('sweep'):
+        return compute.executor.map(evaluate, tasks)
+
+
+def evaluate(task: tuple[dict[str, Any], FilterDesignKey, tuple[float, ...], int, int]) -> SweepResult:
+    data, key, cutoffs, order, nperseg = task
+    loaded_signal_data = signal_store.load(data)
+    # A setting applied before has its output in the store
+    filtered_data = signal_store.lookup(filtering.result_key(data['handle'], key), loaded_signal_data.filename)
+    if filtered_data is None:
+        filtered_signal = filtering.sosfilt(filtering.design(key), loaded_signal_data.y_data)
+    else:
+        filtered_signal = signal_store.load(filtered_data).y_data
+
+    filtered_signal_data = FilteredSignalData(x_data=loaded_signal_data.x_data, y_data=filtered_signal,
+                                              x_label=loaded_signal_data.x_label, y_label=loaded_signal_data.y_label,
+                                              filter_type=key.btype, cutoff_freq=cutoffs[0],
+                                              cutoff_freq_range=cutoffs[-1], filter_order=order,
+                                              channel_labels=loaded_signal_data.channel_labels)
+    freq, psd = spectrum.welch(filtered_signal_data.y_data, 1.0 / filtered_signal_data.sample_spacing, nperseg, 0.5)
+    return SweepResult(key, cutoffs, order, filtered_signal_data.calculate_stats(), freq, psd)
@@ -0,0 +1,82 @@
+import os
+import re
+import time
+import uuid
+from typing import IO
+
+from utils.env import UPLOAD_DIR, UPLOAD_TTL
+
+try:
+    import fcntl
+except ImportError:
+    # Missing on Windows, where chunks of the same upload are not guarded against each other
+    fcntl = None
+
+READ_SIZE = 1 << 20
+
+
+class UploadStore:
+    """Streams chunked uploads into files on local disk.
+
+    Every upload is identified by an id generated here by :meth:`create` and written strictly in order: a chunk is
+    accepted only at the offset where the previous one ended, so an interrupted upload is resumed by asking for the
+    received size and continuing from there. Nothing is kept in memory beyond a single read buffer.
+    """
+
+    __ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,128}$')
+
+    def __init__(self, root: str, ttl: float):
+        self.__root = root
+        self.__ttl = ttl
+        os.makedirs(self.__root, exist_ok=True)
+
+    def create(self) -> str:
+        self.__purge_expired()
+        upload_id = uuid.uuid4().hex
+        open(self.path(upload_id), 'xb').close()
+        return upload_id
+
+    def exists(self, upload_id: str) -> bool:
+        return os.path.exists(self.path(upload_id))
+
+    def received(self, upload_id: str) -> int:
+        path = self.path(upload_id)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def write(self, upload_id: str, offset: int, stream: IO[bytes]) -> int:
+        try:
+            file = open(self.path(upload_id), 'r+b')
+        except FileNotFoundError:
+            raise ValueError(f'Unknown or expired upload: {upload_id}')
+
+        with file:
+            # Held across the offset check and the append, against chunks of the same upload sent to other threads
+            # or workers at once, e.g. by a retry racing the original request
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            received = os.fstat(file.fileno()).st_size
+            if offset != received:
+                raise ValueError(f'Expected a chunk at offset {received}, got {offset}')
+            file.seek(received)
+            while chunk := stream.read(READ_SIZE):
+                file.write(chunk)
+            file.flush()
+            return file.tell()
+
+    def path(self, upload_id: str) -> str:
+        if not self.__ID_PATTERN.match(upload_id or ''):
+            raise ValueError(f'Invalid upload id: {upload_id}')
+        return os.path.join(self.__root, f'{upload_id}.part')
+
+    def __purge_expired(self):
+        expired = time.time() - self.__ttl
+        for name in os.listdir(self.__root):
+            path = os.path.join(self.__root, name)
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+upload_store = UploadStore(UPLOAD_DIR, UPLOAD_TTL)
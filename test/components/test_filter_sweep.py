@@ -0,0 +1,29 @@
+import unittest
+
+from components.filter_sweep import FilterSweep, MAX_ORDER
+
+
+class TestParseValues(unittest.TestCase):
+
+    def test_distinct_values_in_order(self):
+        # Given
+        text = '8, 2; 8, 4'
+
+        # When
+        values = FilterSweep.parse_values(text, int, MAX_ORDER)
+
+        # Then
+        self.assertEqual(values, [8, 2, 4])
+
+    def test_orders_beyond_the_dropdown_are_refused(self):
+        # Given
+        text = f'4, {MAX_ORDER + 1}'
+
+        # When
+        # Then
+        with self.assertRaises(ValueError):
+            FilterSweep.parse_values(text, int, MAX_ORDER)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import base64
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from dash import Dash, html
+
+from components.signal_filtering import FILTERED_SIGNAL_UID, FILTERED_SPECTRUM_UID, SignalFiltering
+from models import filtering
+from models.data import FilteredSignalData
+from models.store import SignalStore
+from test.utils.test_background import run_job
+from utils import background, figure
+from utils.cache import SharedCache
+
+try:
+    import diskcache
+    from dash import DiskcacheManager
+except ImportError:
+    diskcache = None
+
+
+def decode(values) -> np.array:
+    if isinstance(values, dict):
+        return np.frombuffer(base64.b64decode(values['bdata']), dtype=values['dtype'])
+    return np.asarray(values)
+
+
+class TestFilteredPatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SignalStore(self.directory.name)
+        self.patcher = patch('components.signal_filtering.signal_store', self.store)
+        self.patcher.start()
+        x_data = np.arange(10_000) / 1000.0
+        y_data = np.vstack([np.sin(2 * np.pi * x_data), 10 + np.cos(2 * np.pi * x_data)])
+        self.filtered_data = self.store.put('signal.csv', x_data, y_data, 'Time (s)', 'Amplitude', (10_000, 3), [],
+                                            channel_labels=['a', 'b'])
+        self.filtered_signal_data = FilteredSignalData(x_data=x_data, y_data=y_data, x_label='Time (s)',
+                                                       y_label='Amplitude', filter_type='LOWPASS', cutoff_freq=10.0,
+                                                       cutoff_freq_range=10.0, filter_order=4,
+                                                       channel_labels=['a', 'b'])
+        # Spectrum traces first and the channels swapped, unlike the layout of a figure drawn from scratch
+        uids = [FILTERED_SPECTRUM_UID.format(1), FILTERED_SPECTRUM_UID.format(0), 'raw',
+                FILTERED_SIGNAL_UID.format(1), FILTERED_SIGNAL_UID.format(0)]
+        self.figure = {'data': [{'uid': uid, 'x': [], 'y': []} for uid in uids], 'layout': {}}
+        self.indices = figure.trace_indices(self.figure)
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.directory.cleanup()
+
+    def apply(self, figure_patch) -> list[dict]:
+        traces = [dict(trace) for trace in self.figure['data']]
+        for operation in figure_patch.to_plotly_json()['operations']:
+            _, index, name = operation['location']
+            traces[index][name] = decode(operation['params']['value'])
+        return traces
+
+    def test_traces_are_found_by_uid(self):
+        # Given
+        # When
+        traces = self.apply(SignalFiltering.create_filtered_patch(self.filtered_data, self.filtered_signal_data,
+                                                                  self.indices))
+
+        # Then
+        self.assertEqual(len(traces[2]['x']), 0)
+        self.assertLessEqual(np.abs(traces[4]['y']).max(), 1.0)
+        self.assertGreaterEqual(traces[3]['y'].min(), 9.0)
+        self.assertLess(traces[4]['x'][0], 0.01)
+        self.assertGreater(traces[4]['x'][-1], 9.99)
+        magnitudes = [np.atleast_2d(self.filtered_signal_data.spectral_analyze_result.fft_magnitude)[channel]
+                      for channel in range(2)]
+        self.assertAlmostEqual(traces[1]['y'].max(), magnitudes[0].max(), places=3)
+        self.assertAlmostEqual(traces[0]['y'].max(), magnitudes[1].max(), places=3)
+
+    def test_visible_range_is_taken_from_the_relayout_event(self):
+        # Given
+        relayout_data = {'xaxis.range[0]': 2.0, 'xaxis.range[1]': 3.0}
+
+        # When
+        traces = self.apply(SignalFiltering.create_filtered_patch(self.filtered_data, self.filtered_signal_data,
+                                                                  self.indices, relayout_data))
+
+        # Then
+        for index in [3, 4]:
+            self.assertGreaterEqual(traces[index]['x'][0], 1.99)
+            self.assertLessEqual(traces[index]['x'][-1], 3.01)
+
+    def test_reset_axis_shows_all_data(self):
+        # Given
+        relayout_data = {'xaxis.autorange': True}
+
+        # When
+        traces = self.apply(SignalFiltering.create_filtered_patch(self.filtered_data, self.filtered_signal_data,
+                                                                  self.indices, relayout_data))
+
+        # Then
+        self.assertLess(traces[4]['x'][0], 0.01)
+        self.assertGreater(traces[4]['x'][-1], 9.99)
+
+    def test_figure_without_the_filtered_traces(self):
+        # Given
+        del self.indices[FILTERED_SPECTRUM_UID.format(1)]
+
+        # When
+        figure_patch = SignalFiltering.create_filtered_patch(self.filtered_data, self.filtered_signal_data,
+                                                             self.indices)
+
+        # Then
+        self.assertIsNone(figure_patch)
+
+
+@unittest.skipIf(diskcache is None, 'diskcache is not installed')
+class TestApplyFilterInBackground(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        store = SignalStore(os.path.join(self.directory.name, 'store'))
+        results = SharedCache(os.path.join(self.directory.name, 'results'), max_bytes=1 << 26)
+        manager = DiskcacheManager(diskcache.Cache(os.path.join(self.directory.name, 'jobs')))
+        self.patchers = [patch('components.signal_filtering.signal_store', store),
+                         patch.object(filtering, 'result_cache', results), patch.object(background, 'manager', manager)]
+        for patcher in self.patchers:
+            patcher.start()
+        x_data = np.arange(20_000) / 1000.0
+        y_data = np.sin(2 * np.pi * 2 * x_data) + np.sin(2 * np.pi * 100 * x_data)
+        self.data = store.put('signal.csv', x_data, y_data, 'Time (s)', 'Amplitude', (20_000, 2), [])
+        self.app = Dash(__name__)
+        self.app.layout = html.Div()
+        SignalFiltering().register_callbacks(self.app)
+        self.client = self.app.server.test_client()
+        self.callback = next(callback for callback in self.client.get('/_dash-dependencies').get_json()
+                             if 'filter-info.children' in callback['output'])
+
+    def tearDown(self):
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        self.directory.cleanup()
+
+    def test_result_cache_hits_across_jobs(self):
+        # Given
+        state = [self.data, 'LOWPASS', 10.0, None, 4, None, None, 'BUTTER', 101, 'AUTO', [], 'FULL']
+
+        # When
+        first = run_job(self.client, self.callback, [1], state)
+        second = run_job(self.client, self.callback, [2], state)
+
+        # Then
+        self.assertNotIn('served from the result cache', str(first['filter-info']))
+        self.assertIn('served from the result cache', str(second['filter-info']))
+        self.assertEqual(second['filtered-signal-data'], first['filtered-signal-data'])
+        self.assertEqual(filtering.result_cache.stats()['hits'], 1)
+
+    def test_reapplied_filter_is_patched(self):
+        # Given
+        state = [self.data, 'LOWPASS', 10.0, None, 4, None, None, 'BUTTER', 101, 'AUTO', [], 'FULL']
+        first = run_job(self.client, self.callback, [1], state)
+        base = first['filtered-signal-base']['data']
+        state[1], state[5], state[6] = 'HIGHPASS', base, {'xaxis.range[0]': 2.0, 'xaxis.range[1]': 3.0}
+
+        # When
+        second = run_job(self.client, self.callback, [2], state)
+
+        # Then
+        self.assertEqual(base['handle'], self.data['handle'])
+        self.assertEqual(base['traces'], figure.trace_indices(first['filtered-signal-graph']['figure']))
+        self.assertIn('operations', second['filtered-signal-graph']['figure'])
+        self.assertEqual(second['filtered-signal-base']['data'], base)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from models import batch, filtering
+from models.batch import BatchSpec, OutputFormat
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.directory.name, 'input')
+        self.output_dir = os.path.join(self.directory.name, 'output')
+        os.makedirs(os.path.join(self.input_dir, 'nested'))
+        self.x_data = np.arange(2000) / 1000.0
+        self.y_data = np.vstack([np.sin(2 * np.pi * 5 * self.x_data), np.sin(2 * np.pi * 200 * self.x_data)])
+        for name in ['a.csv', os.path.join('nested', 'b.csv')]:
+            self.write_csv(os.path.join(self.input_dir, name))
+        with open(os.path.join(self.input_dir, 'notes.txt'), 'w') as file:
+            file.write('not a signal')
+        self.spec = BatchSpec(filter_type='LOWPASS', cutoffs=(20.0,), order=4, output_dir=self.output_dir)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_csv(self, path: str, scale: float = 1.0):
+        with open(path, 'w') as file:
+            file.write('Time (s),low,high\n')
+            file.writelines(f'{x:.17g},{low:.17g},{high:.17g}\n'
+                            for x, low, high in zip(self.x_data, *scale * self.y_data))
+
+    def test_expand(self):
+        # Given
+        pattern = os.path.join(self.input_dir, '*.csv')
+
+        # When
+        from_directory = batch.expand([self.input_dir])
+        from_pattern = batch.expand([pattern, pattern])
+
+        # Then
+        self.assertEqual([os.path.basename(path) for path in from_directory], ['a.csv', 'b.csv'])
+        self.assertEqual([os.path.basename(path) for path in from_pattern], ['a.csv'])
+
+    def test_run_writes_filtered_channels_stats_and_spectra(self):
+        # Given
+        paths = batch.expand([self.input_dir])
+
+        # When
+        results = batch.run(paths, self.spec, workers=1)
+
+        # Then
+        self.assertEqual([(result.samples, result.channels, result.error) for result in results],
+                         [(2000, 2, None), (2000, 2, None)])
+        output = np.load(results[0].output)
+        sos = filtering.design(filtering.design_key(4, [20.0], 1000.0, 'LOWPASS'))
+        np.testing.assert_allclose(output['filtered'], filtering.sosfilt(sos, self.y_data))
+        np.testing.assert_allclose(output['x'], self.x_data)
+        self.assertEqual(output['channel_labels'].tolist(), ['low', 'high'])
+        self.assertEqual(output['filtered_stats'].shape, (len(output['stat_names']), 2))
+        self.assertEqual(output['magnitude'].shape, (2, len(output['freq'])))
+        rms = list(output['stat_names']).index('RMS')
+        self.assertLess(output['filtered_stats'][rms, 1], 0.1 * output['raw_stats'][rms, 1])
+
+    def test_files_of_the_same_name_are_kept_apart(self):
+        # Given
+        self.write_csv(os.path.join(self.input_dir, 'nested', 'a.csv'), scale=2.0)
+        paths = batch.expand([self.input_dir])
+
+        # When
+        results = batch.run(paths, self.spec, workers=1)
+
+        # Then
+        self.assertEqual([os.path.relpath(result.output, self.output_dir) for result in results],
+                         ['a.npz', os.path.join('nested', 'a.npz'), os.path.join('nested', 'b.npz')])
+        top, nested = np.load(results[0].output), np.load(results[1].output)
+        np.testing.assert_allclose(nested['filtered'], 2 * top['filtered'])
+
+    def test_colliding_outputs_are_refused(self):
+        # Given
+        upper = os.path.join(self.input_dir, 'a.CSV')
+        self.write_csv(upper)
+
+        # When
+        # Then
+        with self.assertRaises(ValueError):
+            batch.run([os.path.join(self.input_dir, 'a.csv'), upper], self.spec, workers=1)
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_run_on_a_pool(self):
+        # Given
+        paths = batch.expand([self.input_dir])
+        expected = batch.run(paths, self.spec, workers=1)
+        spec = self.spec._replace(output_dir=os.path.join(self.directory.name, 'pool'))
+
+        # When
+        results = batch.run(paths, spec, workers=2)
+
+        # Then
+        self.assertEqual([(result.path, result.samples, result.channels, result.error) for result in results],
+                         [(result.path, result.samples, result.channels, result.error) for result in expected])
+        for result, serial in zip(results, expected):
+            self.assertEqual(os.path.relpath(result.output, spec.output_dir),
+                             os.path.relpath(serial.output, self.output_dir))
+            np.testing.assert_array_equal(np.load(result.output)['filtered'], np.load(serial.output)['filtered'])
+
+    def test_failed_file_is_reported(self):
+        # Given
+        path = os.path.join(self.input_dir, 'notes.txt')
+
+        # When
+        result = batch.process((path, os.path.join(self.output_dir, 'notes'), self.spec))
+
+        # Then
+        self.assertIsNone(result.output)
+        self.assertIsNotNone(result.error)
+
+    @unittest.skipIf(batch.pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_output(self):
+        # Given
+        spec = self.spec._replace(output_format=OutputFormat.PARQUET)
+
+        # When
+        results = batch.run(batch.expand([self.input_dir]), spec, workers=1)
+
+        # Then
+        self.assertTrue(results[0].output.endswith('.parquet'))
+        self.assertTrue(os.path.exists(results[0].output.replace('.parquet', '.stats.parquet')))
@@ -0,0 +1,84 @@
+import os
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from models import filtering, stats
+from models.compute import ComputeExecutor
+
+
+class TestComputeExecutor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ComputeExecutor(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        self.samples = np.random.default_rng(0).normal(size=(3, 50000))
+        self.sos = signal.butter(4, 0.1, output='sos')
+
+    def test_run_inline_without_workers(self):
+        # Given
+        executor = ComputeExecutor(workers=0)
+
+        # When
+        result = executor.run(filtering.sosfilt, self.sos, self.samples)
+
+        # Then
+        np.testing.assert_array_equal(result, signal.sosfilt(self.sos, self.samples, axis=-1))
+
+    def test_run_in_pool(self):
+        # Given
+        expected = signal.sosfilt(self.sos, self.samples, axis=-1)
+
+        # When
+        result = self.executor.run(filtering.sosfilt, self.sos, self.samples, block_size=4096)
+
+        # Then
+        np.testing.assert_array_equal(result, expected)
+        self.assertTrue(result.flags.owndata)
+
+    def test_map(self):
+        # Given
+        # When
+        results = self.executor.map(stats.calculate_stats, self.samples)
+
+        # Then
+        self.assertEqual(len(results), 3)
+        for channel, result in zip(self.samples, results):
+            self.assertAlmostEqual(result['Mean'], np.mean(channel))
+            self.assertAlmostEqual(result['Median'], np.median(channel))
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), 'shared memory blocks are not listed on this platform')
+    def test_shared_memory_is_released(self):
+        # Given
+        before = set(os.listdir('/dev/shm'))
+
+        # When
+        self.executor.run(np.negative, self.samples)
+
+        # Then
+        self.assertEqual(set(os.listdir('/dev/shm')) - before, set())
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), 'shared memory blocks are not listed on this platform')
+    def test_shared_memory_is_released_when_a_job_fails(self):
+        # Given
+        before = set(os.listdir('/dev/shm'))
+        # The first matrix is not positive definite, so its job fails while the others return shared results
+        matrices = [np.zeros((100, 100))] + [np.eye(100) * (index + 1) for index in range(5)]
+
+        # When
+        with self.assertRaises(np.linalg.LinAlgError):
+            self.executor.map(np.linalg.cholesky, matrices)
+
+        # Then
+        self.assertEqual(set(os.listdir('/dev/shm')) - before, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 import unittest
+from unittest import mock
 
 import numpy as np
 
+from models import fourier
 from models.data import SpectralAnalyzeResult, SignalData, LoadedSignalData, FilteredSignalData
+from models.spectrum import SpectralMode
+from utils.axis import UniformAxis
 
 
 class TestSpectralAnalyzeResult(unittest.TestCase):
@@ -76,6 +80,94 @@ class TestSignalData(unittest.TestCase):
         expected_magnitude = np.abs(expected_fft)
         np.testing.assert_array_almost_equal(result.fft_magnitude, expected_magnitude)
 
+    def test_spectral_analyze_is_lazy(self):
+        # Given
+        with mock.patch('models.fourier.rfft', wraps=fourier.rfft) as rfft:
+            signal = SignalData(self.x_data, self.y_data, self.x_label, self.y_label)
+
+            # When
+            signal.calculate_stats()
+            first = signal.spectral_analyze_result
+            second = signal.spectral_analyze_result
+
+        # Then
+        self.assertIs(first, second)
+        self.assertEqual(rfft.call_count, 1)
+
+    def test_spectral_analyze_is_memoized_per_key(self):
+        # Given
+        with mock.patch('models.fourier.rfft', wraps=fourier.rfft) as rfft:
+            first = SignalData(self.x_data, self.y_data, self.x_label, self.y_label, key='memoized-signal')
+            second = SignalData(self.x_data, self.y_data, self.x_label, self.y_label, key='memoized-signal')
+
+            # When
+            first_result = first.spectral_analyze_result
+            second_result = second.spectral_analyze_result
+
+        # Then
+        self.assertIs(first_result, second_result)
+        self.assertEqual(rfft.call_count, 1)
+
+    def test_spectral_analyze_modes(self):
+        # Given
+        signal_data = SignalData(self.x_data, self.y_data, self.x_label, self.y_label, key='spectral-modes')
+
+        # When
+        fft = signal_data.spectral_analyze(SpectralMode.FFT)
+        welch = signal_data.spectral_analyze(SpectralMode.WELCH, nperseg=4, overlap=0.5)
+        spectrogram = signal_data.spectral_analyze(SpectralMode.SPECTROGRAM, nperseg=4, overlap=0.5)
+
+        # Then
+        self.assertIs(fft, signal_data.spectral_analyze_result)
+        self.assertIs(welch, signal_data.spectral_analyze(SpectralMode.WELCH, nperseg=4, overlap=0.5))
+        self.assertEqual(welch.mode, SpectralMode.WELCH)
+        self.assertIsNone(welch.fft_result)
+        self.assertEqual(welch.fft_magnitude.shape, (3,))
+        self.assertEqual(spectrogram.fft_magnitude.shape, (3, len(spectrogram.times)))
+        self.assertGreaterEqual(spectrogram.times[0], self.x_data[0])
+
+
+class TestMultichannelSignalData(unittest.TestCase):
+
+    def setUp(self):
+        self.x_data = np.linspace(0, 1, 100)
+        self.y_data = np.vstack([np.sin(2 * np.pi * frequency * self.x_data) for frequency in (5, 10, 20)])
+        self.signal = SignalData(self.x_data, self.y_data, "Time (s)", "Signal", channel_labels=['a', 'b', 'c'])
+
+    def test_channels(self):
+        # Given
+        single = SignalData(self.x_data, self.y_data[0], "Time (s)", "Amplitude")
+        unlabeled = SignalData(self.x_data, self.y_data, "Time (s)", "Signal")
+
+        # When
+        # Then
+        self.assertEqual(self.signal.channels.shape, (3, 100))
+        self.assertEqual(self.signal.channel_labels, ['a', 'b', 'c'])
+        self.assertEqual(single.channels.shape, (1, 100))
+        self.assertEqual(single.channel_labels, ['Amplitude'])
+        self.assertEqual(unlabeled.channel_labels, ['Signal 1', 'Signal 2', 'Signal 3'])
+
+    def test_calculate_stats(self):
+        # Given
+        # When
+        stats = self.signal.calculate_stats()
+
+        # Then
+        self.assertEqual(stats['Mean'].shape, (3,))
+        np.testing.assert_array_almost_equal(stats['Mean'], np.mean(self.y_data, axis=1))
+        np.testing.assert_array_almost_equal(stats['Median'], np.median(self.y_data, axis=1))
+        np.testing.assert_array_almost_equal(stats['RMS'], np.sqrt(np.mean(np.square(self.y_data), axis=1)))
+
+    def test_spectral_analyze(self):
+        # Given
+        # When
+        result = self.signal.spectral_analyze_result
+
+        # Then
+        self.assertEqual(result.fft_magnitude.shape, (3, 51))
+        self.assertEqual(result.fft_freq.shape, (51,))
+        np.testing.assert_array_almost_equal(result.fft_result[1], np.fft.rfft(self.y_data[1]))
+
 
 class TestLoadedSignalData(unittest.TestCase):
 
@@ -141,6 +233,77 @@ class TestFilteredSignalData(unittest.TestCase):
 
         self.assertIsInstance(self.filtered_signal, SignalData)
 
+    def test_shares_parent_axis(self):
+        # Given
+        parent = LoadedSignalData(self.x_data, self.y_data, self.x_label, self.y_label, 'a.csv', (100, 2), [])
+
+        # When
+        filtered = FilteredSignalData(parent.x_data, -parent.y_data, self.x_label, self.y_label, self.filter_type,
+                                      self.cutoff_freq, self.cutoff_freq_range, self.filter_order)
+
+        # Then
+        self.assertIs(filtered.x_data, parent.x_data)
+
+
+class TestSignalDataBuffers(unittest.TestCase):
+
+    def test_uniform_axis(self):
+        # Given
+        x_data = np.linspace(0, 1, 101)
+
+        # When
+        signal = SignalData(x_data, np.zeros(101), "Time (s)", "Amplitude")
+
+        # Then
+        self.assertIsInstance(signal.x_data, UniformAxis)
+        self.assertEqual(signal.sample_spacing, 0.01)
+        np.testing.assert_array_almost_equal(signal.x_data, x_data)
+
+    def test_irregular_axis(self):
+        # Given
+        x_data = np.sqrt(np.arange(100.0))
+
+        # When
+        signal = SignalData(x_data.tolist(), np.zeros(100), "Time (s)", "Amplitude")
+
+        # Then
+        self.assertIsInstance(signal.x_data, np.ndarray)
+        self.assertFalse(signal.x_data.flags.writeable)
+        np.testing.assert_array_equal(signal.x_data, x_data)
+
+    def test_samples_are_read_only_without_copy(self):
+        # Given
+        y_data = np.arange(100.0)
+
+        # When
+        signal = SignalData(np.arange(100.0), y_data, "Time (s)", "Amplitude")
+
+        # Then
+        self.assertFalse(signal.y_data.flags.writeable)
+        self.assertTrue(y_data.flags.writeable)
+        self.assertTrue(np.shares_memory(signal.y_data, y_data))
+        self.assertIs(SignalData(signal.x_data, signal.y_data, "Time (s)", "Amplitude").y_data, signal.y_data)
+
+    def test_single_precision(self):
+        # Given
+        with mock.patch('models.data.SIGNAL_PRECISION', 'SINGLE'):
+            # When
+            signal = SignalData(np.arange(100.0), np.arange(100.0), "Time (s)", "Amplitude")
+
+        # Then
+        self.assertEqual(signal.y_data.dtype, np.float32)
+        self.assertEqual(signal.x_data.dtype, np.float64)
+
+    def test_slots(self):
+        # Given
+        signal = SignalData(np.arange(10.0), np.arange(10.0), "Time (s)", "Amplitude")
+
+        # When
+        # Then
+        self.assertFalse(hasattr(signal, '__dict__'))
+        with self.assertRaises(AttributeError):
+            signal.unknown = 1
+
 
 if __name__ == '__main__':
     unittest.main()
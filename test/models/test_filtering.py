@@ -0,0 +1,274 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from scipy import signal
+
+from models import filtering
+
+
+class TestFilterDesign(unittest.TestCase):
+
+    def setUp(self):
+        filtering.design_cache.clear()
+
+    def test_sample_rate(self):
+        # Given
+        # When
+        # Then
+        self.assertAlmostEqual(filtering.sample_rate(np.arange(100) * 0.001), 1000.0)
+        self.assertEqual(filtering.sample_rate(np.array([0.0])), 1.0)
+
+    def test_design_key(self):
+        # Given
+        # When
+        lowpass = filtering.design_key(4, [100.0], fs=1000.0, btype='LOWPASS')
+        bandpass = filtering.design_key(4, [300.0, 100.0], fs=1000.0, btype='BANDPASS')
+
+        # Then
+        self.assertEqual(lowpass, filtering.FilterDesignKey('butter', 4, (0.2,), 'lowpass'))
+        self.assertEqual(bandpass.wn, (0.2, 0.6))
+        self.assertEqual(filtering.design_key(4, [100.0], fs=1000.0 + 1e-10, btype='LOWPASS'), lowpass)
+
+    def test_design_matches_butter(self):
+        # Given
+        key = filtering.design_key(6, [50.0, 150.0], fs=1000.0, btype='BANDSTOP')
+
+        # When
+        sos = np.array(filtering.design(key))
+
+        # Then
+        np.testing.assert_array_almost_equal(sos, signal.butter(6, [0.1, 0.3], btype='bandstop', output='sos'))
+
+    def test_design_is_cached(self):
+        # Given
+        key = filtering.design_key(8, [10.0], fs=1000.0, btype='HIGHPASS')
+
+        # When
+        first = filtering.design(key)
+        second = filtering.design(filtering.design_key(8, [10.0], fs=1000.0, btype='HIGHPASS'))
+        filtering.design(filtering.design_key(8, [20.0], fs=1000.0, btype='HIGHPASS'))
+
+        # Then
+        self.assertIs(first, second)
+        self.assertFalse(first.flags.writeable)
+        with self.assertRaises(ValueError):
+            first[0, 0] = 1.0
+        self.assertEqual(filtering.design_cache.hits, 1)
+        self.assertEqual(filtering.design_cache.misses, 2)
+        self.assertAlmostEqual(filtering.design_cache.hit_ratio, 1 / 3)
+
+
+class TestBlockFiltering(unittest.TestCase):
+
+    def setUp(self):
+        self.sos = signal.butter(8, [0.05, 0.2], btype='bandpass', output='sos')
+        self.samples = np.random.default_rng(0).normal(size=100_003)
+
+    def test_blocks_match_one_shot_filter(self):
+        # Given
+        expected = signal.sosfilt(self.sos, self.samples)
+
+        # When
+        blocks = list(filtering.sosfilt_blocks(self.sos, self.samples, block_size=4096))
+
+        # Then
+        self.assertEqual(len(blocks), 25)
+        self.assertTrue(all(len(block) <= 4096 for block in blocks))
+        np.testing.assert_allclose(np.concatenate(blocks), expected, rtol=0, atol=1e-12)
+
+    def test_sosfilt(self):
+        # Given
+        samples = self.samples.copy()
+        samples.setflags(write=False)
+
+        # When
+        output = filtering.sosfilt(self.sos, samples, block_size=1000)
+
+        # Then
+        np.testing.assert_allclose(output, signal.sosfilt(self.sos, self.samples), rtol=0, atol=1e-12)
+        self.assertEqual(filtering.sosfilt(self.sos, np.array([])).shape, (0,))
+
+    def test_sosfilt_multichannel(self):
+        # Given
+        channels = np.vstack((self.samples, 3 * self.samples, -self.samples))
+
+        # When
+        output = filtering.sosfilt(self.sos, channels, block_size=1000)
+
+        # Then
+        self.assertEqual(output.shape, channels.shape)
+        np.testing.assert_allclose(output, signal.sosfilt(self.sos, channels, axis=-1), rtol=0, atol=1e-12)
+
+    def test_sosfilt_into_output(self):
+        # Given
+        out = np.empty_like(self.samples)
+
+        # When
+        output = filtering.sosfilt(self.sos, self.samples, block_size=1000, out=out)
+
+        # Then
+        self.assertIs(output, out)
+        np.testing.assert_allclose(out, signal.sosfilt(self.sos, self.samples), rtol=0, atol=1e-12)
+
+
+class TestFilterEngine(unittest.TestCase):
+
+    def setUp(self):
+        filtering.design_cache.clear()
+        self.samples = np.random.default_rng(0).normal(size=(2, 20_000))
+        self.fir = filtering.design_key(100, [50.0], fs=1000.0, btype='LOWPASS', family='FIR')
+
+    def test_fir_design(self):
+        # Given
+        # When
+        taps = filtering.design(self.fir)
+
+        # Then
+        self.assertEqual(self.fir.order, 101)
+        np.testing.assert_allclose(taps, signal.firwin(101, 0.1))
+
+    def test_convolution_method(self):
+        # Given
+        # When
+        # Then
+        self.assertEqual(filtering.convolution_method(11, 100_000), filtering.FilterMethod.DIRECT)
+        self.assertEqual(filtering.convolution_method(1001, 100_000), filtering.FilterMethod.OVERLAP_ADD)
+        self.assertEqual(filtering.convolution_method(4001, 5000), filtering.FilterMethod.FFT)
+
+    def test_fir_methods_match_lfilter(self):
+        # Given
+        expected = signal.lfilter(filtering.design(self.fir), [1.0], self.samples, axis=-1)
+
+        # When
+        for method in [filtering.FilterMethod.DIRECT, filtering.FilterMethod.FFT, filtering.FilterMethod.OVERLAP_ADD]:
+            output, used = filtering.apply(self.fir, self.samples, method)
+
+            # Then
+            self.assertEqual(used, method)
+            np.testing.assert_allclose(output, expected, rtol=0, atol=1e-12)
+
+    def test_fir_zero_phase_matches_filtfilt_away_from_edges(self):
+        # Given
+        taps = filtering.design(self.fir)
+        expected = signal.filtfilt(taps, [1.0], self.samples, axis=-1)
+
+        # When
+        for method in [filtering.FilterMethod.DIRECT, filtering.FilterMethod.AUTO]:
+            output, _ = filtering.apply(self.fir, self.samples, method, zero_phase=True)
+
+            # Then
+            self.assertEqual(output.shape, self.samples.shape)
+            np.testing.assert_allclose(output[:, 1000:-1000], expected[:, 1000:-1000], rtol=0, atol=1e-12)
+
+    def test_iir(self):
+        # Given
+        key = filtering.design_key(4, [50.0], fs=1000.0, btype='LOWPASS')
+        sos = np.array(filtering.design(key))
+
+        # When
+        causal, method = filtering.apply(key, self.samples)
+        zero_phase, _ = filtering.apply(key, self.samples, zero_phase=True)
+
+        # Then
+        self.assertEqual(method, filtering.FilterMethod.SOS)
+        np.testing.assert_allclose(causal, signal.sosfilt(sos, self.samples, axis=-1), rtol=0, atol=1e-12)
+        np.testing.assert_allclose(zero_phase, signal.sosfiltfilt(sos, self.samples, axis=-1), rtol=0, atol=1e-12)
+
+    def test_result_key_distinguishes_zero_phase(self):
+        # Given
+        # When
+        # Then
+        self.assertEqual(filtering.result_key('handle', self.fir), filtering.result_key('handle', self.fir, False))
+        self.assertNotEqual(filtering.result_key('handle', self.fir), filtering.result_key('handle', self.fir, True))
+
+
+class TestMultirate(unittest.TestCase):
+
+    def setUp(self):
+        filtering.design_cache.clear()
+        x_data = np.arange(400_000) / 10_000.0
+        self.samples = (np.sin(2 * np.pi * 3 * x_data) + np.sin(2 * np.pi * 1000 * x_data)
+                        + 0.3 * np.random.default_rng(0).normal(size=len(x_data)))
+        self.key = filtering.design_key(8, [10.0], fs=10_000.0, btype='LOWPASS')
+
+    def test_decimation_factor(self):
+        # Given
+        highpass = filtering.design_key(8, [10.0], fs=10_000.0, btype='HIGHPASS')
+
+        # When
+        # Then
+        self.assertEqual(filtering.decimation_factor(self.key, len(self.samples)), 25)
+        self.assertEqual(filtering.decimation_factor(self.key, 4096), 4)
+        self.assertEqual(filtering.decimation_factor(highpass, len(self.samples)), 1)
+        self.assertEqual(filtering.decimated_key(self.key, 25).wn, (0.05,))
+
+    def test_restored_output_matches_full_rate(self):
+        # Given
+        expected = filtering.sosfilt(filtering.design(self.key), self.samples)
+        interior = slice(len(expected) // 4, 3 * len(expected) // 4)
+
+        # When
+        result = filtering.multirate(self.key, self.samples)
+
+        # Then
+        self.assertEqual(result.factor, 25)
+        self.assertEqual(result.output.shape, self.samples.shape)
+        deviation = np.sqrt(np.mean((result.output[interior] - expected[interior]) ** 2))
+        deviation /= np.sqrt(np.mean(expected[interior] ** 2))
+        self.assertLess(deviation, 0.01)
+        self.assertAlmostEqual(result.error, deviation, delta=0.1 * deviation)
+
+    def test_decimated_output(self):
+        # Given
+        expected, _ = filtering.apply(self.key, self.samples, zero_phase=True)
+
+        # When
+        result = filtering.multirate(self.key, self.samples, zero_phase=True, restore=False)
+
+        # Then
+        self.assertEqual(result.output.shape, (16_000,))
+        np.testing.assert_allclose(result.output[4000:12000], expected[100_000:300_000:25], rtol=0, atol=1e-2)
+        self.assertLess(result.error, 1e-3)
+
+    def test_accuracy_check_is_bounded(self):
+        # Given
+        narrow = filtering.design_key(4, [0.1], fs=10_000.0, btype='LOWPASS')
+        longest = filtering.MULTIRATE_CHECK + 2 * filtering.MULTIRATE_MAX_GUARD
+
+        # When
+        with patch('models.filtering.apply', wraps=filtering.apply) as apply:
+            checked = filtering.multirate(narrow, self.samples)
+            unchecked = filtering.multirate(narrow, self.samples, check=False)
+
+        # Then
+        self.assertEqual(apply.call_count, 3)
+        self.assertLessEqual(apply.call_args_list[1].args[1].shape[-1], longest)
+        self.assertIsNotNone(checked.error)
+        self.assertIsNone(unchecked.error)
+        np.testing.assert_array_equal(checked.output, unchecked.output)
+        self.assertFalse(filtering.resampling_taps(checked.factor).flags.writeable)
+
+    def test_full_rate_fallback(self):
+        # Given
+        key = filtering.design_key(4, [2000.0], fs=10_000.0, btype='LOWPASS')
+
+        # When
+        result = filtering.multirate(key, self.samples)
+
+        # Then
+        self.assertEqual((result.factor, result.error), (1, 0.0))
+        np.testing.assert_allclose(result.output, filtering.sosfilt(filtering.design(key), self.samples))
+
+    def test_result_key_distinguishes_rate(self):
+        # Given
+        # When
+        keys = {filtering.result_key('handle', self.key, rate=rate) for rate in filtering.FilterRate}
+
+        # Then
+        self.assertEqual(len(keys), 3)
+        self.assertIn(filtering.result_key('handle', self.key), keys)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import scipy.fft
+
+from models import fourier
+from models.fourier import FftBackend, FftLength, FftPrecision
+
+
+class TestFourier(unittest.TestCase):
+
+    def setUp(self):
+        # 1009 is prime, the slowest kind of transform length
+        self.samples = np.random.default_rng(0).normal(size=(2, 1009))
+
+    def test_transform_length(self):
+        # Given
+        n = 1009
+
+        # When
+        # Then
+        self.assertEqual(fourier.transform_length(n, FftLength.EXACT), n)
+        self.assertEqual(fourier.transform_length(n, FftLength.PAD), scipy.fft.next_fast_len(n, real=True))
+        self.assertEqual(fourier.transform_length(n, FftLength.CROP), scipy.fft.prev_fast_len(n, real=True))
+        self.assertGreater(fourier.transform_length(n, FftLength.PAD), n)
+        self.assertLess(fourier.transform_length(n, FftLength.CROP), n)
+
+    def test_backends_match_numpy(self):
+        # Given
+        expected = np.fft.rfft(self.samples, axis=-1)
+
+        # When
+        numpy_result = fourier.rfft(self.samples, FftLength.EXACT, FftBackend.NUMPY)
+        scipy_result = fourier.rfft(self.samples, FftLength.EXACT, FftBackend.SCIPY, workers=2)
+
+        # Then
+        np.testing.assert_allclose(numpy_result, expected)
+        np.testing.assert_allclose(scipy_result, expected, atol=1e-9)
+
+    def test_pad_and_crop(self):
+        # Given
+        padded_length = fourier.transform_length(1009, FftLength.PAD)
+        cropped_length = fourier.transform_length(1009, FftLength.CROP)
+
+        # When
+        padded = fourier.rfft(self.samples, FftLength.PAD)
+        cropped = fourier.rfft(self.samples, FftLength.CROP)
+
+        # Then
+        np.testing.assert_allclose(padded, np.fft.rfft(self.samples, n=padded_length, axis=-1), atol=1e-9)
+        np.testing.assert_allclose(cropped, np.fft.rfft(self.samples[:, :cropped_length], axis=-1), atol=1e-9)
+
+    def test_single_precision(self):
+        # Given
+        expected = np.fft.rfft(self.samples, axis=-1)
+
+        # When
+        result = fourier.rfft(self.samples, FftLength.EXACT, FftBackend.SCIPY, FftPrecision.SINGLE)
+
+        # Then
+        self.assertEqual(result.dtype, np.complex64)
+        np.testing.assert_allclose(result, expected, rtol=1e-3, atol=1e-3)
+
+    def test_rfftfreq_is_shared(self):
+        # Given
+        fourier.freq_cache.clear()
+
+        # When
+        first = fourier.rfftfreq(1024, d=0.001)
+        second = fourier.rfftfreq(1024, d=0.001)
+
+        # Then
+        self.assertIs(first, second)
+        self.assertFalse(first.flags.writeable)
+        np.testing.assert_array_equal(first, np.fft.rfftfreq(1024, d=0.001))
+
+
+if __name__ == '__main__':
+    unittest.main()
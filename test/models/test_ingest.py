@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from models import ingest
+
+CSV = b'Time [s],Amplitude,Label\n0.0,1.5,a\n0.001,-2.25,b\n0.002,3,c\n'
+
+
+class TestIngest(unittest.TestCase):
+
+    def test_read_columns(self):
+        # Given
+        # When
+        columns = ingest.read_columns(CSV)
+
+        # Then
+        self.assertEqual(columns, ['Time [s]', 'Amplitude', 'Label'])
+        self.assertEqual(ingest.read_columns(b''), [])
+        self.assertEqual(ingest.read_columns(b'\xef\xbb\xbfTime,Amplitude\n'), ['Time', 'Amplitude'])
+
+    def test_numeric_columns(self):
+        # Given
+        # When
+        columns = ingest.numeric_columns(CSV)
+
+        # Then
+        self.assertEqual(columns, ['Time [s]', 'Amplitude'])
+
+    def test_read_signal_csv_from_bytes(self):
+        # Given
+        # When
+        df = ingest.read_signal_csv(CSV, usecols=['Time [s]', 'Amplitude'])
+
+        # Then
+        self.assertEqual(list(df.columns), ['Time [s]', 'Amplitude'])
+        self.assertTrue(all(dtype == np.float64 for dtype in df.dtypes))
+        np.testing.assert_array_equal(df.iloc[:, 1].to_numpy(), [1.5, -2.25, 3.0])
+
+    def test_read_signal_csv_from_path(self):
+        # Given
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'signal.csv')
+            with open(path, 'wb') as file:
+                file.write(CSV)
+
+            # When
+            df = ingest.read_signal_csv(path, usecols=['Time [s]', 'Amplitude'])
+
+        # Then
+        np.testing.assert_array_equal(df.iloc[:, 0].to_numpy(), [0.0, 0.001, 0.002])
+
+    def test_source_keys(self):
+        # Given
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = os.path.join(directory, 'first.csv'), os.path.join(directory, 'second.csv')
+            for path in (first, second):
+                with open(path, 'wb') as file:
+                    file.write(CSV)
+
+            # When
+            content_keys = ingest.content_key(first), ingest.content_key(second)
+            file_keys = ingest.file_key(first), ingest.file_key(second)
+            os.utime(first, ns=(0, 0))
+            touched_key = ingest.file_key(first)
+
+        # Then
+        self.assertEqual(content_keys[0], content_keys[1])
+        self.assertNotEqual(file_keys[0], file_keys[1])
+        self.assertNotEqual(touched_key, file_keys[0])
+
+    def test_read_signal_csv_with_default_engine(self):
+        # Given
+        with mock.patch('models.ingest.CSV_ENGINE', 'c'):
+            # When
+            df = ingest.read_signal_csv(CSV, usecols=['Time [s]', 'Amplitude'])
+
+        # Then
+        np.testing.assert_array_equal(df.iloc[:, 1].to_numpy(), [1.5, -2.25, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
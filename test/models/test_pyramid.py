@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from models.pyramid import MinMaxPyramid
+
+
+class TestMinMaxPyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.x_data = np.arange(1_000_003) * 0.001
+        self.y_data = np.sin(2 * np.pi * self.x_data)
+        self.y_data[123_456] = 10.0
+        self.y_data[654_321] = -10.0
+        self.pyramid = MinMaxPyramid.build(self.x_data, self.y_data)
+
+    def test_build(self):
+        # Given
+        # When
+        # Then
+        self.assertEqual(self.pyramid.levels, 6)
+        self.assertEqual(len(self.pyramid.mins), len(self.pyramid.maxs))
+        self.assertEqual(self.pyramid.mins[:125_001].min(), -10.0)
+        self.assertEqual(self.pyramid.maxs[:125_001].max(), 10.0)
+
+    def test_query_full_range_keeps_extremes(self):
+        # Given
+        # When
+        x_data, y_data = self.pyramid.query(max_points=1000)
+
+        # Then
+        self.assertLessEqual(len(y_data), 1000)
+        self.assertEqual(len(x_data), len(y_data))
+        self.assertEqual(y_data.max(), 10.0)
+        self.assertEqual(y_data.min(), -10.0)
+        self.assertTrue(np.all(np.diff(x_data) >= 0))
+
+    def test_query_narrow_range_returns_raw_samples(self):
+        # Given
+        # When
+        x_data, y_data = self.pyramid.query(100.0, 100.5, max_points=1000)
+
+        # Then
+        np.testing.assert_array_equal(x_data, self.x_data[99_999:100_502])
+        np.testing.assert_array_equal(y_data, self.y_data[99_999:100_502])
+
+    def test_query_zoomed_range(self):
+        # Given
+        # When
+        x_data, y_data = self.pyramid.query(120.0, 130.0, max_points=1000)
+
+        # Then
+        self.assertLessEqual(len(y_data), 1000)
+        self.assertGreaterEqual(x_data[0], 119.0)
+        self.assertLessEqual(x_data[-1], 131.0)
+        self.assertEqual(y_data.max(), 10.0)
+        self.assertGreaterEqual(y_data.min(), -1.0)
+
+    def test_multichannel(self):
+        # Given
+        channels = np.vstack((self.y_data, -2 * self.y_data))
+        pyramid = MinMaxPyramid.build(self.x_data, channels)
+
+        # When
+        x_data, y_data = pyramid.query(120.0, 130.0, max_points=1000)
+
+        # Then
+        single_x, single_y = self.pyramid.query(120.0, 130.0, max_points=1000)
+        self.assertEqual(y_data.shape, (2, len(x_data)))
+        np.testing.assert_array_equal(x_data, single_x)
+        np.testing.assert_array_equal(y_data[0], single_y)
+        self.assertEqual(y_data[1].min(), -20.0)
+
+    def test_short_signal(self):
+        # Given
+        pyramid = MinMaxPyramid.build(np.arange(5), np.arange(5))
+
+        # When
+        x_data, y_data = pyramid.query(max_points=100)
+
+        # Then
+        self.assertEqual(pyramid.levels, 0)
+        np.testing.assert_array_equal(y_data, np.arange(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
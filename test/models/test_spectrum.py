@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from models import spectrum
+
+
+class TestWelch(unittest.TestCase):
+
+    def setUp(self):
+        self.fs = 1000.0
+        t = np.arange(20000) / self.fs
+        self.samples = np.sin(2 * np.pi * 50 * t) + 0.1 * np.random.default_rng(0).normal(size=len(t))
+
+    def test_matches_scipy(self):
+        # Given
+        expected_freq, expected_psd = signal.welch(self.samples, self.fs, window='hann', nperseg=256, noverlap=128)
+
+        # When
+        freq, psd = spectrum.welch(self.samples, self.fs, nperseg=256, overlap=0.5)
+
+        # Then
+        np.testing.assert_array_almost_equal(freq, expected_freq)
+        np.testing.assert_allclose(psd, expected_psd, rtol=1e-10)
+        self.assertAlmostEqual(freq[np.argmax(psd)], 50.0, delta=self.fs / 256)
+
+    def test_batches_do_not_change_result(self):
+        # Given
+        expected = spectrum.welch(self.samples, self.fs, nperseg=128, overlap=0.25)[1]
+        batch_samples = spectrum.BATCH_SAMPLES
+
+        # When
+        spectrum.BATCH_SAMPLES = 300
+        try:
+            psd = spectrum.welch(self.samples, self.fs, nperseg=128, overlap=0.25)[1]
+        finally:
+            spectrum.BATCH_SAMPLES = batch_samples
+
+        # Then
+        np.testing.assert_allclose(psd, expected)
+
+    def test_multichannel(self):
+        # Given
+        samples = np.vstack([self.samples, 2 * self.samples])
+
+        # When
+        freq, psd = spectrum.welch(samples, self.fs, nperseg=256, overlap=0.5)
+
+        # Then
+        self.assertEqual(psd.shape, (2, 129))
+        np.testing.assert_allclose(psd[1], 4 * psd[0])
+
+
+class TestSpectrogram(unittest.TestCase):
+
+    def setUp(self):
+        self.fs = 1000.0
+        t = np.arange(10000) / self.fs
+        self.samples = signal.chirp(t, f0=10, t1=t[-1], f1=200)
+
+    def test_matches_scipy(self):
+        # Given
+        expected_freq, expected_times, expected_psd = signal.spectrogram(self.samples, self.fs, window='hann',
+                                                                         nperseg=256, noverlap=192)
+
+        # When
+        freq, times, psd = spectrum.spectrogram(self.samples, self.fs, nperseg=256, overlap=0.75)
+
+        # Then
+        np.testing.assert_array_almost_equal(freq, expected_freq)
+        np.testing.assert_array_almost_equal(times, expected_times)
+        np.testing.assert_allclose(psd, expected_psd, rtol=1e-10, atol=1e-20)
+
+    def test_segments_are_bounded(self):
+        # Given
+        # When
+        freq, times, psd = spectrum.spectrogram(self.samples, self.fs, nperseg=64, overlap=0.9, max_segments=50)
+
+        # Then
+        self.assertLessEqual(len(times), 50)
+        self.assertEqual(psd.shape, (33, len(times)))
+
+
+if __name__ == '__main__':
+    unittest.main()
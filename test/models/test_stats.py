@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+from models.stats import StatsAccumulator, median, calculate_stats
+
+
+class TestStatsAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        generator = np.random.default_rng(0)
+        self.samples = 1000.0 + generator.normal(size=200_001)
+
+    def test_update(self):
+        # Given
+        # When
+        accumulator = StatsAccumulator().update(self.samples, chunk_size=4096)
+
+        # Then
+        self.assertEqual(accumulator.count, len(self.samples))
+        self.assertAlmostEqual(accumulator.mean, np.mean(self.samples), places=9)
+        self.assertAlmostEqual(accumulator.std, np.std(self.samples), places=9)
+        self.assertAlmostEqual(accumulator.rms, np.sqrt(np.mean(np.square(self.samples))), places=9)
+        self.assertEqual(accumulator.min, np.min(self.samples))
+        self.assertEqual(accumulator.max, np.max(self.samples))
+
+    def test_merge(self):
+        # Given
+        first = StatsAccumulator().update(self.samples[:123_456])
+        second = StatsAccumulator().update(self.samples[123_456:])
+
+        # When
+        merged = first.merge(second)
+
+        # Then
+        whole = StatsAccumulator().update(self.samples)
+        self.assertEqual(merged.count, whole.count)
+        self.assertAlmostEqual(merged.mean, whole.mean, places=9)
+        self.assertAlmostEqual(merged.variance, whole.variance, places=9)
+        self.assertEqual(merged.min, whole.min)
+        self.assertEqual(merged.max, whole.max)
+        self.assertEqual(first.count, 123_456)
+
+    def test_empty(self):
+        # Given
+        accumulator = StatsAccumulator()
+
+        # When
+        merged = accumulator.merge(StatsAccumulator())
+
+        # Then
+        self.assertEqual(merged.count, 0)
+        self.assertTrue(np.isnan(merged.mean))
+        self.assertTrue(np.isnan(merged.result()['Median']))
+
+    def test_update_does_not_copy_input(self):
+        # Given
+        samples = np.arange(10.0)
+        samples.setflags(write=False)
+
+        # When
+        accumulator = StatsAccumulator().update(samples)
+
+        # Then
+        self.assertEqual(accumulator.max, 9.0)
+
+
+class TestMedian(unittest.TestCase):
+
+    def test_odd_and_even_lengths(self):
+        # Given
+        generator = np.random.default_rng(1)
+        odd = generator.normal(size=1001)
+        even = generator.normal(size=1000)
+
+        # When
+        # Then
+        self.assertEqual(median(odd), np.median(odd))
+        self.assertEqual(median(even), np.median(even))
+        self.assertTrue(np.isnan(median(np.array([]))))
+
+    def test_calculate_stats(self):
+        # Given
+        samples = np.sin(np.linspace(0, 10, 1234))
+
+        # When
+        result = calculate_stats(samples)
+
+        # Then
+        self.assertAlmostEqual(result['Median'], np.median(samples), places=12)
+        self.assertAlmostEqual(result['Peak to Peak'], np.ptp(samples), places=12)
+
+
+if __name__ == '__main__':
+    unittest.main()
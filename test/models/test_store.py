@@ -0,0 +1,189 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from models.data import LoadedSignalData
+from models.store import SignalStore
+from utils.axis import UniformAxis
+
+
+class TestSignalStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SignalStore(self.directory.name)
+        self.x_data = np.linspace(0, 1, 100)
+        self.y_data = np.sin(2 * np.pi * 10 * self.x_data)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_returns_handle_without_arrays(self):
+        # Given
+        # When
+        data = self.store.put('test_signal.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2),
+                              ['Time (s)', 'Amplitude'])
+
+        # Then
+        self.assertIn('handle', data)
+        self.assertNotIn('x_data', data)
+        self.assertNotIn('y_data', data)
+        self.assertEqual(data['filename'], 'test_signal.csv')
+        self.assertEqual(data['shape'], [100, 2])
+        self.assertTrue(self.store.contains(data['handle']))
+
+    def test_put_is_content_addressed(self):
+        # Given
+        first = self.store.put('a.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # When
+        second = self.store.put('b.csv', self.x_data.copy(), self.y_data.copy(), 'Time (s)', 'Amplitude', (100, 2), [])
+        third = self.store.put('c.csv', self.x_data, -self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # Then
+        self.assertEqual(first['handle'], second['handle'])
+        self.assertNotEqual(first['handle'], third['handle'])
+        self.assertEqual(len([name for name in os.listdir(self.directory.name) if not name.startswith('.')]), 2)
+
+    def test_load(self):
+        # Given
+        data = self.store.put('test_signal.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2),
+                              ['Time (s)', 'Amplitude'])
+
+        # When
+        loaded_signal = self.store.load(data)
+
+        # Then
+        self.assertIsInstance(loaded_signal, LoadedSignalData)
+        self.assertIsInstance(loaded_signal.y_data, np.memmap)
+        np.testing.assert_array_equal(loaded_signal.x_data, self.x_data)
+        np.testing.assert_array_equal(loaded_signal.y_data, self.y_data)
+        self.assertEqual(loaded_signal.filename, 'test_signal.csv')
+        self.assertEqual(loaded_signal.shape, (100, 2))
+
+    def test_uniform_axis_is_kept_as_metadata(self):
+        # Given
+        irregular_x = np.sqrt(np.arange(100.0))
+
+        # When
+        uniform = self.store.put('a.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+        irregular = self.store.put('b.csv', irregular_x, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # Then
+        self.assertEqual(uniform['x_axis'], [0.0, 1 / 99, 100])
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, uniform['handle'], 'x.npy')))
+        self.assertIsInstance(self.store.load(uniform).x_data, UniformAxis)
+        self.assertIsNone(irregular['x_axis'])
+        np.testing.assert_array_equal(self.store.load(irregular).x_data, irregular_x)
+        np.testing.assert_array_equal(self.store.load_pyramid(irregular).query(0.5, 2.5)[0], irregular_x[:8])
+
+    def test_multichannel(self):
+        # Given
+        channels = np.vstack((self.y_data, 2 * self.y_data))
+        data = self.store.put('test_signal.csv', self.x_data, channels, 'Time (s)', 'Signal', (100, 3),
+                              ['Time (s)', 'a', 'b'], channel_labels=['a', 'b'])
+
+        # When
+        loaded_signal = self.store.load(data)
+
+        # Then
+        np.testing.assert_array_equal(loaded_signal.y_data, channels)
+        self.assertEqual(loaded_signal.channel_labels, ['a', 'b'])
+        self.assertEqual(self.store.load_pyramid(data).query(max_points=1000)[1].shape, (2, 100))
+
+    def test_load_pyramid(self):
+        # Given
+        data = self.store.put('test_signal.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # When
+        x_data, y_data = self.store.load_pyramid(data).query(max_points=1000)
+
+        # Then
+        np.testing.assert_array_equal(x_data, self.x_data)
+        np.testing.assert_array_equal(y_data, self.y_data)
+
+    def test_alias_and_lookup(self):
+        # Given
+        data = self.store.put('a.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 3),
+                              ['Time (s)', 'Amplitude', 'Label'])
+
+        # When
+        self.store.alias('content-1234', data)
+        found = self.store.lookup('content-1234', 'b.csv')
+
+        # Then
+        self.assertEqual(found['handle'], data['handle'])
+        self.assertEqual(found['filename'], 'b.csv')
+        self.assertEqual(found['shape'], [100, 3])
+        self.assertEqual(found['columns'], ['Time (s)', 'Amplitude', 'Label'])
+        self.assertIsNone(self.store.lookup('content-5678', 'c.csv'))
+
+    def test_least_recently_used_signals_are_evicted(self):
+        # Given
+        store = SignalStore(self.directory.name, max_bytes=4_000)
+        first = store.put('a.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+        second = store.put('b.csv', self.x_data, 2 * self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+        store.alias('content-second', second)
+        os.utime(os.path.join(self.directory.name, second['handle'], 'meta.json'), (0, 0))
+        store.load(first)
+
+        # When
+        third = store.put('c.csv', self.x_data, 3 * self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # Then
+        self.assertTrue(store.contains(first['handle']))
+        self.assertFalse(store.contains(second['handle']))
+        self.assertTrue(store.contains(third['handle']))
+        self.assertLessEqual(store.size(), 4_000)
+        self.assertIsNone(store.lookup('content-second', 'b.csv'))
+
+    def test_pinned_signals_are_not_evicted(self):
+        # Given
+        store = SignalStore(self.directory.name, max_bytes=4_000)
+        pinned = store.put('a.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+        os.utime(os.path.join(self.directory.name, pinned['handle'], 'meta.json'), (0, 0))
+
+        # When
+        with store.pin(pinned['handle']):
+            others = [store.put(f'{scale}.csv', self.x_data, scale * self.y_data, 'Time (s)', 'Amplitude', (100, 2),
+                                []) for scale in range(2, 5)]
+            kept = store.contains(pinned['handle'])
+        evicted = store.put('e.csv', self.x_data, 5 * self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # Then
+        self.assertTrue(kept)
+        self.assertTrue(store.contains(others[-1]['handle']))
+        self.assertFalse(store.contains(pinned['handle']))
+        self.assertTrue(store.contains(evicted['handle']))
+        self.assertEqual(os.listdir(os.path.join(self.directory.name, '.pins')), [])
+
+    def test_pins_of_dead_processes_are_ignored(self):
+        # Given
+        store = SignalStore(self.directory.name, max_bytes=4_000)
+        stale = store.put('a.csv', self.x_data, self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+        os.utime(os.path.join(self.directory.name, stale['handle'], 'meta.json'), (0, 0))
+        # Beyond the largest process id of Linux
+        open(os.path.join(self.directory.name, '.pins', f'{stale["handle"]}.{1 << 23}.0'), 'w').close()
+
+        # When
+        for scale in range(2, 5):
+            store.put(f'{scale}.csv', self.x_data, scale * self.y_data, 'Time (s)', 'Amplitude', (100, 2), [])
+
+        # Then
+        self.assertFalse(store.contains(stale['handle']))
+
+    def test_load_unknown_handle(self):
+        # Given
+        data = {'handle': 'missing', 'filename': 'test_signal.csv', 'x_label': 'x', 'y_label': 'y', 'shape': [0, 0],
+                'columns': []}
+
+        # When
+        # Then
+        with self.assertRaises(LookupError):
+            self.store.load(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from models.stats import calculate_stats
+from models.stream import RingBuffer, SignalStream, StreamSource, StreamRegistry
+
+
+def lines(x_data: np.array, y_data: np.array) -> bytes:
+    return ''.join(','.join(repr(float(value)) for value in row) + '\n'
+                   for row in np.column_stack([x_data, np.atleast_2d(y_data).T])).encode()
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_write_wraps_around(self):
+        # Given
+        buffer = RingBuffer(capacity=5, channels=2)
+
+        # When
+        buffer.write(np.arange(3), [np.arange(3), -np.arange(3)])
+        buffer.write(np.arange(3, 7), [np.arange(3, 7), -np.arange(3, 7)])
+
+        # Then
+        first, x_data, y_data = buffer.since(0)
+        self.assertEqual((buffer.total, len(buffer), first), (7, 5, 2))
+        np.testing.assert_array_equal(x_data, np.arange(2, 7))
+        np.testing.assert_array_equal(y_data, [np.arange(2, 7), -np.arange(2, 7)])
+
+    def test_since_returns_new_samples_only(self):
+        # Given
+        buffer = RingBuffer(capacity=8, channels=1)
+        buffer.write(np.arange(6), np.arange(6))
+
+        # When
+        first, x_data, _ = buffer.since(4)
+
+        # Then
+        self.assertEqual(first, 4)
+        np.testing.assert_array_equal(x_data, [4, 5])
+        np.testing.assert_array_equal(buffer.latest(3)[0], [3, 4, 5])
+
+    def test_block_larger_than_capacity(self):
+        # Given
+        buffer = RingBuffer(capacity=4, channels=1)
+        buffer.write(np.arange(3), np.arange(3))
+
+        # When
+        buffer.write(np.arange(3, 13), np.arange(3, 13))
+
+        # Then
+        self.assertEqual(buffer.total, 13)
+        np.testing.assert_array_equal(buffer.since(0)[1], [9, 10, 11, 12])
+
+
+class TestSignalStream(unittest.TestCase):
+
+    def setUp(self):
+        self.x_data = np.arange(3000) / 1000.0
+        self.y_data = np.vstack([np.sin(2 * np.pi * 50 * self.x_data), np.cos(2 * np.pi * 125 * self.x_data)])
+
+    def test_feed_parses_header_and_split_lines(self):
+        # Given
+        stream = SignalStream(StreamSource.FILE, 'unused', capacity=10_000, window=1000)
+        content = b'Time (s),a,b\n' + lines(self.x_data, self.y_data)
+
+        # When
+        for start in range(0, len(content), 1000):
+            stream.feed(content[start:start + 1000])
+
+        # Then
+        self.assertEqual(stream.columns, ['Time (s)', 'a', 'b'])
+        self.assertEqual(stream.total, 3000)
+        first, x_data, y_data = stream.since(0)
+        np.testing.assert_array_equal(x_data, self.x_data)
+        np.testing.assert_array_equal(y_data, self.y_data)
+
+    def test_stats_are_incremental(self):
+        # Given
+        stream = SignalStream(StreamSource.FILE, 'unused', capacity=1000, window=1000)
+
+        # When
+        for start in range(0, 3000, 700):
+            stream.feed(lines(self.x_data[start:start + 700], self.y_data[:, start:start + 700]))
+
+        # Then
+        stats = stream.stats()
+        self.assertNotIn('Median', stats)
+        for channel in range(2):
+            expected = calculate_stats(self.y_data[channel])
+            for name in stats:
+                self.assertAlmostEqual(stats[name][channel], expected[name])
+
+    def test_spectrum_of_latest_window(self):
+        # Given
+        stream = SignalStream(StreamSource.FILE, 'unused', capacity=4000, window=1000)
+        stream.feed(lines(self.x_data, self.y_data))
+
+        # When
+        freq, magnitude = stream.spectrum()
+
+        # Then
+        self.assertEqual(magnitude.shape, (2, len(freq)))
+        np.testing.assert_array_almost_equal(freq[np.argmax(magnitude, axis=1)], [50.0, 125.0])
+        np.testing.assert_allclose(magnitude.max(axis=1), 1.0, rtol=0.01)
+        self.assertIs(stream.spectrum()[1], magnitude)
+
+    def test_envelopes_join(self):
+        # Given
+        stream = SignalStream(StreamSource.FILE, 'unused', capacity=4000, window=1000)
+        stream.feed(lines(self.x_data[:1234], self.y_data[:, :1234]))
+
+        # When
+        position, x_first, y_first = stream.envelope(0, 10)
+        stream.feed(lines(self.x_data[1234:], self.y_data[:, 1234:]))
+        end, x_second, y_second = stream.envelope(position, 10)
+
+        # Then
+        self.assertEqual((position, end), (1230, 3000))
+        x_data = np.hstack([x_first, x_second])
+        y_data = np.hstack([y_first, y_second])
+        self.assertEqual(y_data.shape, (2, 600))
+        blocks = self.y_data.reshape(2, 300, 10)
+        np.testing.assert_array_equal(y_data.reshape(2, 300, 2).min(axis=2), blocks.min(axis=2))
+        np.testing.assert_array_equal(y_data.reshape(2, 300, 2).max(axis=2), blocks.max(axis=2))
+        self.assertTrue(np.all(np.diff(x_data, axis=1) >= 0))
+
+
+class TestStreamSources(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.registry = StreamRegistry(self.directory.name, max_open=2)
+        self.opened = []
+
+    def tearDown(self):
+        for stream, subscriber in self.opened:
+            self.registry.close(stream.stream_id, subscriber)
+        self.directory.cleanup()
+
+    def open(self, source: StreamSource, address: str, subscriber: str = 'session') -> SignalStream:
+        stream = self.registry.open(source, address, subscriber)
+        self.opened.append((stream, subscriber))
+        return stream
+
+    def test_tailed_file(self):
+        # Given
+        path = os.path.join(self.directory.name, 'live.csv')
+        with open(path, 'wb') as file:
+            file.write(b't,v\n0,1\n1,2\n')
+        stream = self.open(StreamSource.FILE, path)
+
+        # When
+        wait_for(lambda: stream.total == 2)
+        with open(path, 'ab') as file:
+            file.write(b'2,3\n3,')
+        wait_for(lambda: stream.total == 3)
+
+        # Then
+        self.assertEqual(stream.columns, ['t', 'v'])
+        np.testing.assert_array_equal(stream.since(0)[2], [[1, 2, 3]])
+        self.assertIs(self.open(StreamSource.FILE, 'live.csv'), stream)
+
+    def test_udp_socket(self):
+        # Given
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        stream = self.open(StreamSource.UDP, f'127.0.0.1:{port}')
+        time.sleep(0.2)
+
+        # When
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            sender.sendto(b'0,1,2\n1,3,4', ('127.0.0.1', port))
+            wait_for(lambda: stream.total == 2)
+
+        # Then
+        self.assertIsNone(stream.error)
+        np.testing.assert_array_equal(stream.since(0)[2], [[1, 3], [2, 4]])
+
+    def test_addresses_are_confined(self):
+        # Given
+        outside = [(StreamSource.FILE, '/etc/passwd'), (StreamSource.FILE, '../live.csv'),
+                   (StreamSource.UDP, '0.0.0.0:9999'), (StreamSource.UDP, '10.0.0.1:9999'),
+                   (StreamSource.UDP, '127.0.0.1:http')]
+
+        # When
+        for source, address in outside:
+            # Then
+            with self.assertRaises(ValueError, msg=address):
+                self.registry.open(source, address, 'session')
+
+    def test_stream_stops_with_its_last_subscriber(self):
+        # Given
+        first = self.registry.open(StreamSource.FILE, 'first.csv', 'a')
+        shared = self.registry.open(StreamSource.FILE, 'first.csv', 'b')
+
+        # When
+        self.registry.close(first.stream_id, 'a')
+        running = first.running
+        self.registry.close(shared.stream_id, 'b')
+
+        # Then
+        self.assertIs(shared, first)
+        self.assertTrue(running)
+        self.assertIsNone(self.registry.get(first.stream_id))
+        wait_for(lambda: not first.running)
+        self.assertFalse(first.running)
+
+    def test_open_streams_are_capped(self):
+        # Given
+        self.open(StreamSource.FILE, 'first.csv')
+        self.open(StreamSource.FILE, 'second.csv')
+
+        # When
+        shared = self.open(StreamSource.FILE, 'second.csv', 'other')
+
+        # Then
+        self.assertIsNotNone(shared)
+        with self.assertRaises(ValueError):
+            self.registry.open(StreamSource.FILE, 'third.csv', 'session')
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from models import filtering, sweep
+from models.store import SignalStore
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SignalStore(self.directory.name)
+        self.patcher = patch('models.sweep.signal_store', self.store)
+        self.patcher.start()
+        x_data = np.arange(4000) / 1000.0
+        y_data = np.sin(2 * np.pi * 5 * x_data) + 0.5 * np.sin(2 * np.pi * 200 * x_data)
+        self.data = self.store.put('sweep.csv', x_data, y_data, 'Time (s)', 'Amplitude', (4000, 2), [])
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.directory.cleanup()
+
+    def test_sweep_matches_direct_filtering(self):
+        # Given
+        y_data = self.store.load(self.data).y_data
+
+        # When
+        results = sweep.sweep(self.data, 'LOWPASS', [[20.0], [50.0]], [2, 4], nperseg=256)
+
+        # Then
+        self.assertEqual([(result.cutoffs, result.order) for result in results],
+                         [((20.0,), 2), ((20.0,), 4), ((50.0,), 2), ((50.0,), 4)])
+        for result in results:
+            expected = filtering.sosfilt(filtering.design(result.key), y_data)
+            self.assertAlmostEqual(result.stats['RMS'], np.sqrt(np.mean(expected ** 2)))
+            self.assertAlmostEqual(result.stats['Peak to Peak'], np.ptp(expected))
+            self.assertEqual(result.psd.shape, result.freq.shape)
+
+    def test_sweep_stores_nothing(self):
+        # Given
+        size = self.store.size()
+
+        # When
+        results = sweep.sweep(self.data, 'LOWPASS', [[10.0], [20.0], [50.0]], [2, 4], nperseg=256)
+
+        # Then
+        self.assertEqual(len(results), 6)
+        self.assertEqual(self.store.size(), size)
+        for result in results:
+            self.assertIsNone(self.store.lookup(filtering.result_key(self.data['handle'], result.key), 'sweep.csv'))
+
+    def test_stored_outputs_are_reused(self):
+        # Given
+        key = filtering.design_key(4, [2.0, 10.0], 1000.0, 'BANDPASS')
+        loaded_signal_data = self.store.load(self.data)
+        expected = filtering.sosfilt(filtering.design(key), loaded_signal_data.y_data)
+        filtered_data = self.store.put('sweep.csv', loaded_signal_data.x_data, expected, 'Time (s)', 'Amplitude',
+                                       (4000, 2), [])
+        self.store.alias(filtering.result_key(self.data['handle'], key), filtered_data)
+
+        # When
+        with patch('models.filtering.sosfilt') as sosfilt:
+            results = sweep.sweep(self.data, 'BANDPASS', [[2.0, 10.0]], [4], nperseg=256)
+
+        # Then
+        sosfilt.assert_not_called()
+        self.assertAlmostEqual(results[0].stats['RMS'], np.sqrt(np.mean(expected ** 2)))
@@ -0,0 +1,104 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from models.upload import UploadStore
+
+
+class TestUploadStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = UploadStore(self.directory.name, ttl=60)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_chunks_in_order(self):
+        # Given
+        upload_id = self.store.create()
+
+        # When
+        first = self.store.write(upload_id, 0, io.BytesIO(b'Time,Amplitude\n'))
+        second = self.store.write(upload_id, first, io.BytesIO(b'0.0,1.0\n'))
+
+        # Then
+        self.assertEqual(second, 23)
+        self.assertEqual(self.store.received(upload_id), 23)
+        with open(self.store.path(upload_id), 'rb') as file:
+            self.assertEqual(file.read(), b'Time,Amplitude\n0.0,1.0\n')
+
+    def test_write_rejects_unexpected_offset(self):
+        # Given
+        upload_id = self.store.create()
+        self.store.write(upload_id, 0, io.BytesIO(b'0123456789'))
+
+        # When
+        # Then
+        with self.assertRaises(ValueError):
+            self.store.write(upload_id, 5, io.BytesIO(b'56789'))
+        self.assertEqual(self.store.received(upload_id), 10)
+
+    def test_concurrent_chunks_at_same_offset(self):
+        # Given
+        upload_id = self.store.create()
+        accepted = []
+
+        def send():
+            try:
+                accepted.append(self.store.write(upload_id, 0, io.BytesIO(b'0123456789')))
+            except ValueError:
+                pass
+
+        # When
+        threads = [threading.Thread(target=send) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        self.assertEqual(accepted, [10])
+        self.assertEqual(self.store.received(upload_id), 10)
+
+    def test_server_generated_upload_ids(self):
+        # Given
+        # When
+        ids = {self.store.create() for _ in range(3)}
+
+        # Then
+        self.assertEqual(len(ids), 3)
+        self.assertTrue(all(self.store.exists(upload_id) for upload_id in ids))
+        with self.assertRaises(ValueError):
+            self.store.write('chosen-by-client', 0, io.BytesIO(b'data'))
+        self.assertFalse(self.store.exists('chosen-by-client'))
+
+    def test_invalid_upload_id(self):
+        # Given
+        # When
+        # Then
+        with self.assertRaises(ValueError):
+            self.store.path('../signal')
+        self.assertEqual(self.store.received('unknown'), 0)
+
+    def test_expired_uploads_are_purged(self):
+        # Given
+        old = self.store.create()
+        self.store.write(old, 0, io.BytesIO(b'old'))
+        expired = time.time() - 120
+        os.utime(self.store.path(old), (expired, expired))
+
+        # When
+        new = self.store.create()
+        self.store.write(new, 0, io.BytesIO(b'new'))
+
+        # Then
+        self.assertFalse(self.store.exists(old))
+        self.assertEqual(self.store.received(new), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from utils import axis
+from utils.axis import UniformAxis
+
+
+class TestUniformAxis(unittest.TestCase):
+
+    def setUp(self):
+        self.values = 2.0 + np.arange(1000) * 0.5
+        self.axis = UniformAxis(2.0, 0.5, 1000)
+
+    def test_behaves_like_array(self):
+        # Given
+        indices = np.array([0, 10, 999])
+
+        # When
+        # Then
+        self.assertEqual(len(self.axis), 1000)
+        self.assertEqual(self.axis.shape, (1000,))
+        self.assertEqual(self.axis[3], 3.5)
+        self.assertEqual(self.axis[-1], self.values[-1])
+        np.testing.assert_array_equal(self.axis[indices], self.values[indices])
+        np.testing.assert_array_equal(np.asarray(self.axis[10:20:3]), self.values[10:20:3])
+        np.testing.assert_array_equal(np.asarray(self.axis), self.values)
+        with self.assertRaises(IndexError):
+            _ = self.axis[1000]
+
+    def test_searchsorted(self):
+        # Given
+        queries = [-5.0, 2.0, 2.1, 10.0, 10.25, 501.5, 600.0]
+
+        # When
+        # Then
+        for query in queries:
+            for side in ('left', 'right'):
+                self.assertEqual(self.axis.searchsorted(query, side=side),
+                                 np.searchsorted(self.values, query, side=side), (query, side))
+
+    def test_uniform(self):
+        # Given
+        jittered = self.values + np.random.default_rng(0).normal(scale=1e-3, size=1000)
+
+        # When
+        detected = axis.uniform(np.linspace(0, 1, 1001))
+
+        # Then
+        self.assertEqual(detected, UniformAxis(0.0, 0.001, 1001))
+        self.assertEqual(axis.uniform(self.values), self.axis)
+        self.assertIsNone(axis.uniform(jittered))
+        self.assertIsNone(axis.uniform(np.zeros(10)))
+        self.assertIsNone(axis.uniform(np.array([1.0])))
+
+    def test_spacing(self):
+        # Given
+        # When
+        # Then
+        self.assertEqual(axis.spacing(self.axis), 0.5)
+        self.assertAlmostEqual(axis.spacing(self.values), 0.5)
+        self.assertAlmostEqual(axis.spacing(np.sqrt(np.arange(100.0))), np.mean(np.diff(np.sqrt(np.arange(100.0)))))
+
+
+if __name__ == '__main__':
+    unittest.main()
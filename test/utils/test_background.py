@@ -0,0 +1,126 @@
+import importlib
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from dash import Dash, dcc, html, Input, Output
+
+from models import filtering
+from utils import background, env
+
+try:
+    import diskcache
+    from dash import DiskcacheManager
+except ImportError:
+    diskcache = None
+
+
+def run_job(client, callback: dict, inputs: list, state: list = (), timeout: float = 30.0) -> dict:
+    """Triggers a background callback through the test ``client`` and polls until its job returns the outputs."""
+    multiple = callback['output'].startswith('..')
+    outputs = [dict(zip(['id', 'property'], output.rsplit('.', 1)))
+               for output in (callback['output'].strip('.').split('...') if multiple else [callback['output']])]
+    body = dict(output=callback['output'], outputs=outputs if multiple else outputs[0],
+                inputs=[dict(id=spec['id'], property=spec['property'], value=value)
+                        for spec, value in zip(callback['inputs'], inputs)],
+                state=[dict(id=spec['id'], property=spec['property'], value=value)
+                       for spec, value in zip(callback['state'], state)],
+                changedPropIds=[f'{callback["inputs"][0]["id"]}.{callback["inputs"][0]["property"]}'])
+    job = client.post('/_dash-update-component', json=body).get_json()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.post(f'/_dash-update-component?cacheKey={job["cacheKey"]}&job={job["job"]}', json=body)
+        if response.status_code == 200 and 'response' in (response.get_json() or {}):
+            return response.get_json()['response']
+        time.sleep(0.05)
+    raise TimeoutError('The background job did not finish')
+
+
+class TestBackgroundCallback(unittest.TestCase):
+
+    def test_runs_synchronously_without_manager(self):
+        # Given
+        app = Dash(__name__)
+        progress = []
+
+        with mock.patch.object(background, 'manager', None):
+            # When
+            @background.callback(app, Output('out', 'children'), Input('in', 'value'),
+                                 progress=Output('bar', 'value'))
+            def double(set_progress, value):
+                progress.append(set_progress(50))
+                return value * 2
+
+        # Then
+        self.assertEqual(double(21), 42)
+        self.assertEqual(progress, [None])
+        self.assertIsNone(app.callback_map['out.children']['background'])
+
+    def test_runs_in_background_with_manager(self):
+        # Given
+        app = Dash(__name__)
+
+        with mock.patch.object(background, 'manager', mock.MagicMock()):
+            # When
+            @background.callback(app, Output('out', 'children'), Input('in', 'value'))
+            def double(set_progress, value):
+                return value * 2
+
+        # Then
+        self.assertIsNotNone(app.callback_map['out.children']['background'])
+
+    def test_background_callbacks_are_off_by_default(self):
+        # Given
+        with mock.patch.dict(os.environ):
+            os.environ.pop('BACKGROUND_CALLBACKS', None)
+
+            # When
+            defaults = importlib.reload(env)
+
+        # Then
+        self.assertFalse(defaults.BACKGROUND_CALLBACKS)
+        importlib.reload(env)
+
+    def test_compute_pool_is_refused_with_background_callbacks(self):
+        # Given
+        with mock.patch.multiple(env, BACKGROUND_CALLBACKS=True, COMPUTE_WORKERS=2):
+            # When
+            # Then
+            with self.assertRaises(ValueError):
+                importlib.reload(background)
+        importlib.reload(background)
+
+    @unittest.skipIf(diskcache is None, 'diskcache is not installed')
+    def test_jobs_do_not_share_in_process_caches(self):
+        # Given
+        app = Dash(__name__)
+        app.layout = html.Div([dcc.Input(id='in'), html.Div(id='out')])
+        filtering.design_cache.clear()
+        key = filtering.design_key(4, [10.0], 1000.0, 'LOWPASS')
+
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.object(background, 'manager', DiskcacheManager(diskcache.Cache(directory))):
+                @background.callback(app, Output('out', 'children'), Input('in', 'value'))
+                def design(set_progress, value):
+                    cached = key in filtering.design_cache
+                    filtering.design(key)
+                    return [cached, key in filtering.design_cache]
+
+            client = app.server.test_client()
+            callback = client.get('/_dash-dependencies').get_json()[0]
+
+            # When
+            first = run_job(client, callback, [1])
+            second = run_job(client, callback, [2])
+
+        # Then
+        # Each job designed the filter again, and none of them left it in the web worker's cache
+        self.assertEqual(first['out']['children'], [False, True])
+        self.assertEqual(second['out']['children'], [False, True])
+        self.assertNotIn(key, filtering.design_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
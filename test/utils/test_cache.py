@@ -0,0 +1,196 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from models.data import SignalData
+from models.filtering import FilterRate, design_key
+from utils import cache
+from utils.cache import LruCache, SharedCache, nbytes
+
+
+class TestLruCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LruCache(max_entries=2)
+
+    def test_get_and_put(self):
+        # Given
+        self.cache.put('a', 1)
+
+        # When
+        # Then
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('b', default=0), 0)
+
+    def test_evicts_least_recently_used(self):
+        # Given
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+
+        # When
+        self.cache.put('c', 3)
+
+        # Then
+        self.assertEqual(len(self.cache), 2)
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+
+    def test_get_or_compute(self):
+        # Given
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None
+
+        # When
+        first = self.cache.get_or_compute('a', compute)
+        second = self.cache.get_or_compute('a', compute)
+
+        # Then
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(len(calls), 1)
+
+    def test_hit_and_miss_counters(self):
+        # Given
+        self.cache.put('a', 1)
+
+        # When
+        self.cache.get('a')
+        self.cache.get('a')
+        self.cache.get('b')
+
+        # Then
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertAlmostEqual(self.cache.hit_ratio, 2 / 3)
+        self.cache.clear()
+        self.assertEqual(self.cache.hit_ratio, 0.0)
+
+
+class TestByteBoundedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LruCache(max_bytes=3000)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        # Given
+        self.cache.put('a', np.zeros(100))
+        self.cache.put('b', np.zeros(100))
+        self.cache.get('a')
+
+        # When
+        self.cache.put('c', np.zeros(200))
+
+        # Then
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEqual(self.cache.resident_bytes, 2400)
+
+    def test_replacing_and_oversized_values(self):
+        # Given
+        self.cache.put('a', np.zeros(100))
+
+        # When
+        self.cache.put('a', np.zeros(50))
+        self.cache.put('b', np.zeros(1000))
+
+        # Then
+        self.assertEqual(self.cache.resident_bytes, 400)
+        self.assertNotIn('b', self.cache)
+        self.assertEqual(self.cache.stats()['entries'], 1)
+
+    def test_stats(self):
+        # Given
+        self.cache.put('a', np.zeros(10))
+
+        # When
+        self.cache.get('a')
+        self.cache.get('b')
+
+        # Then
+        self.assertEqual(self.cache.stats(), {'entries': 1, 'max_entries': None, 'resident_bytes': 80,
+                                              'max_bytes': 3000, 'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+
+@unittest.skipIf(cache.diskcache is None, 'diskcache is not installed')
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SharedCache(self.directory.name, max_bytes=1 << 20)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_entries_are_shared_by_instances_of_one_directory(self):
+        # Given
+        # As opened by another process
+        other = SharedCache(self.directory.name, max_bytes=1 << 20)
+        key = ('handle', design_key(4, [10.0], 1000.0, 'LOWPASS'), False, FilterRate.FULL)
+
+        # When
+        self.cache.put(key, np.arange(4.0))
+        found = other.get(('handle', design_key(4, [10.0], 1000.0, 'LOWPASS'), False, FilterRate.FULL))
+
+        # Then
+        np.testing.assert_array_equal(found, np.arange(4.0))
+        self.assertIsNone(other.get(('handle', design_key(4, [10.0], 1000.0, 'LOWPASS'), True, FilterRate.FULL)))
+        self.assertIn(key, other)
+        self.assertEqual(len(other), 1)
+
+    def test_get_or_compute_and_stats(self):
+        # Given
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 'value'
+
+        # When
+        values = [self.cache.get_or_compute('key', compute) for _ in range(3)]
+
+        # Then
+        self.assertEqual(values, ['value'] * 3)
+        self.assertEqual(len(calls), 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats['entries'], stats['hits'], stats['misses'], stats['max_bytes']), (1, 2, 1, 1 << 20))
+        self.assertGreater(stats['resident_bytes'], 0)
+
+    def test_clear(self):
+        # Given
+        self.cache.put('key', 'value')
+        self.cache.get('key')
+
+        # When
+        self.cache.clear()
+
+        # Then
+        self.assertEqual((len(self.cache), self.cache.stats()['hits']), (0, 0))
+
+
+class TestNbytes(unittest.TestCase):
+
+    def test_counts_arrays_held_by_containers_and_objects(self):
+        # Given
+        samples = np.zeros(1000)
+        samples.setflags(write=False)
+        signal_data = SignalData(x_data=np.arange(1000.0), y_data=samples, x_label='x', y_label='y')
+
+        # When
+        size = nbytes({'signal': signal_data, 'again': [signal_data, samples]})
+
+        # Then
+        self.assertGreaterEqual(size, 8000)
+        self.assertLess(size, 9000)
+        self.assertEqual(nbytes(np.zeros(10)), 80)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from utils.decimation import Decimation, decimate, min_max_indices, lttb_indices
+
+
+class TestDecimation(unittest.TestCase):
+
+    def setUp(self):
+        self.x_data = np.linspace(0, 10, 100_003)
+        self.y_data = np.sin(2 * np.pi * self.x_data)
+        self.y_data[54_321] = 25.0
+        self.y_data[77_777] = -25.0
+
+    def test_short_traces_are_untouched(self):
+        # Given
+        x_data = np.arange(10)
+
+        # When
+        x_result, y_result = decimate(x_data, x_data * 2, max_points=100)
+
+        # Then
+        np.testing.assert_array_equal(x_result, x_data)
+        np.testing.assert_array_equal(y_result, x_data * 2)
+
+    def test_none_keeps_every_sample(self):
+        # Given
+        # When
+        x_result, y_result = decimate(self.x_data, self.y_data, max_points=100, method=Decimation.NONE)
+
+        # Then
+        self.assertEqual(len(y_result), len(self.y_data))
+
+    def test_min_max_keeps_glitches(self):
+        # Given
+        # When
+        indices = min_max_indices(self.y_data, max_points=1000)
+
+        # Then
+        self.assertLessEqual(len(indices), 1000)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(54_321, indices)
+        self.assertIn(77_777, indices)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], len(self.y_data) - 1)
+
+    def test_lttb_keeps_glitches(self):
+        # Given
+        # When
+        indices = lttb_indices(self.y_data, self.x_data, max_points=1000)
+
+        # Then
+        self.assertEqual(len(indices), 1000)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(54_321, indices)
+        self.assertIn(77_777, indices)
+
+    def test_decimate_returns_matching_samples(self):
+        # Given
+        # When
+        x_result, y_result = decimate(self.x_data, self.y_data, max_points=500, method=Decimation.MIN_MAX)
+
+        # Then
+        self.assertLessEqual(len(x_result), 500)
+        self.assertEqual(len(x_result), len(y_result))
+        np.testing.assert_array_equal(y_result, self.y_data[np.searchsorted(self.x_data, x_result)])
+        self.assertEqual(y_result.max(), 25.0)
+        self.assertEqual(y_result.min(), -25.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from dash import Dash, html, Input, Output
+
+from utils import background, metrics as metrics_module
+from utils.cache import LruCache
+from utils.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.metrics = Metrics(self.directory.name, enabled=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_span(self):
+        # Given
+        @self.metrics.span('decorated')
+        def work():
+            return 42
+
+        # When
+        with self.metrics.span('block'):
+            pass
+        results = [work(), work()]
+
+        # Then
+        self.assertEqual(results, [42, 42])
+        sums = {(name, label): value for name, label, value in self.metrics.snapshot()['sums']}
+        self.assertEqual(sums[('stage_seconds_count', 'decorated')], 2)
+        self.assertEqual(sums[('stage_seconds_count', 'block')], 1)
+        self.assertGreaterEqual(sums[('stage_seconds_sum', 'decorated')], 0)
+
+    def test_disabled(self):
+        # Given
+        disabled = Metrics(self.directory.name, enabled=False)
+
+        # When
+        with disabled.span('block'):
+            pass
+
+        # Then
+        self.assertEqual(disabled.snapshot(), {'sums': [], 'maxima': []})
+
+    def test_render(self):
+        # Given
+        cache = LruCache(max_entries=4)
+        cache.put('key', np.zeros(10))
+        cache.get('key')
+        self.metrics.observe('callback_seconds', 'out.children', 0.5)
+        self.metrics.add('callback_request_bytes_total', 'out.children', 100)
+        self.metrics.maximum('callback_peak_memory_bytes', 'out.children', 2048)
+        self.metrics.maximum('callback_peak_memory_bytes', 'out.children', 1024)
+
+        # When
+        text = self.metrics.render({'results': cache})
+
+        # Then
+        self.assertIn('# TYPE signals_callback_seconds summary', text)
+        self.assertIn('signals_callback_seconds_count{callback="out.children"} 1', text)
+        self.assertIn('signals_callback_seconds_sum{callback="out.children"} 0.5', text)
+        self.assertIn('signals_callback_request_bytes_total{callback="out.children"} 100', text)
+        self.assertIn('signals_callback_peak_memory_bytes{callback="out.children"} 2048', text)
+        self.assertIn('signals_cache_entries{cache="results"} 1', text)
+        self.assertIn('signals_cache_hits_total{cache="results"} 1', text)
+        self.assertIn('# TYPE signals_process_max_resident_bytes gauge', text)
+
+    def test_publish_and_collect(self):
+        # Given
+        job = Metrics(self.directory.name, enabled=True)
+        self.metrics.add('callback_request_bytes_total', 'out.children', 100)
+        job.add('callback_request_bytes_total', 'out.children', 50)
+        job.maximum('job_peak_memory_bytes', 'apply_filter', 4096)
+
+        # When
+        job.publish()
+        self.metrics.collect()
+
+        # Then
+        self.assertEqual(job.snapshot(), {'sums': [], 'maxima': []})
+        self.assertEqual(os.listdir(self.directory.name), ['published.lock'])
+        self.assertEqual(self.metrics.snapshot(), {'sums': [['callback_request_bytes_total', 'out.children', 150]],
+                                                   'maxima': [['job_peak_memory_bytes', 'apply_filter', 4096]]})
+
+    def test_published_jobs_share_one_file(self):
+        # Given
+        jobs = [Metrics(self.directory.name, enabled=True) for _ in range(20)]
+
+        # When
+        for size, job in enumerate(jobs):
+            job.observe('job_seconds', 'apply_filter', 0.5)
+            job.maximum('job_peak_memory_bytes', 'apply_filter', size)
+            job.publish()
+        files = sorted(os.listdir(self.directory.name))
+        self.metrics.collect()
+
+        # Then
+        self.assertEqual(files, ['published.json', 'published.lock'])
+        sums = {(name, label): value for name, label, value in self.metrics.snapshot()['sums']}
+        self.assertEqual(sums[('job_seconds_count', 'apply_filter')], 20)
+        self.assertEqual(sums[('job_seconds_sum', 'apply_filter')], 10)
+        self.assertEqual(self.metrics.snapshot()['maxima'], [['job_peak_memory_bytes', 'apply_filter', 19]])
+
+    def test_without_posix_modules(self):
+        # Given
+        self.metrics.add('callback_request_bytes_total', 'out.children', 100)
+
+        # When
+        with patch('utils.metrics.fcntl', None), patch('utils.metrics.resource', None):
+            self.metrics.publish()
+            self.metrics.collect()
+            text = self.metrics.render()
+
+        # Then
+        self.assertIn('signals_callback_request_bytes_total{callback="out.children"} 100', text)
+        self.assertNotIn('process_max_resident_bytes', text)
+
+
+class TestMetricsRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.patcher = patch('utils.metrics.metrics', Metrics(self.directory.name, enabled=True))
+        self.metrics = self.patcher.start()
+        self.tracing = tracemalloc.is_tracing()
+
+    def tearDown(self):
+        if not self.tracing:
+            tracemalloc.stop()
+        self.patcher.stop()
+        self.directory.cleanup()
+
+    def register(self, memory: bool = True):
+        self.app = Dash(__name__)
+        self.app.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+
+        with patch.object(background, 'manager', None):
+            @background.callback(self.app, Output('out', 'children'), Input('in', 'children'))
+            def echo(set_progress, value):
+                return 'x' * int(np.ones(100_000).sum() // 20)
+
+        with patch('utils.metrics.METRICS_MEMORY', memory):
+            metrics_module.register_routes(self.app)
+        self.client = self.app.server.test_client()
+        self.body = dict(output='out.children', outputs={'id': 'out', 'property': 'children'},
+                         inputs=[{'id': 'in', 'property': 'children', 'value': None}], changedPropIds=['in.children'])
+
+    def test_callback_request_is_recorded(self):
+        # Given
+        self.register()
+
+        # When
+        self.client.post('/_dash-update-component', json=self.body)
+        response = self.client.get('/metrics')
+
+        # Then
+        text = response.get_data(as_text=True)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('signals_callback_seconds_count{callback="out.children"} 1', text)
+        self.assertIn('signals_stage_seconds_count{stage="json_serialization"}', text)
+        sums = {(name, label): value for name, label, value in self.metrics.snapshot()['sums']}
+        maxima = {(name, label): value for name, label, value in self.metrics.snapshot()['maxima']}
+        self.assertGreater(sums[('callback_request_bytes_total', 'out.children')], 0)
+        self.assertGreaterEqual(maxima[('callback_peak_memory_bytes', 'out.children')], 800_000)
+
+    @unittest.skipIf(tracemalloc.is_tracing(), 'memory is traced by the test runner')
+    def test_memory_is_not_traced_by_default(self):
+        # Given
+        self.register(memory=False)
+
+        # When
+        self.client.post('/_dash-update-component', json=self.body)
+
+        # Then
+        self.assertFalse(tracemalloc.is_tracing())
+        sums = {(name, label): value for name, label, value in self.metrics.snapshot()['sums']}
+        self.assertEqual(sums[('callback_seconds_count', 'out.children')], 1)
+        maxima = [name for name, _, _ in self.metrics.snapshot()['maxima']]
+        self.assertNotIn('callback_peak_memory_bytes', maxima)
+
+    def test_profile(self):
+        # Given
+        self.register()
+        with tempfile.TemporaryDirectory() as profiles:
+            with patch('utils.metrics.PROFILE_DIR', profiles):
+                # When
+                self.client.post('/_dash-update-component', json=self.body)
+
+                # Then
+                files = sorted(os.listdir(profiles))
+                self.assertEqual(len(files), 2)
+                self.assertTrue(files[0].endswith('out.children.allocations.txt'))
+                self.assertTrue(files[1].endswith('out.children.prof'))
+
+
+if __name__ == '__main__':
+    unittest.main()
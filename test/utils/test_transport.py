@@ -0,0 +1,123 @@
+import base64
+import gzip
+import unittest
+
+import numpy as np
+from dash import Dash, html, Input, Output
+
+from models.figure import SignalFigure
+from utils import transport
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_single_precision_where_it_suffices(self):
+        # Given
+        samples = np.sin(np.linspace(0, 10, 1000))
+
+        # When
+        result = transport.compact(samples)
+
+        # Then
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, samples, atol=1e-6)
+
+    def test_double_precision_for_large_offsets(self):
+        # Given
+        samples = 1e6 + 1e-3 * np.sin(np.linspace(0, 10, 1000))
+
+        # When
+        # Then
+        self.assertEqual(transport.compact(samples).dtype, np.float64)
+
+    def test_axis_keeps_sample_spacing(self):
+        # Given
+        short_axis = np.arange(1000) * 1e-3
+        long_axis = 1e5 + np.arange(1000) * 1e-3
+
+        # When
+        # Then
+        self.assertEqual(transport.compact_axis(short_axis).dtype, np.float32)
+        self.assertEqual(transport.compact_axis(long_axis).dtype, np.float64)
+
+    def test_rounded_list(self):
+        # Given
+        samples = 1e5 + np.sin(np.linspace(0, 10, 1000))
+
+        # When
+        result = transport.rounded_list(samples)
+        axis = transport.rounded_list(np.arange(5) / 3, resolution=1e-3)
+
+        # Then
+        self.assertIsInstance(result, list)
+        np.testing.assert_allclose(result, samples, atol=2e-6)
+        self.assertLess(len(repr(result)), len(repr(samples.tolist())))
+        self.assertEqual(axis, [0.0, 0.333, 0.667, 1.0, 1.333])
+
+    def test_typed_array(self):
+        # Given
+        values = np.array([1.5, -2.0, 3.25], dtype=np.float32)
+
+        # When
+        encoded = transport.typed_array(values)
+
+        # Then
+        self.assertEqual(encoded['dtype'], 'f4')
+        np.testing.assert_array_equal(np.frombuffer(base64.b64decode(encoded['bdata']), dtype=np.float32), values)
+
+    def test_figures_encode_typed_arrays(self):
+        # Given
+        fig = SignalFigure(rows=1, cols=1, subplot_titles=['Signal'])
+        x_data = np.arange(1000) / 1000.0
+
+        # When
+        fig.add_trace(x_data, np.sin(2 * np.pi * x_data), 'blue', row=1, col=1)
+        trace = fig.figure.to_plotly_json()['data'][0]
+
+        # Then
+        self.assertEqual(trace['y']['dtype'], 'f4')
+        self.assertIn('bdata', trace['x'])
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Dash(__name__)
+        self.app.layout = html.Div([html.Div(id='in'), html.Div(id='out')])
+
+        @self.app.callback(Output('out', 'children'), Input('in', 'children'))
+        def echo(value):
+            return 'x' * 5000
+
+        transport.register_compression(self.app)
+        transport.payload_stats.clear()
+        self.client = self.app.server.test_client()
+        self.body = dict(output='out.children', outputs={'id': 'out', 'property': 'children'},
+                         inputs=[{'id': 'in', 'property': 'children', 'value': None}], changedPropIds=['in.children'])
+
+    def test_gzip_response(self):
+        # Given
+        # When
+        response = self.client.post('/_dash-update-component', json=self.body, headers={'Accept-Encoding': 'gzip'})
+
+        # Then
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b'x' * 5000, gzip.decompress(response.get_data()))
+        sizes = transport.payload_stats.snapshot()['out.children']
+        self.assertEqual(sizes['calls'], 1)
+        self.assertLess(sizes['sent_bytes'], sizes['raw_bytes'])
+        self.assertEqual(self.client.get('/_payload-stats').json, transport.payload_stats.snapshot())
+
+    def test_uncompressed_without_accept_encoding(self):
+        # Given
+        # When
+        response = self.client.post('/_dash-update-component', json=self.body)
+
+        # Then
+        self.assertNotIn('Content-Encoding', response.headers)
+        sizes = transport.payload_stats.snapshot()['out.children']
+        self.assertEqual(sizes['sent_bytes'], sizes['raw_bytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Feeds a live stream with a test signal: sines of the given frequencies plus noise, one line per sample.
+
+Lines are sent as UDP datagrams or appended to a CSV file, the two stream sources of the Live Stream tab.
+Run from the repository root: ``python -m tools.stream_generator --udp 127.0.0.1:9999 [--rate 1000] [--channels 2]``
+or ``python -m tools.stream_generator --file /tmp/signals-streams/live.csv``
+"""
+import argparse
+import os
+import socket
+import time
+
+import numpy as np
+
+# Largest number of lines sent in one datagram, well within the size of a datagram
+LINES_PER_DATAGRAM = 128
+
+
+def generate(start: int, count: int, rate: float, frequencies: list[float], channels: int, noise: float,
+             rng: np.random.Generator) -> np.array:
+    """Rows of the x value and one value per channel for samples ``start`` to ``start + count``."""
+    x_data = np.arange(start, start + count) / rate
+    rows = [x_data]
+    for channel in range(channels):
+        # Every channel is shifted in phase, so the channels are told apart in the plot
+        phase = channel * np.pi / max(channels, 1)
+        rows.append(sum(np.sin(2 * np.pi * frequency * x_data + phase) for frequency in frequencies)
+                    + noise * rng.standard_normal(count))
+    return np.column_stack(rows)
+
+
+def format_lines(rows: np.array) -> bytes:
+    return ''.join(','.join(f'{value:.10g}' for value in row) + '\n' for row in rows).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--udp', help='host:port the stream listens on')
+    target.add_argument('--file', help='CSV file the stream tails')
+    parser.add_argument('--rate', type=float, default=1000.0, help='samples per second')
+    parser.add_argument('--channels', type=int, default=1)
+    parser.add_argument('--frequencies', nargs='+', type=float, default=[2.0, 50.0])
+    parser.add_argument('--noise', type=float, default=0.1)
+    parser.add_argument('--duration', type=float, default=None, help='seconds to run, forever if omitted')
+    parser.add_argument('--interval', type=float, default=0.05, help='seconds between blocks of samples')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) if args.udp else None
+    host, _, port = (args.udp or '').rpartition(':')
+    if args.file:
+        os.makedirs(os.path.dirname(os.path.abspath(args.file)), exist_ok=True)
+        with open(args.file, 'w') as file:
+            file.write(','.join(['Time (s)'] + [f'ch{channel}' for channel in range(args.channels)]) + '\n')
+
+    started = time.monotonic()
+    sent = 0
+    try:
+        while args.duration is None or sent < args.duration * args.rate:
+            due = int((time.monotonic() - started) * args.rate)
+            if args.duration is not None:
+                due = min(due, int(args.duration * args.rate))
+            rows = generate(sent, due - sent, args.rate, args.frequencies, args.channels, args.noise, rng)
+            if sender is not None:
+                for start in range(0, len(rows), LINES_PER_DATAGRAM):
+                    sender.sendto(format_lines(rows[start:start + LINES_PER_DATAGRAM]), (host, int(port)))
+            elif len(rows):
+                with open(args.file, 'ab') as file:
+                    file.write(format_lines(rows))
+            sent = due
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sender is not None:
+            sender.close()
+    print(f'Sent {sent} samples')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Largest deviation from an evenly spaced grid, relative to the spacing, for an axis to be stored as (start, step, n)
+UNIFORM_TOLERANCE = 1e-6
+CHUNK_SIZE = 1 << 16
+
+
+class UniformAxis:
+    """Evenly spaced axis described by its first value, spacing and length instead of an array of samples.
+
+    It behaves like a read-only 1-D float64 array wherever the application reads an x-axis: indexing with integers,
+    slices or index arrays computes only the requested values, ``searchsorted`` is closed-form, and ``np.asarray``
+    materializes the full axis when an array is really needed.
+    """
+
+    __slots__ = ('__start', '__step', '__n')
+
+    ndim = 1
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, start: float, step: float, n: int):
+        self.__start = float(start)
+        self.__step = float(step)
+        self.__n = int(n)
+
+    @property
+    def start(self) -> float:
+        return self.__start
+
+    @property
+    def step(self) -> float:
+        return self.__step
+
+    @property
+    def shape(self) -> tuple[int]:
+        return self.__n,
+
+    @property
+    def size(self) -> int:
+        return self.__n
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+    def __len__(self) -> int:
+        return self.__n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, stride = index.indices(self.__n)
+            return UniformAxis(self.__start + start * self.__step, self.__step * stride,
+                               len(range(start, stop, stride)))
+        indices = np.asarray(index)
+        if np.any((indices >= self.__n) | (indices < -self.__n)):
+            raise IndexError(f'index out of bounds for axis of length {self.__n}')
+        values = self.__start + np.where(indices < 0, indices + self.__n, indices) * self.__step
+        return float(values) if values.ndim == 0 else values
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self.__start + np.arange(self.__n) * self.__step
+        return values if dtype is None else values.astype(dtype)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, UniformAxis)
+                and (self.__start, self.__step, self.__n) == (other.__start, other.__step, other.__n))
+
+    def __hash__(self) -> int:
+        return hash((self.__start, self.__step, self.__n))
+
+    def __repr__(self) -> str:
+        return f'UniformAxis(start={self.__start}, step={self.__step}, n={self.__n})'
+
+    def searchsorted(self, value: float, side: str = 'left') -> int:
+        if self.__step <= 0 or self.__n == 0:
+            return int(np.searchsorted(np.asarray(self), value, side=side))
+        position = (value - self.__start) / self.__step
+        index = np.ceil(position) if side == 'left' else np.floor(position) + 1
+        # Values a rounding error away from a grid point are placed as if they were exactly on it
+        if abs(position - np.round(position)) <= UNIFORM_TOLERANCE:
+            index = np.round(position) + (side == 'right')
+        return int(min(max(index, 0), self.__n))
+
+    def to_list(self) -> list[float | int]:
+        return [self.__start, self.__step, self.__n]
+
+
+def uniform(values: np.array, tolerance: float = UNIFORM_TOLERANCE) -> UniformAxis | None:
+    """The evenly spaced axis matching ``values`` within ``tolerance`` of the spacing, ``None`` if there is none."""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if values.ndim != 1 or n < 2:
+        return None
+    step = (values[-1] - values[0]) / (n - 1)
+    if not np.isfinite(step) or step == 0:
+        return None
+    for start in range(0, n, CHUNK_SIZE):
+        chunk = values[start:start + CHUNK_SIZE]
+        expected = values[0] + np.arange(start, start + len(chunk)) * step
+        if np.max(np.abs(chunk - expected)) > tolerance * abs(step):
+            return None
+    return UniformAxis(values[0], step, n)
+
+
+def spacing(values: np.array) -> float:
+    """Mean spacing of an axis, computed from its ends since the differences telescope."""
+    if isinstance(values, UniformAxis):
+        return values.step
+    n = len(values)
+    return float(values[n - 1] - values[0]) / (n - 1) if n > 1 else 1.0
@@ -0,0 +1,58 @@
+import functools
+from typing import Any, Callable
+
+from dash import Dash
+
+from utils import metrics
+from utils.env import BACKGROUND_CALLBACKS, BACKGROUND_CALLBACK_DIR, BACKGROUND_CALLBACK_EXPIRE, COMPUTE_WORKERS
+
+if BACKGROUND_CALLBACKS and COMPUTE_WORKERS > 0:
+    # The compute pool belongs to the process that started it, and every job would start one of its own
+    raise ValueError('COMPUTE_WORKERS requires BACKGROUND_CALLBACKS=false: background jobs are forked processes that '
+                     'cannot share the compute pool of the web worker')
+
+try:
+    import diskcache
+    from dash import DiskcacheManager
+
+    manager = DiskcacheManager(diskcache.Cache(BACKGROUND_CALLBACK_DIR), expire=BACKGROUND_CALLBACK_EXPIRE) \
+        if BACKGROUND_CALLBACKS else None
+except ImportError:
+    manager = None
+
+
+def callback(app: Dash, *args, progress=None, cancel=None, running=None, **kwargs) -> Callable:
+    """Registers a callback that runs as a background job when a background callback manager is available.
+
+    The decorated function takes a ``set_progress`` function as its first argument. Background jobs run in their own
+    process, so the web worker is free while they run; a new trigger from the same page cancels the job it supersedes,
+    and so do the ``cancel`` inputs. Jobs publish their metrics when they end. Without diskcache, or with
+    ``BACKGROUND_CALLBACKS`` off, the callback runs synchronously, progress is discarded and the serialization of its
+    outputs is timed.
+
+    Every job is forked from the web worker and starts with a copy of its in-process caches, such as the spectra of
+    ``SignalData`` and ``filtering.design_cache``; what the job adds to them is lost when it ends.
+    """
+    def decorator(function: Callable) -> Callable:
+        if manager is None:
+            def synchronous(*values):
+                outputs = function(_discard_progress, *values)
+                metrics.time_serialization()
+                return outputs
+
+            return app.callback(*args, running=running, **kwargs)(synchronous)
+
+        @functools.wraps(function)
+        def job(*values):
+            with metrics.instrument_job(function.__name__):
+                # Dash passes set_progress only to callbacks with progress outputs
+                return function(*values) if progress else function(_discard_progress, *values)
+
+        return app.callback(*args, background=True, manager=manager, progress=progress, cancel=cancel,
+                            running=running, **kwargs)(job)
+
+    return decorator
+
+
+def _discard_progress(*_: Any):
+    pass
@@ -0,0 +1,202 @@
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+import numpy as np
+from dash import Dash
+from flask import jsonify
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+
+def nbytes(value: Any) -> int:
+    """Approximate memory held by ``value``: the buffers of arrays, and of the arrays held by containers and objects.
+
+    Objects are sized by their ``nbytes`` if they report one and by their slots and attributes otherwise. Views count
+    with the size of their data, which overestimates arrays sharing a buffer but never underestimates one.
+    """
+    return _nbytes(value, set())
+
+
+def _nbytes(value: Any, seen: set[int]) -> int:
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes, int, float, complex, bool, type(None))):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(key, seen) + _nbytes(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_nbytes(item, seen) for item in value)
+    if isinstance(getattr(value, 'nbytes', None), int):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    for cls in type(value).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            # Private slots are stored under their mangled name
+            mangled = f'_{cls.__name__.lstrip("_")}{name}' if name.startswith('__') else name
+            size += _nbytes(getattr(value, mangled, None), seen)
+    return size + _nbytes(getattr(value, '__dict__', None), seen)
+
+
+class LruCache:
+    """Thread-safe, bounded mapping that evicts the least recently used entry first and counts hits and misses.
+
+    The cache is bounded by its number of entries, by the bytes its values hold as measured by ``sizeof``, or both. A
+    value larger than ``max_bytes`` on its own is not kept.
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, sizeof: Callable[[Any], int] = nbytes):
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__sizeof = sizeof
+        self.__entries = OrderedDict()
+        self.__sizes = {}
+        self.__resident_bytes = 0
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.__hits + self.__misses
+        return self.__hits / lookups if lookups else 0.0
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes held by the cached values, as measured when they were put."""
+        return self.__resident_bytes
+
+    def stats(self) -> dict[str, int | float | None]:
+        with self.__lock:
+            return {
+                'entries': len(self.__entries),
+                'max_entries': self.__max_entries,
+                'resident_bytes': self.__resident_bytes,
+                'max_bytes': self.__max_bytes,
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'hit_ratio': self.hit_ratio
+            }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.__lock:
+            if key not in self.__entries:
+                self.__misses += 1
+                return default
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+
+    def put(self, key: Hashable, value: Any):
+        size = self.__sizeof(value)
+        with self.__lock:
+            self.__remove(key)
+            if self.__max_bytes is not None and size > self.__max_bytes:
+                return
+            self.__entries[key] = value
+            self.__sizes[key] = size
+            self.__resident_bytes += size
+            while ((self.__max_entries is not None and len(self.__entries) > self.__max_entries)
+                   or (self.__max_bytes is not None and self.__resident_bytes > self.__max_bytes)):
+                self.__remove(next(iter(self.__entries)))
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, default=self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__sizes.clear()
+            self.__resident_bytes = 0
+            self.__hits = 0
+            self.__misses = 0
+
+    def __remove(self, key: Hashable):
+        if key in self.__entries:
+            del self.__entries[key]
+            self.__resident_bytes -= self.__sizes.pop(key)
+
+
+class SharedCache:
+    """Bounded mapping on local disk shared by all processes of the server, with the interface of :class:`LruCache`.
+
+    For results computed in background jobs, which run in processes of their own: an in-process cache of the web
+    worker never sees what a job put into its copy. Keys are identified by their ``repr`` and values are pickled; once
+    the pickles exceed ``max_bytes`` the least recently used entries are evicted. Hits and misses are counted across
+    all processes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        if diskcache is None:
+            raise ImportError('A shared cache requires diskcache')
+        self.__max_bytes = max_bytes
+        self.__cache = diskcache.Cache(directory, size_limit=max_bytes, eviction_policy='least-recently-used')
+        self.__cache.stats(enable=True)
+
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return repr(key) in self.__cache
+
+    def stats(self) -> dict[str, int | float | None]:
+        hits, misses = self.__cache.stats()
+        return {
+            'entries': len(self.__cache),
+            'max_entries': None,
+            'resident_bytes': self.__cache.volume(),
+            'max_bytes': self.__max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.__cache.get(repr(key), default=default)
+
+    def put(self, key: Hashable, value: Any):
+        self.__cache.set(repr(key), value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, default=self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self.__cache.clear()
+        self.__cache.stats(reset=True)
+
+
+def register_stats_route(app: Dash, caches: dict[str, LruCache | SharedCache]):
+    """Serves the entries, resident bytes and hit ratio of every cache of this worker as JSON at ``_cache-stats``."""
+
+    @app.server.route(f'{app.config.routes_pathname_prefix}_cache-stats', methods=['GET'])
+    def cache_statistics():
+        return jsonify({name: cache.stats() for name, cache in caches.items()})
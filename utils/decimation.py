@@ -0,0 +1,77 @@
+from enum import Enum
+
+import numpy as np
+
+from utils.axis import UniformAxis
+
+
+class Decimation(Enum):
+    NONE = 'None'
+    MIN_MAX = 'Min/Max per bucket'
+    LTTB = 'Largest triangle three buckets'
+
+
+def decimate(x_data: np.array, y_data: np.array, max_points: int,
+             method: Decimation = Decimation.MIN_MAX) -> tuple[np.array, np.array]:
+    y_array = np.asarray(y_data)
+    if method == Decimation.NONE or len(y_array) <= max_points:
+        return np.asarray(x_data), y_array
+
+    if method == Decimation.LTTB:
+        indices = lttb_indices(y_array, np.asarray(x_data), max_points)
+    else:
+        indices = min_max_indices(y_array, max_points)
+    # A uniform axis computes only the selected values
+    x_array = x_data if isinstance(x_data, UniformAxis) else np.asarray(x_data)
+    return x_array[indices], y_array[indices]
+
+
+def min_max_indices(y_data: np.array, max_points: int) -> np.array:
+    """Indices of the minimum and maximum of every bucket, in ascending order.
+
+    Every bucket contributes two points, so single-sample peaks and glitches survive whatever the decimation ratio.
+    """
+    n = len(y_data)
+    buckets = max(max_points // 2 - 2, 1)
+    bucket_size = -(-n // buckets)
+    full = n // bucket_size * bucket_size
+
+    blocks = y_data[:full].reshape(-1, bucket_size)
+    offsets = np.arange(0, full, bucket_size)
+    lows = offsets + np.argmin(blocks, axis=1)
+    highs = offsets + np.argmax(blocks, axis=1)
+    if full < n:
+        tail = y_data[full:]
+        lows = np.append(lows, full + np.argmin(tail))
+        highs = np.append(highs, full + np.argmax(tail))
+
+    indices = np.column_stack((np.minimum(lows, highs), np.maximum(lows, highs))).ravel()
+    return np.unique(np.concatenate(([0], indices, [n - 1])))
+
+
+def lttb_indices(y_data: np.array, x_data: np.array, max_points: int) -> np.array:
+    """Indices selected by the Largest-Triangle-Three-Buckets algorithm (Steinarsson, 2013)."""
+    n = len(y_data)
+    if max_points < 3:
+        return np.array([0, n - 1])
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = np.mean(x_data[next_start:max(next_end, next_start + 1)])
+        next_y = np.mean(y_data[next_start:max(next_end, next_start + 1)])
+
+        bucket_x = x_data[start:end]
+        bucket_y = y_data[start:end]
+        areas = np.abs((x_data[selected] - next_x) * (bucket_y - y_data[selected]) -
+                       (x_data[selected] - bucket_x) * (next_y - y_data[selected]))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    return indices
@@ -1,3 +1,38 @@
 import os
+import tempfile
 
 DEBUG = os.getenv('DEBUG', False)
+SIGNAL_STORE_DIR = os.getenv('SIGNAL_STORE_DIR', os.path.join(tempfile.gettempdir(), 'signals-store'))
+MAX_POINTS_PER_TRACE = int(os.getenv('MAX_POINTS_PER_TRACE', 4000))
+DECIMATION = os.getenv('DECIMATION', 'MIN_MAX')
+SPECTRUM_CACHE_SIZE = int(os.getenv('SPECTRUM_CACHE_SIZE', 8))
+UPLOAD_DIR = os.getenv('UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'signals-uploads'))
+UPLOAD_TTL = float(os.getenv('UPLOAD_TTL', 3600))
+SIGNAL_STORE_MAX_BYTES = int(os.getenv('SIGNAL_STORE_MAX_BYTES', 2 * 1024 ** 3))
+FILTER_DESIGN_CACHE_SIZE = int(os.getenv('FILTER_DESIGN_CACHE_SIZE', 64))
+FILTER_BLOCK_SIZE = int(os.getenv('FILTER_BLOCK_SIZE', 1 << 18))
+FILTER_RESULT_CACHE_BYTES = int(os.getenv('FILTER_RESULT_CACHE_BYTES', 256 * 1024 ** 2))
+FILTER_RESULT_CACHE_DIR = os.getenv('FILTER_RESULT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'signals-results'))
+FFT_BACKEND = os.getenv('FFT_BACKEND', 'SCIPY')
+FFT_WORKERS = int(os.getenv('FFT_WORKERS', -1))
+FFT_LENGTH = os.getenv('FFT_LENGTH', 'EXACT')
+FFT_PRECISION = os.getenv('FFT_PRECISION', 'DOUBLE')
+FFT_FREQ_CACHE_SIZE = int(os.getenv('FFT_FREQ_CACHE_SIZE', 16))
+BACKGROUND_CALLBACKS = os.getenv('BACKGROUND_CALLBACKS', 'false').lower() == 'true'
+BACKGROUND_CALLBACK_DIR = os.getenv('BACKGROUND_CALLBACK_DIR', os.path.join(tempfile.gettempdir(), 'signals-jobs'))
+BACKGROUND_CALLBACK_EXPIRE = int(os.getenv('BACKGROUND_CALLBACK_EXPIRE', 600))
+COMPUTE_WORKERS = int(os.getenv('COMPUTE_WORKERS', 0))
+COMPACT_TRANSPORT = os.getenv('COMPACT_TRANSPORT', 'true').lower() == 'true'
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+SIGNAL_PRECISION = os.getenv('SIGNAL_PRECISION', 'DOUBLE')
+STREAM_CAPACITY = int(os.getenv('STREAM_CAPACITY', 100_000))
+STREAM_WINDOW = int(os.getenv('STREAM_WINDOW', 4096))
+STREAM_INTERVAL = int(os.getenv('STREAM_INTERVAL', 500))
+STREAM_DIR = os.getenv('STREAM_DIR', os.path.join(tempfile.gettempdir(), 'signals-streams'))
+STREAM_HOST = os.getenv('STREAM_HOST', '127.0.0.1')
+STREAM_MAX_OPEN = int(os.getenv('STREAM_MAX_OPEN', 4))
+METRICS = os.getenv('METRICS', 'true').lower() == 'true'
+METRICS_MEMORY = os.getenv('METRICS_MEMORY', 'false').lower() == 'true'
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'signals-metrics'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', '')
@@ -1,4 +1,5 @@
 import plotly.graph_objects as go
+from plotly.colors import qualitative
 
 from utils import string
 
@@ -10,3 +11,25 @@ def empty(title: str) -> go.Figure:
         xaxis=dict(title=string.empty()),
         yaxis=dict(title=string.empty()))
     return empty_fig
+
+
+def x_range(relayout_data: dict, axis: str = 'xaxis') -> tuple[float, float] | None:
+    """Visible range of ``axis`` after a relayout event, ``(None, None)`` when it was reset, ``None`` when untouched."""
+    if not relayout_data:
+        return None
+    if relayout_data.get(f'{axis}.autorange'):
+        return None, None
+    if f'{axis}.range[0]' in relayout_data and f'{axis}.range[1]' in relayout_data:
+        return relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']
+    if f'{axis}.range' in relayout_data:
+        return tuple(relayout_data[f'{axis}.range'])
+    return None
+
+
+def trace_indices(fig: dict) -> dict[str, int]:
+    """Index of every trace of a figure that has a ``uid``, by uid."""
+    return {trace['uid']: index for index, trace in enumerate((fig or {}).get('data', [])) if trace.get('uid')}
+
+
+def channel_color(channel: int) -> str:
+    return qualitative.Plotly[channel % len(qualitative.Plotly)]
@@ -0,0 +1,323 @@
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from dash import Dash
+from flask import Response, after_this_request, g, has_request_context, request
+
+from utils.cache import LruCache, SharedCache
+from utils.env import METRICS, METRICS_DIR, METRICS_MEMORY, PROFILE_DIR
+
+try:
+    import fcntl
+    import resource
+except ImportError:
+    # Missing on Windows: published metrics are merged without a lock and the peak resident memory is left out
+    fcntl = resource = None
+
+PREFIX = 'signals_'
+# Lines of the allocation statistics written next to every profile
+PROFILE_ALLOCATIONS = 30
+
+# Metric families: type, label and help text, in the order they are rendered
+FAMILIES = {
+    'stage_seconds': ('summary', 'stage', 'Duration of processing stages'),
+    'stage_max_seconds': ('gauge', 'stage', 'Longest duration of processing stages'),
+    'callback_seconds': ('summary', 'callback', 'Duration of callback requests'),
+    'callback_request_bytes_total': ('counter', 'callback', 'Bytes of callback requests'),
+    'callback_response_bytes_total': ('counter', 'callback', 'Bytes of callback responses before compression'),
+    'callback_sent_bytes_total': ('counter', 'callback', 'Bytes of callback responses as sent'),
+    'callback_peak_memory_bytes': ('gauge', 'callback', 'Largest memory allocated on top of the baseline by a request'),
+    'job_seconds': ('summary', 'job', 'Duration of background callback jobs'),
+    'job_peak_memory_bytes': ('gauge', 'job', 'Largest memory allocated on top of the baseline by a job'),
+    'cache_entries': ('gauge', 'cache', 'Entries held by a cache'),
+    'cache_resident_bytes': ('gauge', 'cache', 'Bytes held by the values of a cache'),
+    'cache_hits_total': ('counter', 'cache', 'Cache lookups that found an entry'),
+    'cache_misses_total': ('counter', 'cache', 'Cache lookups that found none'),
+    'process_max_resident_bytes': ('gauge', None, 'Peak resident memory of the web worker'),
+}
+
+
+class Metrics:
+    """Timings, byte counts and traced peak memory recorded by this process, rendered in the Prometheus text format.
+
+    Background jobs run in processes of their own: they record into their copy and merge it into a single file of
+    ``directory`` when they end, and the web worker collects the file when the metrics are read. Gauges keep the
+    largest value recorded, counters and summaries add up.
+    """
+
+    def __init__(self, directory: str = METRICS_DIR, enabled: bool = METRICS):
+        self.__directory = directory
+        self.__enabled = enabled
+        self.__lock = threading.Lock()
+        self.__sums = {}
+        self.__maxima = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Times the enclosed block, or the decorated function, as a processing ``stage``."""
+        if not self.__enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage: str, seconds: float):
+        """Records a duration of a processing ``stage`` timed elsewhere."""
+        self.observe('stage_seconds', stage, seconds)
+        self.maximum('stage_max_seconds', stage, seconds)
+
+    def observe(self, family: str, label: str, value: float):
+        """Adds an observation to the count and sum of a summary."""
+        with self.__lock:
+            self.__sums[(f'{family}_count', label)] = self.__sums.get((f'{family}_count', label), 0) + 1
+            self.__sums[(f'{family}_sum', label)] = self.__sums.get((f'{family}_sum', label), 0) + value
+
+    def add(self, family: str, label: str, value: float):
+        with self.__lock:
+            self.__sums[(family, label)] = self.__sums.get((family, label), 0) + value
+
+    def maximum(self, family: str, label: str, value: float):
+        with self.__lock:
+            self.__maxima[(family, label)] = max(self.__maxima.get((family, label), value), value)
+
+    def snapshot(self) -> dict[str, list]:
+        with self.__lock:
+            return {'sums': [[*key, value] for key, value in self.__sums.items()],
+                    'maxima': [[*key, value] for key, value in self.__maxima.items()]}
+
+    def merge(self, snapshot: dict[str, list]):
+        for name, label, value in snapshot.get('sums', []):
+            self.add(name, label, value)
+        for name, label, value in snapshot.get('maxima', []):
+            self.maximum(name, label, value)
+
+    def clear(self):
+        with self.__lock:
+            self.__sums.clear()
+            self.__maxima.clear()
+
+    def publish(self):
+        """Merges what this process recorded into the file of the metrics directory and starts over."""
+        snapshot = self.snapshot()
+        if not snapshot['sums'] and not snapshot['maxima']:
+            return
+        with self.__locked():
+            published = Metrics(self.__directory, enabled=True)
+            published.merge(self.__read())
+            published.merge(snapshot)
+            # Renamed once complete, so that a job killed while writing leaves the previous file intact
+            with open(f'{self.__path}.tmp', 'w') as file:
+                json.dump(published.snapshot(), file)
+            os.replace(f'{self.__path}.tmp', self.__path)
+        self.clear()
+
+    def collect(self):
+        """Merges the metrics published by background jobs into this process's metrics and removes them."""
+        if not os.path.exists(self.__path):
+            return
+        with self.__locked():
+            self.merge(self.__read())
+            if os.path.exists(self.__path):
+                os.remove(self.__path)
+
+    @property
+    def __path(self) -> str:
+        return os.path.join(self.__directory, 'published.json')
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        # Jobs and workers of any number share the one file, so that the directory never grows
+        os.makedirs(self.__directory, exist_ok=True)
+        with open(os.path.join(self.__directory, 'published.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def __read(self) -> dict[str, list]:
+        try:
+            with open(self.__path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def render(self, caches: dict[str, LruCache | SharedCache] = None) -> str:
+        samples = {}
+        with self.__lock:
+            for (name, label), value in list(self.__sums.items()) + list(self.__maxima.items()):
+                family = re.sub('_(count|sum)$', '', name) if name not in FAMILIES else name
+                samples.setdefault(family, []).append((name, label, value))
+        for cache_name, cache in (caches or {}).items():
+            stats = cache.stats()
+            for family in ['entries', 'resident_bytes', 'hits', 'misses']:
+                name = f'cache_{family}' + ('_total' if family in ['hits', 'misses'] else '')
+                samples.setdefault(name, []).append((name, cache_name, stats[family]))
+        if resource is not None:
+            # Kilobytes on Linux
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            samples['process_max_resident_bytes'] = [('process_max_resident_bytes', None, max_rss)]
+
+        lines = []
+        for family, (metric_type, label_name, description) in FAMILIES.items():
+            if family not in samples:
+                continue
+            lines += [f'# HELP {PREFIX}{family} {description}', f'# TYPE {PREFIX}{family} {metric_type}']
+            for name, label, value in sorted(samples[family], key=lambda sample: (str(sample[1]), sample[0])):
+                labels = f'{{{label_name}="{_escape(label)}"}}' if label_name else ''
+                lines.append(f'{PREFIX}{name}{labels} {float(value):.9g}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def memory_baseline() -> int | None:
+    """Traced memory now, from which :func:`peak_memory` measures; the traced peak starts over."""
+    if not tracemalloc.is_tracing():
+        return None
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def peak_memory(baseline: int | None) -> int:
+    """Peak traced memory above ``baseline`` since it was taken, 0 when memory is not traced.
+
+    The tracer is shared by the threads of the process, so the peak of a request includes what requests running at
+    the same time allocated.
+    """
+    if baseline is None or not tracemalloc.is_tracing():
+        return 0
+    return max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+
+class Profile:
+    """cProfile statistics and the largest allocations of one callback, written to ``PROFILE_DIR`` when it ends."""
+
+    def __init__(self, name: str, directory: str = None):
+        self.__name = re.sub(r'[^\w.-]+', '_', name).strip('._')[:80] or 'callback'
+        self.__directory = directory or PROFILE_DIR
+        self.__profiler = cProfile.Profile()
+
+    def start(self) -> 'Profile':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.__profiler.enable()
+        return self
+
+    def stop(self):
+        self.__profiler.disable()
+        os.makedirs(self.__directory, exist_ok=True)
+        stem = os.path.join(self.__directory, f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}-{self.__name}')
+        self.__profiler.dump_stats(f'{stem}.prof')
+        allocations = tracemalloc.take_snapshot().statistics('lineno')[:PROFILE_ALLOCATIONS]
+        with open(f'{stem}.allocations.txt', 'w') as file:
+            file.write('\n'.join(str(statistic) for statistic in allocations) + '\n')
+
+
+@contextmanager
+def instrument_job(name: str) -> Iterator[None]:
+    """Records the duration and peak memory of a background job, profiles it if enabled, and publishes its metrics.
+
+    The job process is forked from the web worker and starts with a copy of its metrics, which are dropped so that
+    only what the job recorded is published.
+    """
+    metrics.clear()
+    profile = Profile(name).start() if PROFILE_DIR else None
+    started = time.perf_counter()
+    baseline = memory_baseline()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.stop()
+        if metrics.enabled:
+            metrics.observe('job_seconds', name, time.perf_counter() - started)
+            if baseline is not None:
+                metrics.maximum('job_peak_memory_bytes', name, peak_memory(baseline))
+            metrics.publish()
+
+
+def register_routes(app: Dash, caches: dict[str, LruCache | SharedCache] = None):
+    """Records every callback request and serves the metrics in the Prometheus text format at ``/metrics``.
+
+    Register it before the compression of the responses: Flask runs the later registered response hooks first, so
+    the recorded duration includes the compression. Peak memory is recorded only with ``METRICS_MEMORY``: tracing
+    every allocation slows the whole process down, the filters by almost twice.
+    """
+    callback_path = f'{app.config.routes_pathname_prefix}_dash-update-component'
+    if metrics.enabled and METRICS_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    @app.server.before_request
+    def start_callback_request():
+        if request.path != callback_path:
+            return
+        g.metrics_started = time.perf_counter()
+        g.metrics_memory = memory_baseline()
+        if PROFILE_DIR:
+            g.metrics_profile = Profile(_callback_name()).start()
+
+    @app.server.after_request
+    def record_callback_request(response: Response) -> Response:
+        if request.path != callback_path or 'metrics_started' not in g:
+            return response
+        if 'metrics_profile' in g:
+            g.metrics_profile.stop()
+        if metrics.enabled:
+            callback = _callback_name()
+            metrics.observe('callback_seconds', callback, time.perf_counter() - g.metrics_started)
+            metrics.add('callback_request_bytes_total', callback, request.content_length or 0)
+            if g.metrics_memory is not None:
+                metrics.maximum('callback_peak_memory_bytes', callback, peak_memory(g.metrics_memory))
+        return response
+
+    @app.server.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        metrics.collect()
+        return Response(metrics.render(caches), mimetype='text/plain; version=0.0.4')
+
+
+def time_serialization():
+    """Times the JSON serialization of the outputs a callback just returned as the ``json_serialization`` stage.
+
+    Called by ``background.callback`` when a callback running in the web worker returns: Dash serializes the outputs
+    before the response exists, and Flask runs the functions registered for this request before the response hooks,
+    so the compression is left out.
+    """
+    if not metrics.enabled or not has_request_context():
+        return
+    returned = time.perf_counter()
+
+    @after_this_request
+    def record_serialization(response: Response) -> Response:
+        metrics.record('json_serialization', time.perf_counter() - returned)
+        return response
+
+
+def record_response(callback: str, raw_bytes: int, sent_bytes: int):
+    """Counts the bytes of a callback response, before and after its compression."""
+    if metrics.enabled:
+        metrics.add('callback_response_bytes_total', callback, raw_bytes)
+        metrics.add('callback_sent_bytes_total', callback, sent_bytes)
+
+
+def _callback_name() -> str:
+    return str((request.get_json(silent=True) or {}).get('output', 'unknown'))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -6,5 +6,9 @@ def display_block() -> dict[str, str]:
     return {"display": "block"}
 
 
+def display_inline_block() -> dict[str, str]:
+    return {"display": "inline-block"}
+
+
 def color(color: str) -> dict[str, str]:
     return {'color': color}
@@ -0,0 +1,143 @@
+import base64
+import gzip
+import threading
+
+import numpy as np
+from dash import Dash
+from flask import request, Response, jsonify
+
+from utils.metrics import metrics, record_response
+from utils.env import COMPACT_TRANSPORT, COMPRESS_MIN_BYTES, COMPRESS_LEVEL
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Single precision is used when its rounding error stays below this fraction of the resolution that must be kept
+X_TOLERANCE = 1e-2
+# Fraction of the value range resolved on the y-axis, far finer than any screen
+Y_RESOLUTION = 1e-6
+
+
+def compact(values: np.array, resolution: float = None) -> np.array:
+    """Values as float32 where precision allows, float64 otherwise.
+
+    ``resolution`` is the smallest difference that must survive the conversion; it defaults to a millionth of the
+    value range. X-axes pass their sample spacing, so that neighbouring samples never collapse.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not COMPACT_TRANSPORT or values.size == 0:
+        return values
+    if resolution is None:
+        finite = values[np.isfinite(values)]
+        resolution = (finite.max() - finite.min()) * Y_RESOLUTION if finite.size else 0.0
+    single = values.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        error = np.abs(single.astype(np.float64) - values)
+    return single if np.all((error <= resolution) | ~np.isfinite(values)) else values
+
+
+def compact_axis(values: np.array) -> np.array:
+    values = np.asarray(values, dtype=np.float64)
+    spacing = np.abs(np.diff(values))
+    spacing = spacing[spacing > 0]
+    return compact(values, spacing.min() * X_TOLERANCE if spacing.size else 0.0)
+
+
+def rounded_list(values: np.array, resolution: float = None) -> list[float]:
+    """Values as a JSON list, rounded to the decimal digit of ``resolution`` so that every number is sent short.
+
+    For data that plotly cannot take as a typed array, such as the traces appended by ``extendData``. ``resolution``
+    defaults to a millionth of the value range, like in :func:`compact`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not COMPACT_TRANSPORT or values.size == 0:
+        return values.tolist()
+    if resolution is None:
+        finite = values[np.isfinite(values)]
+        resolution = (finite.max() - finite.min()) * Y_RESOLUTION if finite.size else 0.0
+    if not resolution > 0:
+        return values.tolist()
+    return np.round(values, int(np.ceil(-np.log10(resolution)))).tolist()
+
+
+def typed_array(values: np.array) -> dict[str, str] | list[float]:
+    """Plotly typed array specification of a 1-D array, for figure data sent outside a figure such as in a Patch.
+
+    Figures already encode numpy arrays this way from plotly 6 on, but patches are serialized as JSON lists of up to 17
+    characters a sample.
+    """
+    values = np.ascontiguousarray(values)
+    if not COMPACT_TRANSPORT:
+        return values.tolist()
+    return {'dtype': values.dtype.str.lstrip('<|'), 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+class PayloadStats:
+    """Bytes returned per callback, before and after compression."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__callbacks = {}
+
+    def record(self, callback: str, raw_bytes: int, sent_bytes: int):
+        with self.__lock:
+            calls, raw_total, sent_total = self.__callbacks.get(callback, (0, 0, 0))
+            self.__callbacks[callback] = (calls + 1, raw_total + raw_bytes, sent_total + sent_bytes)
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self.__lock:
+            return {
+                callback: {'calls': calls, 'raw_bytes': raw_bytes, 'sent_bytes': sent_bytes}
+                for callback, (calls, raw_bytes, sent_bytes) in self.__callbacks.items()
+            }
+
+    def clear(self):
+        with self.__lock:
+            self.__callbacks.clear()
+
+
+payload_stats = PayloadStats()
+
+
+def register_compression(app: Dash):
+    """Compresses callback responses with brotli or gzip, as the browser accepts, and records their sizes.
+
+    The sizes are served as JSON at ``_payload-stats``.
+    """
+    prefix = app.config.routes_pathname_prefix
+    callback_path = f'{prefix}_dash-update-component'
+
+    @app.server.after_request
+    def compress_callback_response(response: Response) -> Response:
+        if request.path != callback_path or response.direct_passthrough:
+            return response
+        return _compress(response)
+
+    @app.server.route(f'{prefix}_payload-stats', methods=['GET'])
+    def payload_statistics():
+        return jsonify(payload_stats.snapshot())
+
+
+def _compress(response: Response) -> Response:
+    body = response.get_data()
+    accepted = request.headers.get('Accept-Encoding', '')
+    sent = body
+    if COMPACT_TRANSPORT and len(body) >= COMPRESS_MIN_BYTES and 'Content-Encoding' not in response.headers:
+        with metrics.span('compression'):
+            if brotli is not None and 'br' in accepted:
+                sent = brotli.compress(body, quality=min(COMPRESS_LEVEL, 11))
+                response.headers['Content-Encoding'] = 'br'
+            elif 'gzip' in accepted:
+                sent = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+                response.headers['Content-Encoding'] = 'gzip'
+        if sent is not body:
+            response.set_data(sent)
+            response.headers['Vary'] = 'Accept-Encoding'
+
+    payload = request.get_json(silent=True) or {}
+    callback = str(payload.get('output', 'unknown'))
+    payload_stats.record(callback, len(body), len(sent))
+    record_response(callback, len(body), len(sent))
+    return response